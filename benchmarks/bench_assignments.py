@@ -0,0 +1,109 @@
+"""Per-rerun cost of the Assignment tab bookkeeping for a large manual group.
+
+Compares the per-month rescans the tab used before with AssignmentState.
+Widget rendering is left out; only the index and validation work is timed.
+
+    python benchmarks/bench_assignments.py --size 2000 --months 60
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.core import AssignmentState, calculate_monthly_payouts  # noqa: E402
+
+
+def legacy_rerun(participants, assignments, payouts, selection):
+    size, months = len(participants), len(payouts)
+    display_names, name_count = [], {}
+    for name in participants:
+        name_count[name] = name_count.get(name, 0) + 1
+        display_names.append(f"{name} [{name_count[name]}]")
+    assigned_indices = set()
+    for assigned_list in assignments.values():
+        assigned_indices.update(assigned_list)
+    for i in range(months):
+        current = assignments[f"month_{i}"]
+        available_indices = [j for j in range(size) if j not in assigned_indices or j in current]
+        available_display = sorted(display_names[j] for j in available_indices if j not in current)
+    # Lock: map display names back to indices with a nested scan
+    month = len(payouts) - 1
+    current = assignments[f"month_{month}"]
+    selected = []
+    for disp in selection:
+        for idx, d in enumerate(display_names):
+            if d == disp and (idx not in assigned_indices or idx in current):
+                selected.append(idx)
+                break
+    # Validation, done again by the report tab
+    for _ in range(2):
+        total = set()
+        for i in range(months):
+            if len(assignments[f"month_{i}"]) > payouts[i]:
+                break
+            total.update(assignments[f"month_{i}"])
+    return available_display, selected
+
+
+def state_rerun(state, selection):
+    for _ in range(len(state.payouts)):
+        state.available_display()
+    indices = [state.index_of(d) for d in selection]
+    state.is_valid(complete=True)
+    state.is_valid(complete=True)
+    return indices
+
+
+def half_assigned(size, payouts, rng):
+    order = list(range(size))
+    rng.shuffle(order)
+    assignments, cursor = {}, 0
+    for month, count in enumerate(payouts):
+        assignments[f"month_{month}"] = order[cursor:cursor + count // 2]
+        cursor += count
+    return assignments
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--months", type=int, default=60)
+    parser.add_argument("--reruns", type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    participants = [f"Member {i % 500}" for i in range(args.size)]
+    payouts = calculate_monthly_payouts(args.size, 5000, args.months, 5000 * args.months)
+
+    assignments = half_assigned(args.size, payouts, rng)
+    assigned = {j for members in assignments.values() for j in members}
+    free = [j for j in range(args.size) if j not in assigned]
+    t0 = time.perf_counter()
+    for _ in range(args.reruns):
+        available, _ = legacy_rerun(participants, assignments, payouts, [])
+        selection = available[:3]
+        legacy_rerun(participants, assignments, payouts, selection)
+    legacy = (time.perf_counter() - t0) / (2 * args.reruns)
+
+    assignments = half_assigned(args.size, payouts, random.Random(0))
+    t0 = time.perf_counter()
+    state = AssignmentState(assignments, payouts, participants)
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(args.reruns):
+        selection = state.available_display()[:3]
+        state_rerun(state, selection)
+        state.lock(args.months - 1, selection[:1])
+        state.remove(args.months - 1, len(state.members(args.months - 1)) - 1)
+    indexed = (time.perf_counter() - t0) / args.reruns
+
+    print(f"size {args.size}, months {args.months}, {len(free)} unassigned")
+    print(f"rescanning       : {legacy * 1000:8.2f} ms per rerun")
+    print(f"AssignmentState  : {indexed * 1000:8.2f} ms per rerun ({legacy / indexed:.1f}x faster), "
+          f"{build * 1000:.2f} ms to build")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Cost of saving a group through the dirty tracker versus a full save_group().
+
+Each round saves the same group three ways: with nothing changed, with only
+the rules edited, and with one member renamed.
+
+    python benchmarks/bench_autosave.py --size 2000 --rounds 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.core import calculate_monthly_payouts  # noqa: E402
+from njangi.storage import DatabaseManager, GroupTracker, persist_group  # noqa: E402
+
+LOAN = 5000
+
+
+def make_fields(size, duration):
+    payouts = calculate_monthly_payouts(size, LOAN, duration, LOAN * duration)
+    assignments, cursor = {}, 0
+    for month, count in enumerate(payouts):
+        assignments[f"month_{month}"] = list(range(cursor, cursor + count // 2))
+        cursor += count
+    return {
+        'size': size, 'loan': LOAN, 'time': duration, 'base': LOAN * duration, 'start_month': 1, 'start_year': 2025,
+        'participants': [f"Member {i + 1}" for i in range(size)], 'fruits': [f"fruit {i + 1}" for i in range(size)],
+        'manual_assignments': assignments, 'rules': "", 'has_loans': False, 'interest_rate': 5.0,
+        'loan_duration': 3, 'constraints': {},
+    }
+
+
+EDITS = {
+    'unchanged': lambda fields, i: None,
+    'rules edited': lambda fields, i: fields.update(rules=f"Rule revision {i}"),
+    'one member renamed': lambda fields, i: fields['participants'].__setitem__(0, f"Renamed {i}"),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--duration", type=int, default=24)
+    parser.add_argument("--rounds", type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"), cache_entries=0)
+        fields = make_fields(args.size, args.duration)
+        db.save_group("bench", **fields)
+        tracker = GroupTracker()
+        tracker.reset("bench", fields)
+
+        print(f"{args.size} members over {args.duration} months, {args.rounds} rounds")
+        for label, edit in EDITS.items():
+            full = tracked = 0.0
+            for i in range(args.rounds):
+                edit(fields, 2 * i)
+                t0 = time.perf_counter()
+                db.save_group("bench", **fields)
+                full += time.perf_counter() - t0
+                edit(fields, 2 * i + 1)
+                t0 = time.perf_counter()
+                persist_group(db, tracker, "bench", fields)
+                tracked += time.perf_counter() - t0
+            full, tracked = full / args.rounds, tracked / args.rounds
+            print(f"{label:<20} save_group {full * 1000:7.2f} ms   tracked {tracked * 1000:7.2f} ms "
+                  f"({full / tracked:.1f}x)")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Compare per-call sqlite3.connect against the pooled DatabaseManager.
+
+Simulates Streamlit reruns: every rerun lists the saved groups (sidebar),
+loads the current group and saves it back.
+
+    python benchmarks/bench_db.py --reruns 500
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.core import fruits_master  # noqa: E402
+from njangi.storage import DatabaseManager  # noqa: E402
+
+
+def _group(i, size=40):
+    return dict(
+        name=f"Group {i}", size=size, loan=5000, time=12, base=60000,
+        start_month=7, start_year=2025,
+        participants=[f"Member {k + 1}" for k in range(size)],
+        fruits=[fruits_master[k % len(fruits_master)] for k in range(size)],
+    )
+
+
+class LegacyDatabaseManager:
+    # The connect-per-call access pattern DatabaseManager used before pooling
+    def __init__(self, db_name):
+        self.db_name = db_name
+
+    def save_group(self, name, size, loan, time, base, start_month, start_year, participants, fruits):
+        conn = sqlite3.connect(self.db_name)
+        conn.execute('''
+            INSERT OR REPLACE INTO njangi_groups
+            (name, size, loan, time, base, start_month, start_year, participants, fruits, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (name, size, loan, time, base, start_month, start_year,
+              json.dumps(participants), json.dumps(fruits), datetime.now()))
+        conn.commit()
+        conn.close()
+
+    def load_group(self, name):
+        conn = sqlite3.connect(self.db_name)
+        row = conn.execute('SELECT * FROM njangi_groups WHERE name = ?', (name,)).fetchone()
+        conn.close()
+        return row
+
+    def get_all_groups(self):
+        conn = sqlite3.connect(self.db_name)
+        rows = conn.execute('SELECT name, created_at, updated_at FROM njangi_groups ORDER BY updated_at DESC').fetchall()
+        conn.close()
+        return rows
+
+
+def run_reruns(db, reruns, n_groups):
+    timings = {'get_all_groups': 0.0, 'load_group': 0.0, 'save_group': 0.0}
+    for r in range(reruns):
+        group = _group(r % n_groups)
+        t0 = time.perf_counter()
+        db.get_all_groups()
+        t1 = time.perf_counter()
+        db.load_group(group['name'])
+        t2 = time.perf_counter()
+        db.save_group(**group)
+        t3 = time.perf_counter()
+        timings['get_all_groups'] += t1 - t0
+        timings['load_group'] += t2 - t1
+        timings['save_group'] += t3 - t2
+    return {k: v / reruns * 1000 for k, v in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reruns', type=int, default=300)
+    parser.add_argument('--groups', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        pooled = DatabaseManager(db_path)
+        for i in range(args.groups):
+            pooled.save_group(**_group(i))
+        legacy = LegacyDatabaseManager(db_path)
+
+        results = {
+            'per-call connect': run_reruns(legacy, args.reruns, args.groups),
+            'pooled': run_reruns(pooled, args.reruns, args.groups),
+        }
+        pooled.close()
+
+    print(f"{'mode':<18}" + "".join(f"{op:>18}" for op in results['pooled']))
+    for mode, timings in results.items():
+        print(f"{mode:<18}" + "".join(f"{ms:>15.3f} ms" for ms in timings.values()))
+
+
+if __name__ == '__main__':
+    main()
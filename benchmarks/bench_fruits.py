@@ -0,0 +1,80 @@
+"""Per-rerun cost of the Participants tab fruit dropdowns at the maximum group size.
+
+Compares the list-scanning option building and cascade reassignment the tab
+used before with FruitAllocator. The default size is the largest group the
+tab allows outside large-group mode (one member per catalog fruit); larger
+sizes draw from the generated label namespace ("apple 2", ...).
+
+    python benchmarks/bench_fruits.py --reruns 50
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.core import FRUIT_CATALOG, FruitAllocator, fruit_label  # noqa: E402
+
+
+def legacy_options(fruits, catalog):
+    # One options list per row, rebuilt by scanning the catalog against a list
+    options = []
+    for i in range(len(fruits)):
+        fruits_assigned_before = fruits[:i]
+        options.append([fruit for fruit in catalog if fruit not in fruits_assigned_before])
+    return options
+
+
+def legacy_reassign(fruits, catalog, trigger_index, selected_fruit):
+    fruits[trigger_index] = selected_fruit
+    used_fruits = set(fruits[:trigger_index + 1])
+    remaining_fruits_master = [fruit for fruit in catalog if fruit not in used_fruits]
+    for i in range(trigger_index + 1, len(fruits)):
+        if fruits[i] in remaining_fruits_master:
+            remaining_fruits_master.remove(fruits[i])
+        elif remaining_fruits_master:
+            fruits[i] = remaining_fruits_master.pop(0)
+        else:
+            fruits[i] = None
+
+
+def allocator_options(allocator):
+    return [(allocator.options(i), allocator.option_index(i)) for i in range(len(allocator.fruits))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=50)
+    parser.add_argument("--size", type=int, default=len(FRUIT_CATALOG),
+                        help="Group size (default: the normal-mode maximum, one member per catalog fruit)")
+    args = parser.parse_args()
+    rng = random.Random(0)
+    size = args.size
+    catalog = [fruit_label(i) for i in range(max(size, len(FRUIT_CATALOG)))]
+
+    fruits = rng.sample(catalog, size)
+    t0 = time.perf_counter()
+    for _ in range(args.reruns):
+        legacy_options(fruits, catalog)
+        i = rng.randrange(size)
+        options = [f for f in catalog if f not in fruits[:i]]
+        legacy_reassign(fruits, catalog, i, rng.choice(options))
+    legacy = (time.perf_counter() - t0) / args.reruns
+
+    allocator = FruitAllocator(rng.sample(catalog, size), catalog)
+    t0 = time.perf_counter()
+    for _ in range(args.reruns):
+        allocator_options(allocator)
+        i = rng.randrange(size)
+        allocator.assign(i, rng.choice(allocator.options(i)))
+    pooled = (time.perf_counter() - t0) / args.reruns
+
+    print(f"size {size}, catalog {len(catalog)}")
+    print(f"list scanning   : {legacy * 1000:8.2f} ms per rerun")
+    print(f"FruitAllocator  : {pooled * 1000:8.2f} ms per rerun ({legacy / pooled:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Version history size and restore time for a group saved thousands of times.
+
+Saves one group repeatedly with a single change per save (a rename, a fruit,
+a locked month or the contribution), then reports the stored history against
+keeping a full JSON copy per version, the time each save spends recording its
+version, and the time to restore and diff random versions.
+
+    python benchmarks/bench_history.py --size 500 --saves 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.storage import DatabaseManager, snapshot_changes  # noqa: E402
+
+LOAN = 5000
+DURATION = 12
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=500)
+    parser.add_argument("--saves", type=int, default=2000)
+    parser.add_argument("--restores", type=int, default=200)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    size = args.size
+
+    participants = [f"Member {i + 1}" for i in range(size)]
+    fruits = [f"fruit {i + 1}" for i in range(size)]
+    locked = {f"month_{m}": [] for m in range(DURATION)}
+    loan = LOAN
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"), cache_entries=0)
+        recording = plain = 0.0
+        for n in range(args.saves):
+            change = rng.random()
+            if change < 0.6:
+                participants[rng.randrange(size)] = f"Renamed {n}"
+            elif change < 0.8:
+                fruits[rng.randrange(size)] = f"fruit {size + n}"
+            elif change < 0.95:
+                locked[f"month_{rng.randrange(DURATION)}"].append(rng.randrange(size))
+            else:
+                loan += 1000
+            t0 = time.perf_counter()
+            db.save_group("history", size, loan, DURATION, loan * DURATION, 1, 2025, participants, fruits, locked)
+            recording += time.perf_counter() - t0
+        # The same writes without a version to record: saving what is already stored
+        for _ in range(200):
+            t0 = time.perf_counter()
+            db.save_group("history", size, loan, DURATION, loan * DURATION, 1, 2025, participants, fruits, locked)
+            plain += time.perf_counter() - t0
+
+        history = db.group_history("history", limit=args.saves + 1)
+        latest = history[0][0]
+        stored = sum(row[3] for row in history)
+        full = len(json.dumps(db.load_snapshot("history", latest), separators=(',', ':')).encode("utf-8"))
+
+        versions = [rng.randint(1, latest) for _ in range(args.restores)]
+        t0 = time.perf_counter()
+        for version in versions:
+            db.load_snapshot("history", version)
+        restore = (time.perf_counter() - t0) / args.restores
+        current = db.load_snapshot("history", latest)
+        t0 = time.perf_counter()
+        for version in versions:
+            snapshot_changes(db.load_snapshot("history", version), current)
+        diff = (time.perf_counter() - t0) / args.restores
+        db.close()
+
+    print(f"{size} members, {args.saves} saves -> {latest} versions, "
+          f"{sum(1 for row in history if row[2])} checkpoints")
+    print(f"history stored       : {stored / 1024:10,.1f} KB")
+    print(f"full copy per version: {full * latest / 1024:10,.1f} KB ({full * latest / stored:.0f}x larger)")
+    print(f"save with a change   : {recording / args.saves * 1000:8.2f} ms "
+          f"(unchanged save: {plain / 200 * 1000:.2f} ms)")
+    print(f"restore any version  : {restore * 1000:8.2f} ms")
+    print(f"diff vs current      : {diff * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Members behind on contributions across all groups: materialized balances vs ledger replay.
+
+Fills a database with groups whose members have paid for a random number of
+months, then times DatabaseManager.members_behind against the same answer
+computed by summing every ledger row.
+
+    python benchmarks/bench_ledger.py --groups 500 --members 50
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.storage import DatabaseManager  # noqa: E402
+
+LOAN = 5000
+DURATION = 12
+REPLAY = '''
+    SELECT g.name, m.member_index, m.name, e.months - 1, g.loan * e.months,
+           COALESCE(SUM(CASE WHEN l.kind = 'contribution' THEN l.amount END), 0) AS paid
+    FROM (SELECT id, MIN(time, (? - start_year) * 12 + (? - start_month) + 1) AS months FROM njangi_groups) e
+    JOIN njangi_groups g ON g.id = e.id
+    JOIN njangi_members m ON m.group_id = g.id
+    LEFT JOIN njangi_ledger l ON l.group_id = m.group_id AND l.member_index = m.member_index
+    WHERE e.months > 0
+    GROUP BY g.id, m.member_index
+    HAVING paid < g.loan * e.months
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--groups", type=int, default=300)
+    parser.add_argument("--members", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    year, month = 2025, 12
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"), cache_entries=0)
+        names = [f"Member {i + 1}" for i in range(args.members)]
+        fruits = [f"fruit {i + 1}" for i in range(args.members)]
+        t0 = time.perf_counter()
+        entries = 0
+        for g in range(args.groups):
+            name = f"group {g:05d}"
+            db.save_group(name, args.members, LOAN, DURATION, LOAN * DURATION, 1, 2025, names, fruits)
+            rows = [(i, m, 'contribution', LOAN, None)
+                    for i in range(args.members) for m in range(rng.randint(9, 12))]
+            entries += db.record_ledger_entries(name, rows)
+        print(f"{args.groups} groups x {args.members} members, {entries:,} ledger entries "
+              f"(filled in {time.perf_counter() - t0:.1f}s)")
+
+        t0 = time.perf_counter()
+        for _ in range(args.queries):
+            behind = db.members_behind(year, month, limit=10 ** 9)
+        materialized = (time.perf_counter() - t0) / args.queries
+
+        t0 = time.perf_counter()
+        with db.pool.connection() as conn:
+            for _ in range(args.queries):
+                replayed = conn.execute(REPLAY, (year, month)).fetchall()
+        replay = (time.perf_counter() - t0) / args.queries
+        db.close()
+
+    assert len(behind) == len(replayed), (len(behind), len(replayed))
+    print(f"{len(behind):,} members behind")
+    print(f"ledger replay        : {replay * 1000:8.2f} ms")
+    print(f"materialized balances: {materialized * 1000:8.2f} ms ({replay / materialized:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
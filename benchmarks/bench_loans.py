@@ -0,0 +1,85 @@
+"""Cost of amortizing a group's loans: LoanBook versus one Python loop per loan.
+
+Builds a random book of loans (mixed simple, flat and reducing-balance terms
+up to --months long), amortizes it both ways and checks both agree on every
+borrower's total repayment.
+
+    python benchmarks/bench_loans.py --loans 500 --months 24
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.core import LOAN_METHODS, LoanBook  # noqa: E402
+
+
+def loop_schedule(loan):
+    # One loan, month by month: (payments, interest) in whole FCFA
+    p, n, r = loan['principal'], loan['term'], loan['annual_rate'] / 1200
+    payments, interest = [], []
+    if loan['method'] == 'simple':
+        payments = [0.0] * (n - 1) + [p + p * r * n]
+        interest = [0.0] * (n - 1) + [p * r * n]
+    elif loan['method'] == 'flat':
+        payments = [p / n + p * r] * n
+        interest = [p * r] * n
+    else:
+        annuity = p * r / (1 - (1 + r) ** -n) if r else p / n
+        balance = p
+        for _ in range(n):
+            payments.append(annuity)
+            interest.append(balance * r)
+            balance -= annuity - balance * r
+    return whole(payments), whole(interest)
+
+
+def whole(amounts):
+    rounded, total, previous = [], 0.0, 0
+    for amount in amounts:
+        total += amount
+        rounded.append(math.floor(total + 0.5) - previous)
+        previous = math.floor(total + 0.5)
+    return rounded
+
+
+def make_loans(count, months, seed=0):
+    rng = random.Random(seed)
+    return [{'member_index': i, 'principal': rng.randrange(10, 500) * 1000, 'annual_rate': rng.choice([0, 5, 10, 18]),
+             'term': rng.randint(1, months), 'method': rng.choice(LOAN_METHODS), 'month_index': rng.randrange(12)}
+            for i in range(count)]
+
+
+def best(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - t0)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--loans", type=int, default=500)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    loans = make_loans(args.loans, args.months)
+
+    looped, schedules = best(lambda: [loop_schedule(loan) for loan in loans], args.repeats)
+    batched, book = best(lambda: LoanBook(loans), args.repeats)
+    worst = max(abs(sum(payments) - int(book.repaid[i])) for i, (payments, _) in enumerate(schedules))
+
+    print(f"{args.loans} loans, terms up to {args.months} months")
+    print(f"per-loan loops : {looped * 1000:8.2f} ms")
+    print(f"LoanBook       : {batched * 1000:8.2f} ms ({looped / batched:.1f}x faster)")
+    print(f"largest difference in a borrower's total repayment: {worst} FCFA")
+
+
+if __name__ == "__main__":
+    main()
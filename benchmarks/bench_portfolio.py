@@ -0,0 +1,90 @@
+"""Portfolio dashboard: SQL aggregates over stored terms vs loading every group.
+
+Fills a database with groups, then times DatabaseManager.portfolio_months
+against the same per-month figures computed in Python from load_group and
+payout_counts. Portfolios where groups share standard terms collapse into few
+plans; --distinct gives every group its own terms (the worst case).
+
+    python benchmarks/bench_portfolio.py --groups 5000
+    python benchmarks/bench_portfolio.py --groups 5000 --distinct
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.core import payout_counts  # noqa: E402
+from njangi.storage import DatabaseManager  # noqa: E402
+
+STANDARD_TERMS = [(size, loan, duration) for size in (10, 12, 20, 24) for loan in (5000, 10000)
+                  for duration in (10, 12)]
+
+
+def python_portfolio(db):
+    # What a dashboard costs without SQL aggregates: decode every group
+    totals = {}
+    for name, _, _ in db.get_all_groups():
+        group = db.load_group(name)
+        size, loan, duration, base = group['size'], group['loan'], group['time'], group['base']
+        first = group['start_year'] * 12 + group['start_month'] - 1
+        paid = 0
+        for k, count in enumerate(payout_counts(size, loan, duration, base)):
+            paid += count
+            row = totals.setdefault(first + k, [0, 0, 0, 0, 0, 0])
+            row[0] += 1
+            row[1] += size
+            row[2] += size * loan
+            row[3] += count
+            row[4] += count * base
+            row[5] += (size - paid) * base
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--groups", type=int, default=2000)
+    parser.add_argument("--distinct", action="store_true", help="Give every group its own terms")
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"), cache_entries=0)
+        t0 = time.perf_counter()
+        for g in range(args.groups):
+            if args.distinct:
+                size, loan = rng.randint(10, 40), rng.randrange(1000, 20000, 500)
+                duration = rng.randint(6, min(size, 36))
+                base = loan * duration + rng.randrange(-1000, 1001, 500)
+            else:
+                size, loan, duration = rng.choice(STANDARD_TERMS)
+                base = loan * duration
+            names = [f"Member {i + 1}" for i in range(size)]
+            db.save_group(f"group {g:05d}", size, loan, duration, base, rng.randint(1, 12), rng.randint(2024, 2027),
+                          names, names)
+        print(f"{args.groups} {'distinct' if args.distinct else 'standard'}-term groups "
+              f"(filled in {time.perf_counter() - t0:.1f}s)")
+
+        t0 = time.perf_counter()
+        for _ in range(args.queries):
+            rows = db.portfolio_months()
+        sql = (time.perf_counter() - t0) / args.queries
+
+        t0 = time.perf_counter()
+        expected = python_portfolio(db)
+        python = time.perf_counter() - t0
+        db.close()
+
+    got = {year * 12 + month - 1: list(row) for year, month, *row in rows}
+    assert all(got[ym] == row for ym, row in expected.items()), "SQL and Python portfolios differ"
+    print(f"{len(rows)} months")
+    print(f"load_group + Python: {python * 1000:9.2f} ms")
+    print(f"portfolio_months   : {sql * 1000:9.2f} ms ({python / sql:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
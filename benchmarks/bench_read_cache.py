@@ -0,0 +1,85 @@
+"""Per-rerun cost of the group reads every Streamlit rerun repeats.
+
+Simulates reruns that list the sidebar page, count the groups and reload the
+current group and its stored schedule, with the read cache on and off. Every
+few reruns a second manager (standing in for another process) edits a group,
+so the numbers include cross-process invalidation.
+
+    python benchmarks/bench_read_cache.py --groups 500 --size 1000 --reruns 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.core import calculate_monthly_payouts  # noqa: E402
+from njangi.storage import DatabaseManager  # noqa: E402
+
+LOAN = 5000
+
+
+def populate(db, groups, size, duration):
+    participants = [f"Member {i + 1}" for i in range(size)]
+    fruits = [f"fruit {i + 1}" for i in range(size)]
+    payouts = calculate_monthly_payouts(size, LOAN, duration, LOAN * duration)
+    assignments, cursor = {}, 0
+    for month, count in enumerate(payouts):
+        assignments[f"month_{month}"] = list(range(cursor, cursor + count))
+        cursor += count
+    for g in range(groups):
+        name = f"group {g:05d}"
+        db.save_group(name, size, LOAN, duration, LOAN * duration, 1, 2025, participants, fruits, {})
+        db.save_schedule(name, "bench", g, assignments)
+
+
+def rerun(db, name):
+    db.get_groups_page("", None, 20)
+    db.count_groups()
+    db.load_group(name)
+    db.load_schedule(name)
+
+
+def measure(path, cache_entries, args):
+    db = DatabaseManager(path, cache_entries=cache_entries)
+    writer = DatabaseManager(path, cache_entries=0)
+    current = "group 00000"
+    t0 = time.perf_counter()
+    for i in range(args.reruns):
+        if args.write_every and i % args.write_every == args.write_every - 1:
+            writer.rename_member(f"group {i % args.groups:05d}", 0, f"Renamed {i}")
+        rerun(db, current)
+    elapsed = (time.perf_counter() - t0) / args.reruns
+    stats = db.read_cache.stats()
+    writer.close()
+    db.close()
+    return elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--groups", type=int, default=200)
+    parser.add_argument("--size", type=int, default=500)
+    parser.add_argument("--duration", type=int, default=24)
+    parser.add_argument("--reruns", type=int, default=200)
+    parser.add_argument("--write-every", type=int, default=20,
+                        help="Reruns between writes from another manager (0 disables)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        populate(DatabaseManager(path), args.groups, args.size, args.duration)
+        uncached, _ = measure(path, 0, args)
+        cached, stats = measure(path, 256, args)
+
+    print(f"{args.groups} groups of {args.size} members, {args.reruns} reruns, "
+          f"a foreign write every {args.write_every or 'never'}")
+    print(f"uncached reads : {uncached * 1000:8.2f} ms per rerun")
+    print(f"read cache     : {cached * 1000:8.2f} ms per rerun ({uncached / cached:.1f}x faster, "
+          f"{stats['hits']} hits / {stats['misses']} misses)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Several users requesting reports at once: inline rendering versus RenderQueue.
+
+Inline rendering is what the Generate tab did before: each request renders on
+its own script thread, one after another under the GIL. The queue renders in
+worker processes, and a request only costs the enqueue.
+
+    python benchmarks/bench_render_queue.py --requests 8 --size 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.core import Njangi  # noqa: E402
+from njangi.reports import RENDER_WORKERS, RenderQueue, render_payload  # noqa: E402
+from njangi.storage import DatabaseManager  # noqa: E402
+
+LOAN = 5000
+
+
+def make_njangi(i, size, duration):
+    return Njangi(size, LOAN, duration, participants=[f"Member {m + 1}" for m in range(size)],
+                  fruits=[f"fruit {m + 1}" for m in range(size)], name=f"group {i}", seed=i)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=8)
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--duration", type=int, default=24)
+    parser.add_argument("--workers", type=int, default=RENDER_WORKERS)
+    args = parser.parse_args()
+    groups = [make_njangi(i, args.size, args.duration) for i in range(args.requests)]
+
+    t0 = time.perf_counter()
+    for njangi in groups:
+        njangi.generate_pdf(start_month=1, start_year=2025)
+    inline = time.perf_counter() - t0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+        render_queue = RenderQueue(db, workers=args.workers)
+        # Spawning the workers is a one-off server start cost; keep it out of the timing
+        warm = render_queue.submit("warmup", "warmup", "warmup.pdf", render_payload(groups[0], 1, 2025))
+        while db.get_render_job(warm)['status'] in ('queued', 'running'):
+            time.sleep(0.05)
+
+        t0 = time.perf_counter()
+        jobs = [render_queue.submit(n.name, str(i), f"{i}.pdf", render_payload(n, 1, 2025)) for i, n in enumerate(groups)]
+        enqueue = time.perf_counter() - t0
+        while any(db.get_render_job(job)['status'] in ('queued', 'running') for job in jobs):
+            time.sleep(0.02)
+        queued = time.perf_counter() - t0
+        failed = [db.get_render_job(job)['error'] for job in jobs if db.get_render_job(job)['status'] != 'done']
+        render_queue.shutdown()
+        db.close()
+
+    print(f"{args.requests} concurrent requests, {args.size} members x {args.duration} months, "
+          f"{args.workers} worker(s)")
+    print(f"inline, back to back : {inline:7.2f} s until the last report, "
+          f"{inline / args.requests * 1000:7.0f} ms blocked per request on average")
+    print(f"render queue         : {queued:7.2f} s until the last report, "
+          f"{enqueue / args.requests * 1000:7.1f} ms blocked per request ({inline / queued:.1f}x throughput)")
+    if failed:
+        print(f"{len(failed)} job(s) failed: {failed[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Semi-automatic schedule solver timings for large constrained groups.
+
+Locks a third of every month, gives a fifth of the remaining members a
+constraint (window, preferred months or an apart partner) and times
+solve_assignments against the plain shuffle fill it replaced.
+
+    python benchmarks/bench_solver.py --sizes 1000 5000 --months 60
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.core import calculate_monthly_payouts, solve_assignments  # noqa: E402
+
+
+def shuffle_fill(size, payouts, locked):
+    # The fill semi-automatic mode used before: shuffle, then slice per month
+    assignments = {f"month_{m}": list(locked.get(f"month_{m}", [])) for m in range(len(payouts))}
+    assigned = {idx for members in assignments.values() for idx in members}
+    unassigned = [idx for idx in range(size) if idx not in assigned]
+    random.shuffle(unassigned)
+    for m in range(len(payouts)):
+        needed = payouts[m] - len(assignments[f"month_{m}"])
+        if needed > 0:
+            assignments[f"month_{m}"].extend(unassigned[:needed])
+            unassigned = unassigned[needed:]
+    return assignments
+
+
+def make_case(size, months, rng):
+    payouts = calculate_monthly_payouts(size, 5000, months, 5000 * months)
+    order = list(range(size))
+    rng.shuffle(order)
+    locked, cursor = {}, 0
+    for month, count in enumerate(payouts):
+        locked[f"month_{month}"] = order[cursor:cursor + count // 3]
+        cursor += count
+    taken = {idx for members in locked.values() for idx in members}
+    free = [idx for idx in range(size) if idx not in taken]
+    constraints = {}
+    for idx in rng.sample(free, len(free) // 5):
+        kind = rng.random()
+        if kind < 0.4:
+            constraints[idx] = {'not_before': rng.randrange(months // 2)}
+        elif kind < 0.7:
+            constraints[idx] = {'not_after': rng.randrange(months // 2, months)}
+        elif kind < 0.9:
+            constraints[idx] = {'prefer': rng.sample(range(months), 2)}
+        else:
+            partner = rng.choice(free)
+            if partner != idx:
+                constraints[idx] = {'apart': [partner]}
+    return payouts, locked, constraints
+
+
+def best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 2000, 5000])
+    parser.add_argument("--months", type=int, default=60)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    print(f"{'size':>6} {'months':>6} {'constraints':>11} {'shuffle':>10} {'solver':>10} {'no constraints':>15}")
+    for size in args.sizes:
+        months = min(args.months, size)
+        payouts, locked, constraints = make_case(size, months, random.Random(size))
+        shuffle = best_of(lambda: shuffle_fill(size, payouts, locked), args.repeats)
+        solved = best_of(lambda: solve_assignments(size, payouts, locked, constraints), args.repeats)
+        plain = best_of(lambda: solve_assignments(size, payouts, locked), args.repeats)
+        print(f"{size:>6} {months:>6} {len(constraints):>11} {shuffle * 1000:>7.1f} ms {solved * 1000:>7.1f} ms "
+              f"{plain * 1000:>12.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Cold-start import time of each entry point, with ReportLab loaded lazily.
+
+Every measurement imports the target in a fresh interpreter, so nothing is
+already in sys.modules. "eager" imports the UI and the PDF module together,
+which is what every start paid when app.py imported ReportLab at module load.
+
+    python benchmarks/bench_startup.py --repeats 5
+    python benchmarks/bench_startup.py --top 15     # also list the slowest imports of the UI
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = [
+    ("core", ["njangi.core"]),
+    ("CLI / app.py", ["app"]),
+    ("render worker", ["njangi.reports"]),
+    ("UI", ["njangi.ui"]),
+    ("eager (UI + PDF)", ["njangi.ui", "njangi.pdf"]),
+]
+
+PROBE = """
+import sys, time
+t0 = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - t0
+print(elapsed, len(sys.modules), 'reportlab' in sys.modules, 'streamlit' in sys.modules)
+"""
+
+
+def probe(modules):
+    out = subprocess.run([sys.executable, "-c", PROBE.format(modules=modules)], cwd=ROOT, env=dict(os.environ),
+                         capture_output=True, text=True, check=True).stdout.split()
+    return float(out[0]), int(out[1]), out[2] == "True", out[3] == "True"
+
+
+def slowest_imports(module, top):
+    # Top-level packages by cumulative time from `python -X importtime`
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not name.startswith(" ") and "." not in name:
+            rows.append((int(cumulative), name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="List the slowest top-level imports of the UI")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'entry point':<18} {'import':>10} {'modules':>8} {'reportlab':>10} {'streamlit':>10}")
+    for label, modules in TARGETS:
+        runs = [probe(modules) for _ in range(args.repeats)]
+        best = min(run[0] for run in runs)
+        _, count, reportlab, streamlit = runs[0]
+        results[label] = best
+        print(f"{label:<18} {best * 1000:>7.0f} ms {count:>8} {'yes' if reportlab else 'no':>10} "
+              f"{'yes' if streamlit else 'no':>10}")
+
+    saved = results["eager (UI + PDF)"] - results["UI"]
+    print(f"\nDeferring ReportLab saves {saved * 1000:.0f} ms "
+          f"({saved / results['eager (UI + PDF)']:.0%}) per UI start; the first PDF render pays it once.")
+    print(f"CLI and render workers start in {results['CLI / app.py'] * 1000:.0f} ms "
+          f"and {results['render worker'] * 1000:.0f} ms without Streamlit or ReportLab.")
+
+    if args.top:
+        print("\nSlowest imports of njangi.ui (cumulative):")
+        for cumulative, name in slowest_imports("njangi.ui", args.top):
+            print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Benchmark suite for the payout, persistence and PDF hot paths.
+
+Sweeps group sizes and durations, records wall time, peak memory and PDF
+size for each hot path, and compares the results against a stored
+baseline. No Streamlit server or network access is needed.
+
+    python benchmarks/suite.py                      # run and compare to baseline.json
+    python benchmarks/suite.py --save-baseline      # record a new baseline
+    python benchmarks/suite.py --sizes 10 100 --durations 12 --no-pdf
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from njangi.core import Njangi, PayoutSchedule, calculate_monthly_payouts  # noqa: E402
+from njangi.storage import DatabaseManager  # noqa: E402
+
+# Renders import ReportLab lazily; load it now so the first generate_pdf case times
+# rendering only (import cost is measured by bench_startup.py)
+importlib.import_module("njangi.pdf")
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SIZES = [10, 100, 500, 1000, 2000]
+FULL_SIZES = DEFAULT_SIZES + [5000]
+DEFAULT_DURATIONS = [12, 24, 60]
+LOAN = 5000
+# Absolute budgets checked on every run, baseline or not: {case: {path: {metric: limit}}}
+BUDGETS = {
+    "1000x60": {"generate_pdf": {"seconds": 3.0, "peak_kb": 48 * 1024}},
+}
+
+
+def measure(fn, min_time=0.2, max_repeats=5):
+    # Best wall time over a few repeats, then one extra run under tracemalloc for peak memory
+    best, elapsed, repeats, result = float("inf"), 0.0, 0, None
+    while repeats < max_repeats and (repeats == 0 or elapsed < min_time):
+        t0 = time.perf_counter()
+        result = fn()
+        dt = time.perf_counter() - t0
+        best = min(best, dt)
+        elapsed += dt
+        repeats += 1
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": best, "peak_kb": peak / 1024}, result
+
+
+def make_group(size, duration, seed=0):
+    rng = random.Random(seed)
+    participants = [f"Member {i + 1}" for i in range(size)]
+    fruits = [f"fruit {i + 1}" for i in range(size)]
+    payouts = calculate_monthly_payouts(size, LOAN, duration, LOAN * duration)
+    # Lock roughly half of every month's slots, like a typical semi-automatic group
+    order = list(range(size))
+    rng.shuffle(order)
+    locked, cursor = {}, 0
+    for month, count in enumerate(payouts):
+        take = count // 2
+        locked[f"month_{month}"] = order[cursor:cursor + take]
+        cursor += count
+    return participants, fruits, payouts, locked
+
+
+def bench_case(size, duration, db, include_pdf):
+    participants, fruits, payouts, locked = make_group(size, duration)
+    base = LOAN * duration
+    name = f"bench-{size}x{duration}"
+    case = {}
+
+    case["calculate_monthly_payouts"], _ = measure(
+        lambda: calculate_monthly_payouts(size, LOAN, duration, base))
+
+    njangi = Njangi(size, LOAN, duration, base, participants=participants, fruits=fruits, name=name,
+                    manual_assignments=locked, assignment_mode="semi-automatic")
+    random.seed(0)
+    case["semi_automatic_assign"], _ = measure(
+        lambda: njangi._semi_automatic_assign(payouts))
+
+    assignments = njangi._semi_automatic_assign(payouts)
+    case["payout_schedule"], _ = measure(
+        lambda: PayoutSchedule(size, LOAN, duration, base, assignments).rows(participants, fruits, 1, 2025))
+
+    def save():
+        return db.save_group(name, size, LOAN, duration, base, 1, 2025, participants, fruits, locked)
+    save()
+    case["save_group"], _ = measure(save)
+
+    renamed = list(participants)
+
+    def save_one_change():
+        renamed[0] = "Renamed" if renamed[0] != "Renamed" else "Member 1"
+        return db.save_group(name, size, LOAN, duration, base, 1, 2025, renamed, fruits, locked)
+    case["save_group_one_change"], _ = measure(save_one_change)
+
+    case["load_group"], _ = measure(lambda: db.load_group(name))
+
+    if include_pdf:
+        random.seed(0)
+        stats, pdf = measure(lambda: njangi.generate_pdf(start_month=1, start_year=2025), max_repeats=1)
+        stats["pdf_bytes"] = len(pdf)
+        case["generate_pdf"] = stats
+    return case
+
+
+def run(sizes, durations, pdf_max_size):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Uncached, so load_group keeps measuring the storage path (see bench_read_cache.py)
+        db = DatabaseManager(os.path.join(tmp, "bench.db"), cache_entries=0)
+        for size in sizes:
+            for duration in durations:
+                if size < duration:
+                    continue
+                key = f"{size}x{duration}"
+                print(f"  {key:<10}", end="", flush=True, file=sys.stderr)
+                t0 = time.perf_counter()
+                results[key] = bench_case(size, duration, db, size <= pdf_max_size)
+                print(f" {time.perf_counter() - t0:6.2f}s", file=sys.stderr)
+        db.close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    # Returns the rows that regressed beyond tolerance (time, memory or PDF size)
+    regressions = []
+    header = f"{'case':<10} {'path':<26} {'time':>11} {'vs base':>8} {'peak KB':>10} {'vs base':>8} {'PDF KB':>9}"
+    print(header)
+    print("-" * len(header))
+    for key, case in results.items():
+        for path, stats in case.items():
+            base = baseline.get(key, {}).get(path)
+            time_delta = mem_delta = ""
+            if base:
+                t_ratio = stats["seconds"] / base["seconds"] - 1 if base["seconds"] else 0.0
+                m_ratio = stats["peak_kb"] / base["peak_kb"] - 1 if base["peak_kb"] else 0.0
+                time_delta, mem_delta = f"{t_ratio:+.0%}", f"{m_ratio:+.0%}"
+                # Sub-millisecond timings are too noisy to gate on
+                if t_ratio > tolerance and stats["seconds"] > 0.001:
+                    regressions.append((key, path, "time", t_ratio))
+                if m_ratio > tolerance and stats["peak_kb"] > 64:
+                    regressions.append((key, path, "memory", m_ratio))
+                if "pdf_bytes" in base and stats.get("pdf_bytes", 0) > base["pdf_bytes"] * (1 + tolerance):
+                    regressions.append((key, path, "pdf size", stats["pdf_bytes"] / base["pdf_bytes"] - 1))
+            for metric, limit in BUDGETS.get(key, {}).get(path, {}).items():
+                if stats[metric] > limit:
+                    regressions.append((key, path, f"{metric} budget", stats[metric] / limit - 1))
+            pdf_kb = f"{stats['pdf_bytes'] / 1024:,.0f}" if "pdf_bytes" in stats else ""
+            print(f"{key:<10} {path:<26} {stats['seconds'] * 1000:>8.2f} ms {time_delta:>8} "
+                  f"{stats['peak_kb']:>10,.0f} {mem_delta:>8} {pdf_kb:>9}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+")
+    parser.add_argument("--durations", type=int, nargs="+", default=DEFAULT_DURATIONS)
+    parser.add_argument("--full", action="store_true", help="Include 5000-member groups")
+    parser.add_argument("--pdf-max-size", type=int, default=2000,
+                        help="Largest group size to render PDFs for")
+    parser.add_argument("--no-pdf", action="store_true")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--output", help="Also write the raw results as JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative slowdown / growth before flagging a regression")
+    args = parser.parse_args()
+
+    sizes = args.sizes or (FULL_SIZES if args.full else DEFAULT_SIZES)
+    pdf_max_size = -1 if args.no_pdf else args.pdf_max_size
+    print("Running benchmarks...", file=sys.stderr)
+    results = run(sizes, args.durations, pdf_max_size)
+    document = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "processor": platform.processor() or platform.machine()},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f).get("results", {})
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for key, path, metric, ratio in regressions:
+            print(f"  {key} {path}: {metric} {ratio:+.0%}")
+        return 1
+    if baseline:
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+# Njangi Group Manager. Modules, in dependency order:
+#   core     - domain logic (fruits, payout schedules, assignment solver, loans, Njangi)
+#   storage  - SQLite persistence (DatabaseManager) and bulk export/import
+#   reports  - report cache, background render jobs and batch rendering
+#   pdf      - ReportLab layout, imported on the first PDF render only
+#   ui       - the Streamlit app
+#   cli      - command line tools
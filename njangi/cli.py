@@ -0,0 +1,67 @@
+# Command line tools: bulk export/import and batch report rendering.
+import argparse
+import sys
+from datetime import datetime
+
+from .reports import generate_reports
+from .storage import DatabaseManager, groups_file_format
+
+def cli(argv):
+    parser = argparse.ArgumentParser(prog="app.py", description="Njangi Group Manager command line tools")
+    parser.add_argument("--db", default="njangi_groups.db", help="SQLite database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_cmd = commands.add_parser("export", help="Stream every saved group to a JSONL or CSV file")
+    export_cmd.add_argument("path", help="Output file (.jsonl or .csv), or - for stdout")
+    export_cmd.add_argument("--format", choices=["jsonl", "csv"])
+    import_cmd = commands.add_parser("import", help="Bulk-load groups from a JSONL or CSV export")
+    import_cmd.add_argument("path", help="Input file (.jsonl or .csv), or - for stdin")
+    import_cmd.add_argument("--format", choices=["jsonl", "csv"])
+    reports_cmd = commands.add_parser("reports", help="Render a PDF report for every saved group")
+    reports_cmd.add_argument("--out", default="reports", help="Output directory")
+    reports_cmd.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db)
+    if args.command == "reports":
+        def progress(done, total, elapsed):
+            rate = done / elapsed if elapsed else 0.0
+            print(f"\r[{done}/{total}] {rate:,.1f} reports/s", end="", file=sys.stderr, flush=True)
+        result = generate_reports(db, args.out, args.workers, progress)
+        print(file=sys.stderr)
+        for name, error in result['failed']:
+            print(f"  failed: {name}: {error}", file=sys.stderr)
+        rate = result['rendered'] / result['seconds'] if result['seconds'] else 0.0
+        print(f"Rendered {result['rendered']} report(s), {len(result['failed'])} failed, "
+              f"in {result['seconds']:.2f}s with {result['workers']} worker(s): "
+              f"{rate:,.1f} reports/s, {result['bytes'] / 1024 / 1024:,.1f} MB written to {args.out}",
+              file=sys.stderr)
+        db.close()
+        return 1 if result['failed'] else 0
+
+    fmt = args.format or groups_file_format(args.path)
+    started = datetime.now()
+    if args.command == "export":
+        if args.path == "-":
+            count = db.export_groups(sys.stdout, fmt)
+        else:
+            with open(args.path, "w", encoding="utf-8", newline="") as f:
+                count = db.export_groups(f, fmt)
+        verb = "Exported"
+    else:
+        try:
+            if args.path == "-":
+                count = db.import_groups_file(sys.stdin, fmt)
+            else:
+                with open(args.path, "r", encoding="utf-8", newline="") as f:
+                    count = db.import_groups_file(f, fmt)
+        except ValueError as e:
+            print(f"Import failed: {e}", file=sys.stderr)
+            db.close()
+            return 1
+        verb = "Imported"
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"{verb} {count} group(s) in {elapsed:.2f}s", file=sys.stderr)
+    db.close()
+    return 0
+
+CLI_COMMANDS = ("export", "import", "reports", "--db", "-h", "--help")
@@ -0,0 +1,1092 @@
+# Njangi domain logic: fruits, payout schedules, the assignment solver and loans.
+# Nothing here imports Streamlit, SQLite or ReportLab.
+import csv
+import hashlib
+import heapq
+import io
+import json
+import random
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+fruits_master = [
+    'ackee', 'apple', 'apricot', 'avocado', 'banana', 'baobab', 'black sapote',
+    'blackberry', 'blueberry', 'boysenberry', 'breadfruit', 'cantaloupe', 'carambola',
+    'cherimoya', 'cherry', 'clementine', 'coconut', 'cranberry', 'custard apple',
+    'date', 'dragonfruit', 'durian', 'elderberry', 'feijoa', 'fig', 'gooseberry',
+    'grapefruit', 'grape', 'guava', 'jackfruit', 'jambul', 'jostaberry', 'jujube',
+    'kiwi', 'kumquat', 'lemon', 'lime', 'lychee', 'longan', 'mandarin', 'mango',
+    'marula', 'melon', 'miracle fruit', 'monkey orange', 'nectarine', 'orange',
+    'papaya', 'passionfruit', 'peach', 'pear', 'persimmon', 'pineapple', 'plum',
+    'pomegranate', 'rambutan', 'raspberry', 'redcurrant', 'soursop', 'strawberry',
+    'starfruit', 'tamarind', 'tangerine', 'tomato', 'ugli fruit', 'watermelon',
+    'African pear', 'African bush pear', 'African star apple', 'bush mango', 'jackalberry',
+    'kei apple', 'waterberry', 'aput', 'bilberry', 'cloudberry', 'damson', 'honeyberry',
+    'huckleberry', 'lingonberry', 'mulberry', 'physalis', 'pitaya', 'pomelo', 'salak',
+    'sapodilla', 'santol', 'serviceberry', 'sloe', 'white currant', 'yuzu', 'jabuticaba',
+    'horned melon', 'cupuacu', 'elderberry', 'genip', 'guavaberry', 'imbe', 'langsat',
+    'loquat', 'mangosteen', 'mammee apple', 'nance', 'palm fruit', 'pequi', 'pitomba',
+    'pulasan', 'rose apple', 'safou', 'santol', 'sapote', 'sea buckthorn', 'tamarillo',
+    'tangelo', 'ugni', 'voavanga', 'yangmei', 'yumberry', 'ziziphus fruit','honeydew'
+]
+
+# fruits_master lists a few fruits twice; labels are drawn from the de-duplicated catalog
+FRUIT_CATALOG = list(dict.fromkeys(fruits_master))
+
+months = {
+    1: 'January', 2: 'February', 3: 'March', 4: 'April',
+    5: 'May', 6: 'June', 7: 'July', 8: 'August',
+    9: 'September', 10: 'October', 11: 'November', 12: 'December'
+}
+
+def fruit_label(index, catalog=FRUIT_CATALOG):
+    # Collision-free label namespace: the catalog first, then "<fruit> 2", "<fruit> 3", ...
+    fruit = catalog[index % len(catalog)]
+    return fruit if index < len(catalog) else f"{fruit} {index // len(catalog) + 1}"
+
+def fill_fruits(fruits, size):
+    # Truncates or pads fruits to size. Padding draws unused catalog fruits in random
+    # order, then unused generated labels once the catalog runs out.
+    current = list(fruits[:size])
+    needed = size - len(current)
+    if needed <= 0:
+        return current
+    used = set(current)
+    fresh = [fruit for fruit in FRUIT_CATALOG if fruit not in used]
+    random.shuffle(fresh)
+    fresh = fresh[:needed]
+    index = len(FRUIT_CATALOG)
+    while len(fresh) < needed:
+        label = fruit_label(index)
+        if label not in used:
+            fresh.append(label)
+        index += 1
+    return current + fresh
+
+def sample_fruits(size):
+    return fill_fruits([], size)
+
+class FruitAllocator:
+    # Keeps the fruits in use and the free catalog fruits in hashed structures so
+    # that changing one member's fruit is O(1). The catalog-ordered list of free
+    # fruits is rebuilt lazily, at most once per change, and shared by every row.
+    def __init__(self, fruits, catalog=None):
+        self.catalog = list(catalog if catalog is not None else FRUIT_CATALOG)
+        self._rank = {fruit: i for i, fruit in enumerate(self.catalog)}
+        self._owner = {}
+        self._free = set(self.catalog)
+        self._free_sorted = None
+        self.fruits = []
+        for fruit in fruits:
+            self.fruits.append(None)
+            self._take(len(self.fruits) - 1, fruit if fruit not in self._owner else None)
+        # Duplicates and blanks get the first free fruits, as the per-row dropdowns did
+        for i, fruit in enumerate(self.fruits):
+            if fruit is None and self._free:
+                self._take(i, self.free()[0])
+
+    def _take(self, index, fruit):
+        if fruit is None:
+            return
+        self._owner[fruit] = index
+        self._free.discard(fruit)
+        self.fruits[index] = fruit
+        self._free_sorted = None
+
+    def _release(self, index):
+        fruit = self.fruits[index]
+        if fruit is None:
+            return
+        if self._owner.get(fruit) == index:
+            del self._owner[fruit]
+            if fruit in self._rank:
+                self._free.add(fruit)
+        self.fruits[index] = None
+        self._free_sorted = None
+
+    def free(self):
+        if self._free_sorted is None:
+            self._free_sorted = sorted(self._free, key=self._rank.__getitem__)
+        return self._free_sorted
+
+    def owner(self, fruit):
+        return self._owner.get(fruit)
+
+    def option_index(self, index):
+        # Position of the row's own fruit within options(index), found by bisection
+        free = self.free()
+        rank = self._rank.get(self.fruits[index])
+        if rank is None:
+            return len(free)
+        lo, hi = 0, len(free)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._rank[free[mid]] < rank:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def options(self, index):
+        # The free fruits plus the row's own fruit at its catalog position
+        free = self.free()
+        current = self.fruits[index]
+        if current is None:
+            return list(free)
+        position = self.option_index(index)
+        return free[:position] + [current] + free[position:]
+
+    def assign(self, index, fruit):
+        # Gives fruit to member index; if another member holds it they swap fruits
+        old = self.fruits[index]
+        if fruit == old:
+            return
+        holder = self._owner.get(fruit)
+        self._release(index)
+        if holder is not None:
+            self.fruits[holder] = None
+            self._take(holder, old)
+        self._take(index, fruit)
+
+    def resize(self, size):
+        for index in range(size, len(self.fruits)):
+            self._release(index)
+        del self.fruits[size:]
+        missing = size - len(self.fruits)
+        if missing <= 0:
+            return
+        extra = random.sample(self.free(), min(missing, len(self._free)))
+        label_index = len(self.catalog)
+        while len(extra) < missing:
+            label = fruit_label(label_index, self.catalog)
+            if label not in self._owner:
+                extra.append(label)
+            label_index += 1
+        for fruit in extra:
+            self.fruits.append(None)
+            self._take(len(self.fruits) - 1, fruit)
+
+class AssignmentState:
+    # Index over manual_assignments for the Assignment tab. The month lists stay
+    # the single source of truth (they are what gets saved and rendered); alongside
+    # them we keep member -> month, per-month counts and a display-name index, and
+    # update all of them on every add/remove so validity is a counter check.
+    def __init__(self, manual_assignments, payouts, participants):
+        self.assignments = manual_assignments
+        self.payouts = list(payouts)
+        self.size = len(participants)
+        self.month_of = [None] * self.size
+        self.counts = [0] * len(self.payouts)
+        self._refs = [0] * self.size
+        self._unassigned = set(range(self.size))
+        self.overfilled = 0
+        self.duplicates = 0
+        self._available = None
+        self.set_names(participants)
+        for month in range(len(self.payouts)):
+            members = self.assignments.setdefault(f"month_{month}", [])
+            # Indices left over from a larger group cannot be shown or rendered
+            members[:] = [idx for idx in members if 0 <= idx < self.size]
+            for idx in members:
+                self._link(month, idx)
+
+    def set_names(self, participants):
+        participants = list(participants)
+        if getattr(self, '_names', None) == participants:
+            return
+        self._names = participants
+        self.display_names = []
+        name_count = {}
+        for name in participants:
+            name_count[name] = name_count.get(name, 0) + 1
+            self.display_names.append(f"{name} [{name_count[name]}]")
+        self._by_display = {display: idx for idx, display in enumerate(self.display_names)}
+        self._available = None
+
+    def _link(self, month, idx):
+        if self.counts[month] == self.payouts[month]:
+            self.overfilled += 1
+        self.counts[month] += 1
+        if self._refs[idx]:
+            self.duplicates += 1
+        else:
+            self._unassigned.discard(idx)
+        self._refs[idx] += 1
+        self.month_of[idx] = month
+        self._available = None
+
+    def _unlink(self, month, idx):
+        self.counts[month] -= 1
+        if self.counts[month] == self.payouts[month]:
+            self.overfilled -= 1
+        self._refs[idx] -= 1
+        if self._refs[idx]:
+            self.duplicates -= 1
+        else:
+            self._unassigned.add(idx)
+            self.month_of[idx] = None
+        self._available = None
+
+    def members(self, month):
+        return self.assignments[f"month_{month}"]
+
+    def remaining(self, month):
+        return self.payouts[month] - self.counts[month]
+
+    @property
+    def assigned_count(self):
+        return self.size - len(self._unassigned)
+
+    def unassigned(self):
+        return sorted(self._unassigned)
+
+    def available_display(self):
+        # Display names of everyone not yet assigned, sorted once and shared by every month
+        if self._available is None:
+            self._available = sorted(self.display_names[idx] for idx in self._unassigned)
+        return self._available
+
+    def index_of(self, display_name):
+        return self._by_display.get(display_name)
+
+    def add(self, month, indices):
+        # Assigns unassigned members to month; returns False if it would overfill it
+        indices = [idx for idx in dict.fromkeys(indices) if idx is not None and idx in self._unassigned]
+        if len(indices) > self.remaining(month):
+            return False
+        self.members(month).extend(indices)
+        for idx in indices:
+            self._link(month, idx)
+        return True
+
+    def lock(self, month, display_names):
+        return self.add(month, [self.index_of(display) for display in display_names])
+
+    def remove(self, month, position):
+        idx = self.members(month).pop(position)
+        self._unlink(month, idx)
+
+    def fill_remaining(self):
+        remaining = self.unassigned()
+        random.shuffle(remaining)
+        for month in range(len(self.payouts)):
+            needed = self.remaining(month)
+            if needed > 0 and remaining:
+                self.add(month, remaining[:needed])
+                remaining = remaining[needed:]
+
+    def clear(self):
+        for month in range(len(self.payouts)):
+            members = self.members(month)
+            while members:
+                self.remove(month, len(members) - 1)
+
+    def is_valid(self, complete=False):
+        if self.overfilled or self.duplicates:
+            return False
+        return not complete or not self._unassigned
+
+CONSTRAINT_KINDS = ('not_before', 'not_after', 'prefer', 'apart')
+
+class InfeasibleScheduleError(ValueError):
+    def __init__(self, reasons):
+        self.reasons = list(reasons)
+        super().__init__("; ".join(self.reasons))
+
+def normalize_constraints(constraints):
+    # {member_index: {'not_before': m, 'not_after': m, 'prefer': [m, ...], 'apart': [idx, ...]}}
+    # with 0-based schedule months; JSON round trips turn the keys into strings.
+    normalized = {}
+    for idx, rules in (constraints or {}).items():
+        entry = {}
+        for kind in ('not_before', 'not_after'):
+            if rules.get(kind) is not None:
+                entry[kind] = int(rules[kind])
+        for kind in ('prefer', 'apart'):
+            values = sorted({int(value) for value in rules.get(kind) or []})
+            if values:
+                entry[kind] = values
+        if entry:
+            normalized[int(idx)] = entry
+    return normalized
+
+def constraint_rows(constraints):
+    # Flattens constraints into (member_index, kind, value) rows for storage
+    rows = []
+    for idx, rules in normalize_constraints(constraints).items():
+        for kind in CONSTRAINT_KINDS:
+            values = rules.get(kind)
+            if values is None:
+                continue
+            for value in values if isinstance(values, list) else [values]:
+                rows.append((idx, kind, value))
+    return rows
+
+def schedule_slot_rows(assignments):
+    # (member_index, month_index, position) rows for a {month_k: [member, ...]} schedule
+    return [(int(member_index), int(key.split('_')[1]), position)
+            for key, members in assignments.items() for position, member_index in enumerate(members)]
+
+def schedule_from_rows(rows):
+    # Rows are (schedule_key, seed, month_index, member_index), one per slot
+    if not rows:
+        return None
+    schedule = {'key': rows[0][0], 'seed': rows[0][1], 'assignments': {}}
+    for _, _, month_index, member_index in rows:
+        if month_index is not None:
+            schedule['assignments'].setdefault(f"month_{month_index}", []).append(member_index)
+    return schedule
+
+def constraints_from_rows(rows):
+    constraints = {}
+    for idx, kind, value in rows:
+        rules = constraints.setdefault(idx, {})
+        if kind in ('prefer', 'apart'):
+            rules.setdefault(kind, []).append(value)
+        else:
+            rules[kind] = value
+    return constraints
+
+def _min_cost_flow(graph, source, sink, demand):
+    # Primal-dual min-cost flow: Dijkstra on reduced costs sets the potentials,
+    # then every path of zero reduced cost is augmented before the next Dijkstra.
+    # graph[u] holds [to, capacity, cost, reverse position] edges and is left as
+    # the residual graph.
+    node_count = len(graph)
+    potential = [0] * node_count
+    flow = 0
+    while flow < demand:
+        dist = [None] * node_count
+        dist[source] = 0
+        heap = [(0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for v, capacity, cost, _ in graph[u]:
+                if capacity > 0:
+                    nd = d + cost + potential[u] - potential[v]
+                    if dist[v] is None or nd < dist[v]:
+                        dist[v] = nd
+                        heapq.heappush(heap, (nd, v))
+        if dist[sink] is None:
+            break
+        for v in range(node_count):
+            if dist[v] is not None:
+                potential[v] += dist[v]
+        while flow < demand:
+            # Depth-first search for an augmenting path over zero reduced-cost edges
+            prev, stack = {source: None}, [source]
+            while stack and sink not in prev:
+                u = stack.pop()
+                for position, (v, capacity, cost, _) in enumerate(graph[u]):
+                    if capacity > 0 and v not in prev and cost + potential[u] - potential[v] == 0:
+                        prev[v] = (u, position)
+                        stack.append(v)
+            if sink not in prev:
+                break
+            push, v = demand - flow, sink
+            while v != source:
+                u, position = prev[v]
+                push = min(push, graph[u][position][1])
+                v = u
+            v = sink
+            while v != source:
+                u, position = prev[v]
+                edge = graph[u][position]
+                edge[1] -= push
+                graph[v][edge[3]][1] += push
+                v = u
+            flow += push
+    return flow
+
+def _month_list(month_indices):
+    return ", ".join(str(m + 1) for m in sorted(month_indices))
+
+def solve_assignments(size, payouts, locked=None, constraints=None, names=None, rng=random):
+    # Fills the slots left after locked members with everyone else while keeping
+    # each member inside their not_before/not_after window, away from the members
+    # they must be apart from, and in a preferred month where possible.
+    # Members sharing a window and preferences are interchangeable, so the
+    # min-cost flow runs over those classes rather than individual members.
+    months = len(payouts)
+    constraints = normalize_constraints(constraints)
+    locked = locked or {}
+    assignments = {f"month_{m}": [idx for idx in locked.get(f"month_{m}", []) if 0 <= idx < size]
+                   for m in range(months)}
+
+    def label(idx):
+        return names[idx] if names and idx < len(names) else f"Participant {idx + 1}"
+
+    def window(idx):
+        rules = constraints.get(idx, {})
+        return max(0, rules.get('not_before', 0)), min(months - 1, rules.get('not_after', months - 1))
+
+    reasons = []
+    month_of = [None] * size
+    for m in range(months):
+        members = assignments[f"month_{m}"]
+        if len(members) > payouts[m]:
+            reasons.append(f"Month {m + 1} has {len(members)} locked participants but pays out to only {payouts[m]}")
+        for idx in members:
+            if month_of[idx] is not None:
+                reasons.append(f"{label(idx)} is locked to more than one month")
+            month_of[idx] = m
+    clashing = set()
+    for idx, rules in constraints.items():
+        if idx >= size:
+            continue
+        lo, hi = window(idx)
+        if lo > hi:
+            reasons.append(f"{label(idx)} has no allowed month (not before {lo + 1}, not after {hi + 1})")
+        elif month_of[idx] is not None and not lo <= month_of[idx] <= hi:
+            reasons.append(f"{label(idx)} is locked to month {month_of[idx] + 1}, outside months {lo + 1}-{hi + 1}")
+        for other in rules.get('apart', []):
+            if other == idx or other >= size or month_of[idx] is None or month_of[idx] != month_of[other]:
+                continue
+            if frozenset((idx, other)) not in clashing:
+                clashing.add(frozenset((idx, other)))
+                reasons.append(f"{label(idx)} and {label(other)} must be apart but are both locked to month {month_of[idx] + 1}")
+    if reasons:
+        raise InfeasibleScheduleError(reasons)
+
+    # Unconstrained members fit anywhere, so they only need the total to add up
+    # and take whatever slots the flow leaves over
+    anyone = [idx for idx in range(size) if month_of[idx] is None and idx not in constraints]
+    classes = {}
+    for idx in sorted(constraints):
+        if idx < size and month_of[idx] is None:
+            lo, hi = window(idx)
+            prefer = frozenset(m for m in constraints[idx].get('prefer', []) if lo <= m <= hi)
+            classes.setdefault((lo, hi, prefer), []).append(idx)
+    anyone += classes.pop((0, months - 1, frozenset()), [])
+    free = [payouts[m] - len(assignments[f"month_{m}"]) for m in range(months)]
+    waiting = sum(len(members) for members in classes.values()) + len(anyone)
+    if waiting > sum(free):
+        raise InfeasibleScheduleError([
+            f"{waiting} participant(s) still need a month but only {sum(free)} slot(s) are free"
+        ])
+    keys = list(classes)
+    source, sink = 0, len(keys) + months + 1
+    graph = [[] for _ in range(sink + 1)]
+
+    def add_edge(u, v, capacity, cost):
+        graph[u].append([v, capacity, cost, len(graph[v])])
+        graph[v].append([u, 0, -cost, len(graph[u]) - 1])
+        return graph[u][-1]
+
+    class_edges = []
+    for k, (lo, hi, prefer) in enumerate(keys, start=1):
+        count = len(classes[keys[k - 1]])
+        add_edge(source, k, count, 0)
+        for m in range(lo, hi + 1):
+            class_edges.append((k - 1, m, count, add_edge(k, len(keys) + 1 + m, count, 0 if m in prefer or not prefer else 1)))
+    for m in range(months):
+        if free[m] > 0:
+            add_edge(len(keys) + 1 + m, sink, free[m], 0)
+    demand = sum(len(members) for members in classes.values())
+    if _min_cost_flow(graph, source, sink, demand) < demand:
+        # Everything still reachable from the source is the over-constrained part
+        # (Hall's condition): those members only fit in months that are already full.
+        reachable, stack = {source}, [source]
+        while stack:
+            u = stack.pop()
+            for v, capacity, _, _ in graph[u]:
+                if capacity > 0 and v not in reachable:
+                    reachable.add(v)
+                    stack.append(v)
+        stuck = [idx for k, key in enumerate(keys, start=1) if k in reachable for idx in classes[key]]
+        full = [m for m in range(months) if len(keys) + 1 + m in reachable]
+        who = ", ".join(label(idx) for idx in stuck[:5]) + (f" and {len(stuck) - 5} more" if len(stuck) > 5 else "")
+        raise InfeasibleScheduleError([
+            f"{len(stuck)} participant(s) ({who}) can only be paid in month(s) {_month_list(full)}, "
+            f"which have {sum(free[m] for m in full)} free slot(s)"
+        ])
+
+    slots = {}
+    for k, m, capacity, edge in class_edges:
+        if capacity - edge[1]:
+            slots.setdefault(k, {})[m] = capacity - edge[1]
+            free[m] -= capacity - edge[1]
+    if anyone:
+        keys.append(None)
+        classes[None] = anyone
+        slots[len(keys) - 1] = {m: free[m] for m in range(months) if free[m] > 0}
+    partners = {}
+    for idx, rules in constraints.items():
+        for other in rules.get('apart', []):
+            if idx < size and other < size and other != idx:
+                partners.setdefault(idx, set()).add(other)
+                partners.setdefault(other, set()).add(idx)
+    for k, key in enumerate(keys):
+        members = classes[key]
+        rng.shuffle(members)
+        counts = slots.get(k, {})
+        # Members with apart constraints pick first, skipping their partners' months
+        for idx in sorted(members, key=lambda i: i not in partners):
+            if idx not in partners:
+                break
+            taken = {month_of[other] for other in partners[idx]}
+            choice = next((m for m, n in counts.items() if n and m not in taken), None)
+            if choice is None:
+                choice = next(m for m, n in counts.items() if n)
+            counts[choice] -= 1
+            month_of[idx] = choice
+            assignments[f"month_{choice}"].append(idx)
+        rest = [idx for idx in members if month_of[idx] is None] if partners else members
+        cursor = 0
+        for m, n in counts.items():
+            chunk = rest[cursor:cursor + n]
+            assignments[f"month_{m}"].extend(chunk)
+            if partners:
+                for idx in chunk:
+                    month_of[idx] = m
+            cursor += n
+
+    if not partners:
+        return assignments
+    locked_members = {idx for m in range(months) for idx in locked.get(f"month_{m}", [])}
+    for idx in sorted(partners):
+        clash = next((other for other in partners[idx] if month_of[other] == month_of[idx]), None)
+        if clash is None:
+            continue
+        movable = [member for member in (idx, clash) if member not in locked_members]
+        if not any(_swap_apart(member, assignments, month_of, partners, locked_members, window, payouts)
+                   for member in movable):
+            break
+    else:
+        return assignments
+
+    # The one-step repairs ran out: search months for everyone with an apart rule,
+    # then let the flow place the rest around them as if they were locked
+    pinned = {f"month_{m}": [idx for idx in locked.get(f"month_{m}", []) if 0 <= idx < size] for m in range(months)}
+    placed = _search_apart(size, payouts, pinned, partners, window, constraints, rng)
+    pairs = sum(len(others) for others in partners.values()) // 2
+    if placed is None:
+        raise InfeasibleScheduleError([
+            f"No schedule keeps all {pairs} 'apart' pair(s) in different months with the slots available"
+        ])
+    if placed is False:
+        raise InfeasibleScheduleError([
+            f"Gave up after {APART_SEARCH_LIMIT:,} tries looking for a schedule that keeps all {pairs} "
+            "'apart' pair(s) in different months; try locking some of those participants"
+        ])
+    for idx, m in placed.items():
+        pinned[f"month_{m}"].append(idx)
+    return solve_assignments(size, payouts, pinned, constraints, names, rng)
+
+# Months tried by _search_apart before it gives up
+APART_SEARCH_LIMIT = 200000
+
+def _fits(windows, free):
+    # Whether members with these (lo, hi) month windows fit the free slots:
+    # filling each month with the waiting members whose windows close first is exact
+    windows = sorted(windows)
+    waiting, cursor = [], 0
+    for m, slots in enumerate(free):
+        while cursor < len(windows) and windows[cursor][0] <= m:
+            heapq.heappush(waiting, windows[cursor][1])
+            cursor += 1
+        for _ in range(min(slots, len(waiting))):
+            heapq.heappop(waiting)
+        if waiting and waiting[0] <= m:
+            return False
+    return not waiting and cursor == len(windows)
+
+def _search_apart(size, payouts, pinned, partners, window, constraints, rng):
+    # Backtracking over the unlocked members with apart rules, most constrained
+    # first, pruned whenever the members still waiting could no longer fit their
+    # windows. Returns {member: month}, None if no schedule exists, or False once
+    # APART_SEARCH_LIMIT months have been tried.
+    month_at = {idx: m for m in range(len(payouts)) for idx in pinned[f"month_{m}"]}
+    free = [payouts[m] - len(pinned[f"month_{m}"]) for m in range(len(payouts))]
+    members = [idx for idx in sorted(partners) if idx not in month_at]
+    others = [window(idx) for idx in range(size) if idx not in month_at and idx not in partners]
+
+    def candidates(idx):
+        lo, hi = window(idx)
+        taken = {month_at.get(other) for other in partners[idx]}
+        months = [m for m in range(lo, hi + 1) if free[m] > 0 and m not in taken]
+        rng.shuffle(months)
+        prefer = set(constraints.get(idx, {}).get('prefer', []))
+        return sorted(months, key=lambda m: m not in prefer)
+
+    def fits():
+        return _fits(others + [window(idx) for idx in members if idx not in month_at], free)
+
+    if not fits():
+        return None
+    stack, tries = [], 0
+    while True:
+        waiting = [idx for idx in members if idx not in month_at]
+        if not waiting:
+            return {idx: month_at[idx] for idx in members}
+        options = {idx: candidates(idx) for idx in waiting}
+        idx = min(waiting, key=lambda i: (len(options[i]), -len(partners[i])))
+        stack.append((idx, iter(options[idx])))
+        while stack:
+            idx, months = stack[-1]
+            if idx in month_at:
+                free[month_at.pop(idx)] += 1
+            m = next(months, None)
+            if m is None:
+                stack.pop()
+                continue
+            month_at[idx] = m
+            free[m] -= 1
+            tries += 1
+            if tries > APART_SEARCH_LIMIT:
+                return False
+            if fits():
+                break
+        if not stack:
+            return None
+
+def _swap_apart(idx, assignments, month_of, partners, locked_members, window, payouts):
+    # Moves idx out of its month, into a free slot or by swapping with a member
+    # elsewhere whose window allows idx's month and who has no partner left there
+    current = month_of[idx]
+    lo, hi = window(idx)
+    for m in range(lo, hi + 1):
+        if m == current:
+            continue
+        blockers = {other for other in partners[idx] if month_of[other] == m}
+        if not blockers and len(assignments[f"month_{m}"]) < payouts[m]:
+            assignments[f"month_{current}"].remove(idx)
+            assignments[f"month_{m}"].append(idx)
+            month_of[idx] = m
+            return True
+        for other in assignments[f"month_{m}"]:
+            other_lo, other_hi = window(other)
+            if other in locked_members or not other_lo <= current <= other_hi or blockers - {other}:
+                continue
+            if any(month_of[p] == current and p != idx for p in partners.get(other, ())):
+                continue
+            assignments[f"month_{current}"].remove(idx)
+            assignments[f"month_{m}"].remove(other)
+            assignments[f"month_{current}"].append(other)
+            assignments[f"month_{m}"].append(idx)
+            month_of[idx], month_of[other] = m, current
+            return True
+    return False
+
+def parse_roster(text):
+    # One member per line, optionally "name,fruit"; a leading header row is skipped
+    rows = [row for row in csv.reader(io.StringIO(text)) if row and row[0].strip()]
+    if rows and rows[0][0].strip().lower() in ('name', 'names', 'participant', 'member'):
+        rows = rows[1:]
+    names = [row[0].strip() for row in rows]
+    fruits = [row[1].strip() if len(row) > 1 and row[1].strip() else None for row in rows]
+    return names, fruits
+
+# Loan repayment methods, see LoanBook
+LOAN_METHODS = ('simple', 'flat', 'reducing')
+
+LOAN_METHOD_LABELS = {'simple': 'Simple (repaid at the end)', 'flat': 'Flat rate', 'reducing': 'Reducing balance'}
+
+def cycle_month(start_month, start_year, year, month):
+    # 0-based cycle month of a calendar month (negative before the cycle starts)
+    return (year - start_year) * 12 + (month - start_month)
+
+# Bump when the PDF layout changes so cached reports are not reused
+REPORT_VERSION = 4
+
+def input_key(kind, **inputs):
+    # SHA-256 of a report's (or schedule's) inputs; keys the report cache and stored schedules
+    payload = json.dumps({'kind': kind, 'version': REPORT_VERSION, 'inputs': inputs},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+@lru_cache(maxsize=1024)
+def payout_counts(size, loan, time, base):
+    # People paid each month: whatever the collected pot plus the carried residue
+    # covers, with everyone still unpaid taking the last month
+    counts, residue, remaining = [], 0, size
+    for i in range(time):
+        available = size * loan + residue
+        if i == time - 1:
+            cnt = remaining
+        else:
+            cnt = min(available // base, remaining)
+            residue = available - cnt * base
+        counts.append(cnt)
+        remaining -= cnt
+    return tuple(counts)
+
+def calculate_monthly_payouts(size, loan, time, base):
+    return list(payout_counts(size, loan, time, base))
+
+def month_label(start_month, start_year, i, short=True):
+    month_idx = (start_month + i - 1) % 12 + 1
+    year = start_year + ((start_month + i - 1) // 12)
+    return f"{months[month_idx][:3]}-{year}" if short else f"{months[month_idx]} {year}"
+
+class PayoutSchedule:
+    # Read-only, array-backed payout schedule: one int64 array per column and the
+    # paid members as one flat array sliced by per-month offsets. Without
+    # assignments it holds only the planned counts (members is empty).
+    def __init__(self, size, loan, time, base, assignments=None):
+        self.size, self.loan, self.time, self.base = size, loan, time, base
+        self.planned = np.array(payout_counts(size, loan, time, base), dtype=np.int64)
+        if assignments is None:
+            self.counts = self.planned.copy()
+            self.order = np.empty(0, dtype=np.int64)
+        else:
+            per_month = [[idx for idx in assignments.get(f"month_{i}", []) if 0 <= idx < size] for i in range(time)]
+            self.counts = np.array([len(members) for members in per_month], dtype=np.int64)
+            self.order = np.fromiter((idx for members in per_month for idx in members), dtype=np.int64,
+                                     count=int(self.counts.sum()))
+        self.offsets = np.concatenate(([0], np.cumsum(self.counts)))
+        self.collected = np.full(time, size * loan, dtype=np.int64)
+        # residue_i = (i + 1) * collected - base * (paid up to month i); the last month closes at zero
+        self.residue = np.cumsum(self.collected) - base * self.offsets[1:]
+        if time:
+            self.residue[-1] = 0
+        self.available = self.collected + np.concatenate(([0], self.residue[:-1]))
+        for array in (self.planned, self.counts, self.order, self.offsets, self.collected, self.residue, self.available):
+            array.setflags(write=False)
+
+    def members(self, i):
+        return self.order[self.offsets[i]:self.offsets[i + 1]]
+
+    def month_of(self):
+        # Month index per member, -1 for members without a month
+        month_of = np.full(self.size, -1, dtype=np.int64)
+        month_of[self.order] = np.repeat(np.arange(self.time), self.counts)
+        return month_of
+
+    def as_assignments(self):
+        return {f"month_{i}": self.members(i).tolist() for i in range(self.time)}
+
+    def is_complete(self):
+        return len(self.order) == self.size and len(np.unique(self.order)) == self.size
+
+    def overfilled_months(self):
+        return np.flatnonzero(self.counts > self.planned).tolist()
+
+    def rows(self, people, fruits, start_month, start_year, names_shown=3):
+        # Payout Schedule table rows for the PDF: members listed by fruit, first few names only
+        rows = []
+        for i in range(self.time):
+            paid = sorted(self.members(i).tolist(), key=lambda idx: fruits[idx])
+            names = ", ".join(people[idx] for idx in paid[:names_shown]) + (", ..." if len(paid) > names_shown else "")
+            rows.append([
+                str(i + 1), month_label(start_month, start_year, i),
+                f"{self.collected[i]:,}", f"{self.available[i]:,}", f"{self.residue[i]:,}",
+                str(self.counts[i]), names
+            ])
+        return rows
+
+def schedule_inputs(size, loan, time, base, assignments=None):
+    # Hashable form of everything a PayoutSchedule is built from
+    frozen = None if assignments is None else tuple(
+        tuple(assignments.get(f"month_{i}", ())) for i in range(time))
+    return size, loan, time, base, frozen
+
+@lru_cache(maxsize=64)
+def _cached_schedule(size, loan, time, base, frozen):
+    return PayoutSchedule(size, loan, time, base, None if frozen is None else
+                          {f"month_{i}": members for i, members in enumerate(frozen)})
+
+def build_schedule(size, loan, time, base, assignments=None):
+    # Memoized on the inputs, so equal assignments share one PayoutSchedule
+    return _cached_schedule(*schedule_inputs(size, loan, time, base, assignments))
+
+class LoanBook:
+    # Amortization schedules for all of a group's loans at once. Every column is a
+    # (loans x months) int64 matrix where month k is the k-th repayment after the
+    # loan was issued, computed with array arithmetic rather than per-loan loops.
+    #   simple   - interest accrues on the principal; principal and interest are repaid in the last month
+    #   flat     - equal principal instalments plus interest on the original principal each month
+    #   reducing - equal instalments (annuity) with interest on the outstanding balance
+    # Amounts are whole FCFA; running totals are rounded half up so each loan's
+    # instalments sum to its principal and interest, and any remainder left in
+    # the principal lands on the final instalment.
+    def __init__(self, loans):
+        loans = list(loans)
+        self.count = len(loans)
+        self.member = np.array([loan['member_index'] for loan in loans], dtype=np.int64)
+        self.principal = np.array([loan['principal'] for loan in loans], dtype=np.int64)
+        self.rate = np.array([loan['annual_rate'] for loan in loans], dtype=np.float64)
+        self.term = np.array([loan['term'] for loan in loans], dtype=np.int64)
+        self.method = np.array([LOAN_METHODS.index(loan['method']) for loan in loans], dtype=np.int64)
+        self.issued = np.array([loan.get('month_index', 0) for loan in loans], dtype=np.int64)
+        if self.count and (self.term.min() < 1 or self.principal.min() < 0 or self.rate.min() < 0):
+            raise ValueError("Loans need a term of at least one month and a non-negative principal and rate")
+        months = int(self.term.max()) if self.count else 0
+
+        k = np.arange(months)[None, :]
+        p = self.principal[:, None].astype(np.float64)
+        n = self.term[:, None]
+        r = self.rate[:, None] / 1200
+        method = self.method[:, None]
+        self.active = k < n
+
+        # reducing balance: balance before repayment k is p * g^k - a * (g^k - 1) / r
+        g = 1 + r
+        has_rate = r > 0
+        safe_r = np.where(has_rate, r, 1.0)
+        annuity = np.where(has_rate, p * safe_r / np.where(has_rate, 1 - g ** -n, 1.0), p / n)
+        growth = g ** k
+        opening = np.where(has_rate, p * growth - annuity * (growth - 1) / safe_r, p - annuity * k)
+        reducing_interest = opening * r
+
+        shape = (self.count, months)
+        last = k == n - 1
+        simple, flat = method == LOAN_METHODS.index('simple'), method == LOAN_METHODS.index('flat')
+        interest = np.select([simple, flat], [np.where(last, p * r * n, 0.0), np.broadcast_to(p * r, shape)],
+                             reducing_interest)
+        principal = np.select([simple, flat], [np.where(last, p, 0.0), np.broadcast_to(p / n, shape)],
+                              annuity - reducing_interest)
+        self.interest_due = self._whole(interest)
+        self.principal_due = self._whole(principal + interest) - self.interest_due
+        self.principal_due[np.arange(self.count), self.term - 1] += self.principal - self.principal_due.sum(axis=1)
+        self.payment = self.principal_due + self.interest_due
+        self.balance = self.principal[:, None] - np.cumsum(self.principal_due, axis=1)
+        self.balance[~self.active] = 0
+        self.interest_total = self.interest_due.sum(axis=1)
+        self.repaid = self.payment.sum(axis=1)
+        # Cycle month of each repayment; the first falls the month after the loan is issued
+        self.due_month = self.issued[:, None] + 1 + k
+        for array in (self.member, self.principal, self.rate, self.term, self.method, self.issued, self.active,
+                      self.principal_due, self.interest_due, self.payment, self.balance, self.interest_total,
+                      self.repaid, self.due_month):
+            array.setflags(write=False)
+
+    def _whole(self, amounts):
+        # Whole FCFA per month whose running totals match the exact ones
+        amounts = np.where(self.active, amounts, 0.0)
+        totals = np.floor(np.cumsum(amounts, axis=1) + 0.5).astype(np.int64)
+        return np.diff(totals, axis=1, prepend=0)
+
+    def last_month(self):
+        return int(self.due_month[self.active].max()) if self.count else -1
+
+    def by_month(self):
+        # Group totals per cycle month 0..last_month(): principal, interest and
+        # payments due, and principal still outstanding at the end of the month
+        length = self.last_month() + 1
+        due = self.due_month[self.active]
+        principal = np.bincount(due, self.principal_due[self.active], length).astype(np.int64)
+        interest = np.bincount(due, self.interest_due[self.active], length).astype(np.int64)
+        lent = np.bincount(self.issued, self.principal, length).astype(np.int64) if self.count else np.zeros(0, np.int64)
+        return {
+            'principal': principal, 'interest': interest, 'payment': principal + interest,
+            'outstanding': np.cumsum(lent) - np.cumsum(principal),
+        }
+
+    def grid(self, months):
+        # (loans x len(months)) payments due in the given cycle months
+        months = np.asarray(months, dtype=np.int64)
+        offset = months[None, :] - self.issued[:, None] - 1
+        inside = (offset >= 0) & (offset < self.term[:, None])
+        rows = np.broadcast_to(np.arange(self.count)[:, None], offset.shape)
+        return np.where(inside, self.payment[rows, np.clip(offset, 0, max(self.payment.shape[1] - 1, 0))], 0)
+
+class Njangi:
+    def __init__(self, size, loan, time, base=None, participants=None, fruits=None, name=None,
+                 manual_assignments=None, assignment_mode='automatic', rules="", has_loans=False,
+                 interest_rate=0.0, loan_duration=1, constraints=None, seed=None, rng=None, schedule=None,
+                 loans=None):
+        self.name = name
+        self.size, self.loan, self.time = size, loan, time
+        self.base = loan * time if base is None else base
+        self.manual_assignments = manual_assignments
+        self.assignment_mode = assignment_mode
+        self.rules = rules
+        self.has_loans = has_loans
+        self.interest_rate = interest_rate
+        self.loan_duration = loan_duration
+        self.loans = list(loans or [])
+        self.constraints = normalize_constraints(constraints)
+        self.seed, self.rng = seed, rng
+        self.schedule = schedule
+
+        if size < time:
+            sys.exit("Error: size >= time")
+        self.fruits = fruits if fruits else sample_fruits(size)
+        if participants:
+            if len(participants) != size:
+                sys.exit("Error: Number of participants provided must match size")
+            self.people = participants
+        else:
+            self.people = [f"Person {i}" for i in range(1, size + 1)]
+        self.fruit_to_participant_map = dict(zip(self.fruits, self.people))
+        self.participant_to_fruit_map = dict(zip(self.people, self.fruits))
+
+    def monthly_collection(self):
+        return self.size * self.loan
+
+    def report_key(self, start_month, start_year):
+        return input_key(
+            'report', name=self.name, size=self.size, loan=self.loan, time=self.time, base=self.base,
+            participants=self.people, fruits=self.fruits, assignment_mode=self.assignment_mode,
+            manual_assignments=self.manual_assignments, rules=self.rules, has_loans=self.has_loans,
+            interest_rate=self.interest_rate, loan_duration=self.loan_duration, loans=self.loans,
+            schedule=self.payout_schedule(), start_month=start_month, start_year=start_year
+        )
+
+    def schedule_key(self):
+        # Everything the payout order depends on; names, fruits and dates do not matter
+        return input_key(
+            'schedule', size=self.size, loan=self.loan, time=self.time, base=self.base,
+            assignment_mode=self.assignment_mode,
+            manual_assignments=self.manual_assignments if self.assignment_mode != 'automatic' else None,
+            constraints=self.constraints if self.assignment_mode == 'semi-automatic' else None
+        )
+
+    def _schedule_rng(self):
+        # Without a seed or rng a fresh seed is drawn and kept, so the schedule can be reproduced
+        if self.rng is not None:
+            return self.rng
+        if self.seed is None:
+            self.seed = random.randrange(2 ** 32)
+        return random.Random(self.seed)
+
+    def compute_schedule(self):
+        monthly_payouts = calculate_monthly_payouts(self.size, self.loan, self.time, self.base)
+        if self.assignment_mode == 'manual':
+            return {f"month_{i}": list((self.manual_assignments or {}).get(f"month_{i}", [])) for i in range(self.time)}
+        if self.assignment_mode == 'semi-automatic':
+            return self._semi_automatic_assign(monthly_payouts, rng=self._schedule_rng())
+        order = list(range(self.size))
+        self._schedule_rng().shuffle(order)
+        schedule, cursor = {}, 0
+        for i, cnt in enumerate(monthly_payouts):
+            schedule[f"month_{i}"] = order[cursor:cursor + cnt]
+            cursor += cnt
+        return schedule
+
+    def payout_schedule(self):
+        if self.schedule is None:
+            self.schedule = self.compute_schedule()
+        return self.schedule
+
+    def build_schedule(self):
+        return build_schedule(self.size, self.loan, self.time, self.base, self.payout_schedule())
+
+    def use_stored_schedule(self, stored):
+        # Adopts a schedule from DatabaseManager.load_schedule if it was computed from the same inputs
+        if stored and stored['key'] == self.schedule_key() and (self.seed is None or stored['seed'] == self.seed):
+            self.schedule, self.seed = stored['assignments'], stored['seed']
+            return True
+        return False
+
+    def pool(self):
+        return self.monthly_collection() * self.time
+
+    def example_loan(self):
+        # One contribution borrowed at the group's rate and duration, repaid with simple interest
+        return LoanBook([{'member_index': 0, 'principal': self.loan, 'annual_rate': self.interest_rate,
+                          'term': max(1, self.loan_duration), 'method': 'simple'}])
+
+    def _semi_automatic_assign(self, monthly_payouts, rng=random):
+        return solve_assignments(self.size, monthly_payouts, self.manual_assignments, self.constraints,
+                                 names=self.people, rng=rng)
+
+    def generate_pdf(self, filename=None, start_month=1, start_year=2025):
+        # Renders into memory and returns the PDF bytes unless a filename is given.
+        # ReportLab is imported here, on the first render, rather than at startup.
+        try:
+            schedule = self.build_schedule()
+        except InfeasibleScheduleError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"{self.assignment_mode.capitalize()} assignment failed: {str(e)}")
+
+        from .pdf import render_report
+        return render_report(self, schedule, filename, start_month, start_year)
+
+def plan_configurations(sizes, contributions, durations, payouts=None, limit=50):
+    # Evaluates every (size, contribution, duration, payout) combination at once.
+    # The month loop runs over at most max(durations) steps and each step is a
+    # vectorized update across all configurations. payouts=None uses the app's
+    # default payout of contribution x duration.
+    S, L, T = (a.ravel() for a in np.meshgrid(
+        np.asarray(sizes, dtype=np.int64), np.asarray(contributions, dtype=np.int64),
+        np.asarray(durations, dtype=np.int64), indexing='ij'
+    ))
+    if payouts is None:
+        B = L * T
+    else:
+        P = np.asarray(payouts, dtype=np.int64)
+        S, L, T, B = (np.repeat(S, len(P)), np.repeat(L, len(P)),
+                      np.repeat(T, len(P)), np.tile(P, len(S)))
+    n = len(S)
+    max_time = int(T.max()) if n else 0
+    collected = S * L
+    residue = np.zeros(n, dtype=np.int64)
+    remaining = S.copy()
+    idle = np.zeros(n, dtype=np.int64)
+    final_residue = np.zeros(n, dtype=np.int64)
+    squares = np.zeros(n, dtype=np.float64)
+    empty_months = np.zeros(n, dtype=np.int64)
+    safe_base = np.maximum(B, 1)
+    for m in range(max_time):
+        active = m < T
+        last = m == T - 1
+        carry = active & ~last
+        available = collected + residue
+        cnt = np.where(last, remaining, np.minimum(available // safe_base, remaining))
+        cnt *= active
+        after = available - cnt * B
+        final_residue = np.where(last, after, final_residue)
+        residue = np.where(carry, after, residue)
+        idle += after * carry
+        remaining -= cnt
+        squares += cnt.astype(np.float64) ** 2
+        empty_months += (cnt == 0) & active
+
+    # Standard deviation of the monthly payout counts, from running sums
+    active_months = np.maximum(T, 1)
+    mean = S / active_months
+    spread = np.sqrt(np.maximum(squares / active_months - mean ** 2, 0.0))
+    feasible = (S >= T) & (B > 0) & (final_residue >= 0)
+
+    order = np.lexsort((spread, idle, final_residue))
+    order = order[feasible[order]]
+    configurations = [{
+        'size': int(S[i]), 'contribution': int(L[i]), 'duration': int(T[i]), 'payout': int(B[i]),
+        'final_residue': int(final_residue[i]), 'idle_residue': int(idle[i]),
+        'payout_spread': round(float(spread[i]), 3), 'empty_months': int(empty_months[i])
+    } for i in order[:limit]]
+    return {'evaluated': n, 'feasible': int(feasible.sum()), 'configurations': configurations}
+
+def njangi_from_group(group_data):
+    # Builds a Njangi from a load_group() record without any Streamlit state.
+    # Saved groups do not record the assignment mode: complete manual schedules
+    # are rendered as manual, partial ones (or member constraints) are solved
+    # like semi-automatic.
+    size = group_data['size']
+    manual = group_data.get('manual_assignments')
+    if manual:
+        assigned = sum(len(indices) for indices in manual.values())
+        mode = 'manual' if assigned == size else 'semi-automatic'
+    elif group_data.get('constraints'):
+        mode = 'semi-automatic'
+    else:
+        mode = 'automatic'
+    participants = group_data.get('participants') or None
+    fruits = group_data.get('fruits') or None
+    if fruits and len(fruits) != size:
+        fruits = None
+    njangi = Njangi(
+        size=size, loan=group_data['loan'], time=group_data['time'], base=group_data.get('base'),
+        participants=participants, fruits=fruits, name=group_data['name'],
+        manual_assignments=manual, assignment_mode=mode,
+        rules=group_data.get('rules') or "", has_loans=group_data.get('has_loans', False),
+        interest_rate=group_data.get('interest_rate', 0.0), loan_duration=group_data.get('loan_duration', 1),
+        constraints=group_data.get('constraints'), loans=group_data.get('loans')
+    )
+    njangi.use_stored_schedule(group_data.get('schedule'))
+    return njangi
+
+def ledger_schedule(group_data):
+    # The PayoutSchedule the ledger checks payouts against: the manual schedule, or
+    # the one stored when a report was generated. None until a report fixes it.
+    njangi = njangi_from_group(group_data)
+    if njangi.assignment_mode != 'manual' and njangi.schedule is None:
+        return None
+    return njangi.build_schedule()
@@ -0,0 +1,397 @@
+# ReportLab layout for the group report and the fruit sheet. Imported on the
+# first PDF render (Njangi.generate_pdf), never at startup.
+import io
+from functools import lru_cache
+
+import numpy as np
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import (
+    SimpleDocTemplate, Table, LongTable, TableStyle,
+    Paragraph, Spacer, PageBreak
+)
+
+from .core import LOAN_METHODS, LoanBook, month_label, months
+
+@lru_cache(maxsize=None)
+def report_styles():
+    # Paragraph styles shared by every report, built once per process
+    st_styles = getSampleStyleSheet()
+    st_styles.add(ParagraphStyle('TitleBig', fontSize=22, fontName='Helvetica-Bold',
+                                 textColor=colors.HexColor('#2C3E50'), alignment=1, spaceAfter=12))
+    st_styles.add(ParagraphStyle('Sub', fontSize=11, fontName='Helvetica',
+                                 textColor=colors.HexColor('#7F8C8D'), alignment=1,
+                                 spaceBefore=24, spaceAfter=24))
+    st_styles.add(ParagraphStyle('SubSmall', fontSize=10, fontName='Helvetica-Bold',
+                                 textColor=colors.HexColor('#117A65'), alignment=1,
+                                 spaceBefore=0, spaceAfter=18))
+    st_styles.add(ParagraphStyle('SecTitle', fontSize=14, fontName='Helvetica-Bold',
+                                 textColor=colors.HexColor('#34495E'),
+                                 spaceBefore=0, spaceAfter=12, leftIndent=-7, alignment=0))
+    st_styles.add(ParagraphStyle('CellLeft', fontSize=9, fontName='Helvetica',
+                                 textColor=colors.HexColor('#2C3E50'), alignment=0))
+    st_styles.add(ParagraphStyle('RulesText', fontSize=10, fontName='Helvetica',
+                                 textColor=colors.HexColor('#2C3E50'), alignment=0,
+                                 spaceBefore=6, spaceAfter=6, leftIndent=10, rightIndent=10))
+    return st_styles
+
+@lru_cache(maxsize=None)
+def report_table_styles():
+    return {
+        'fruits': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498DB')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (0, -1), 'CENTER'),
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+            ('LEFTPADDING', (0, 1), (-1, -1), 6),
+            ('GRID', (0, 0), (-1, -1), 0.4, colors.HexColor('#AED6F1')),
+        ]),
+        'participants': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27AE60')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('ALIGN', (1, 1), (1, -1), 'LEFT'),
+            ('ALIGN', (2, 1), (2, -1), 'LEFT'),
+            ('LEFTPADDING', (0, 1), (-1, -1), 2),
+            ('GRID', (0, 0), (-1, -1), 0.3, colors.HexColor('#ABEBC6')),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ]),
+        'schedule': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E67E22')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (0, -1), 'CENTER'),
+            ('ALIGN', (1, 0), (1, 0), 'CENTER'),
+            ('ALIGN', (1, 1), (1, -1), 'CENTER'),
+            ('ALIGN', (2, 0), (-1, 0), 'CENTER'),
+            ('ALIGN', (2, 1), (-1, -1), 'RIGHT'),
+            ('ALIGN', (2, 1), (2, -1), 'CENTER'),
+            ('ALIGN', (5, 1), (5, -1), 'CENTER'),
+            ('ALIGN', (6, 1), (6, -1), 'LEFT'),
+            ('FONTNAME', (1, 1), (1, -1), 'Courier'),
+            ('GRID', (0, 0), (-1, -1), 0.4, colors.HexColor('#FAD7A0')),
+            ('LEFTPADDING', (1, 1), (1, -1), 0),
+            ('RIGHTPADDING', (1, 1), (1, -1), 0),
+            ('LEFTPADDING', (0, 1), (-1, -1), 4),
+        ]),
+        'loan': TableStyle([
+            ('BACKGROUND', (0, 0), (0, 0), colors.HexColor('#FDEBD0')),
+            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#BA4A00')),
+            ('GRID', (0, 0), (-1, -1), 0.3, colors.HexColor('#FAD7A0')),
+            ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ]),
+        'loans': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#BA4A00')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('ALIGN', (0, 1), (0, -1), 'CENTER'),
+            ('ALIGN', (2, 1), (-1, -1), 'RIGHT'),
+            ('LEFTPADDING', (0, 1), (-1, -1), 3),
+            ('RIGHTPADDING', (0, 1), (-1, -1), 3),
+            ('GRID', (0, 0), (-1, -1), 0.3, colors.HexColor('#FAD7A0')),
+        ]),
+        'summary': TableStyle([
+            ('BACKGROUND', (0, 0), (0, 0), colors.HexColor('#D6EAF8')),
+            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#5499C7')),
+            ('GRID', (0, 0), (-1, -1), 0.3, colors.HexColor('#AED6F1')),
+            ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ]),
+    }
+
+# Member x month grid: narrowest month column before the months split into
+# another column block, and rows per LongTable chunk
+GRID_MONTH_MIN_WIDTH = 15
+
+GRID_ROW_CHUNK = 500
+
+# Natural height of a single-line table row in the report styles
+GRID_ROW_HEIGHT = 18
+
+# Narrowest column for a month of amounts (loan instalments) rather than a tick box
+GRID_AMOUNT_MIN_WIDTH = 45
+
+def month_blocks(time, available_width, min_width=GRID_MONTH_MIN_WIDTH):
+    # Splits range(time) into the fewest equal-ish blocks whose columns fit the width
+    per_block = max(1, int(available_width // min_width))
+    block_count = -(-time // per_block)
+    size = -(-time // block_count)
+    return [range(start, min(start + size, time)) for start in range(0, time, size)]
+
+def chunked_tables(header, rows, col_widths, style, row_height=None, chunk=GRID_ROW_CHUNK):
+    # Long grids as a run of LongTables with a repeating header. LongTable skips
+    # re-measuring every row at each page split, and bounded chunks keep the
+    # per-split work flat however many rows there are. A known row_height spares
+    # ReportLab measuring every cell.
+    tables = []
+    for start in range(0, len(rows), chunk):
+        body = rows[start:start + chunk]
+        table = LongTable([header] + body, colWidths=col_widths, repeatRows=1,
+                          rowHeights=None if row_height is None else [row_height] * (len(body) + 1))
+        table.setStyle(style)
+        tables.append(table)
+    return tables
+
+def report_document(target):
+    return SimpleDocTemplate(
+        target, pagesize=letter,
+        leftMargin=50, rightMargin=50, topMargin=130, bottomMargin=70
+    )
+
+def _draw_static_header_footer(c, _doc, group_name):
+    c.saveState()
+    c.setStrokeColor(colors.HexColor('#3498DB'))
+    c.setLineWidth(1.2)
+    c.line(50, _doc.height + _doc.topMargin + 8,
+           letter[0] - 50, _doc.height + _doc.topMargin + 8)
+    c.setFillColor(colors.HexColor('#FFFFFF'))
+    c.circle(68, _doc.height + _doc.topMargin + 32, 18, fill=1, stroke=0)
+    c.setFont("Helvetica-Bold", 16)
+    c.setFillColor(colors.HexColor('#3498DB'))
+    c.drawCentredString(68, _doc.height + _doc.topMargin + 29, "[ Tz ]")
+    c.setFont("Helvetica-Bold", 14)
+    c.setFillColor(colors.HexColor('#2C3E50'))
+    c.drawString(95, _doc.height + _doc.topMargin + 27, group_name or "")
+    c.setStrokeColor(colors.HexColor('#B9770E'))
+    c.line(50, 55, letter[0] - 50, 55)
+    c.setFont("Helvetica", 8)
+    c.setFillColor(colors.HexColor('#ABB2B9'))
+    c.drawString(50, 45, "Team [ zeru ]")
+    sig = "steady - calm - driven"
+    c.drawString(letter[0] - 50 - c.stringWidth(sig, "Helvetica", 8), 45, sig)
+    c.restoreState()
+
+def _draw_watermark(c):
+    c.saveState()
+    c.setFont("Helvetica-Bold", 70)
+    c.setFillColor(colors.HexColor("#F7F9F9"))
+    c.translate(letter[0] / 2, letter[1] / 2)
+    c.rotate(45)
+    c.drawCentredString(0, 0, "auto-generated")
+    c.restoreState()
+
+def page_decorations(group_name):
+    # onPage callback drawing the header, footer and watermark. The static parts
+    # are recorded once per document as form XObjects and referenced from every
+    # page; only the page number is drawn per page.
+    def decorate(c, _doc):
+        if not getattr(c, '_njangi_forms', False):
+            c.beginForm("njangi_header_footer")
+            _draw_static_header_footer(c, _doc, group_name)
+            c.endForm()
+            c.beginForm("njangi_watermark")
+            _draw_watermark(c)
+            c.endForm()
+            c._njangi_forms = True
+        c.doForm("njangi_header_footer")
+        c.saveState()
+        c.setFont("Helvetica", 9)
+        c.setFillColor(colors.HexColor('#ABB2B9'))
+        c.drawCentredString(letter[0] / 2, 45, f"Page {c.getPageNumber()}")
+        c.restoreState()
+        c.doForm("njangi_watermark")
+    return decorate
+
+def generate_fruit_sheet_pdf(group_name, fruits, filename=None, start_month=1, start_year=2025, time=12):
+    # Renders into memory and returns the PDF bytes unless a filename is given
+    target = io.BytesIO() if filename is None else filename
+    doc = report_document(target)
+    st_styles = report_styles()
+    
+    elems = [
+        Paragraph(f"{group_name}", st_styles['TitleBig']),
+        Paragraph(
+            f"Period: {months[start_month][:3]}-{start_year} to "
+            f"{months[(start_month + time - 2) % 12 + 1][:3]}-"
+            f"{start_year + ((start_month + time - 2) // 12)}",
+            st_styles['Sub']
+        ),
+        Paragraph("Distribute one fruit per participant. Participants will later pick their fruit physically.", st_styles['Sub'])
+    ]
+    
+    fruits_data = [["S/N", "Fruit"]] + [[str(i + 1), fruits[i]] for i in range(len(fruits))]
+    t1 = Table(fruits_data, colWidths=[40, doc.width - 40])
+    t1.setStyle(report_table_styles()['fruits'])
+    elems += [t1, Spacer(1, 24)]
+    
+    note = Paragraph(
+        "<i>Note: After participants pick fruits, return to the platform to enter names and map them to fruits.</i>",
+        st_styles['Sub']
+    )
+    elems.append(note)
+
+    decorate = page_decorations(group_name)
+    doc.build(elems, onFirstPage=decorate, onLaterPages=decorate)
+    return target.getvalue() if filename is None else filename
+
+def loan_elements(njangi, book, doc, st_styles, table_styles, start_month, start_year, row_height):
+    # Detailed loans section: borrowers, repayments due per month and each borrower's instalments
+    label = lambda i: month_label(start_month, start_year, i)
+    borrower = lambda idx: njangi.people[idx] if 0 <= idx < njangi.size else f"Member {idx + 1}"
+    totals = book.by_month()
+    elems = [Paragraph("Loans", st_styles['SecTitle'])]
+    summary = [
+        f"Borrowers              : {book.count}",
+        f"Total Lent             : {int(book.principal.sum()):,} FCFA",
+        f"Total Interest         : {int(book.interest_total.sum()):,} FCFA",
+        f"Total Repayments       : {int(book.repaid.sum()):,} FCFA",
+        f"Final Repayment        : {label(book.last_month())}",
+    ]
+    summary_table = Table([[Paragraph(line, st_styles['CellLeft'])] for line in summary], colWidths=[doc.width])
+    summary_table.setStyle(table_styles['loan'])
+    elems += [summary_table, Spacer(1, 12)]
+
+    last_due = book.due_month[np.arange(book.count), book.term - 1]
+    rows = [[str(i + 1), borrower(int(book.member[i])), f"{int(book.principal[i]):,}", f"{book.rate[i]:g}%",
+             str(int(book.term[i])), LOAN_METHODS[book.method[i]], label(int(book.issued[i])),
+             f"{int(book.interest_total[i]):,}", f"{int(book.repaid[i]):,}", label(int(last_due[i]))]
+            for i in range(book.count)]
+    amount_widths = [60, 35, 30, 50, 45, 55, 60, 45]
+    elems += chunked_tables(["S/N", "Borrower", "Principal", "Rate", "Term", "Method", "Issued", "Interest",
+                             "Repaid", "Final"], rows,
+                            [30, doc.width - 30 - sum(amount_widths)] + amount_widths, table_styles['loans'],
+                            row_height)
+    elems.append(PageBreak())
+
+    elems.append(Paragraph("Repayments Due per Month", st_styles['SecTitle']))
+    due_months = np.flatnonzero(totals['payment'] | totals['outstanding'])
+    rows = [[str(m + 1), label(int(m)), f"{totals['principal'][m]:,}", f"{totals['interest'][m]:,}",
+             f"{totals['payment'][m]:,}", f"{totals['outstanding'][m]:,}"] for m in due_months]
+    elems += chunked_tables(["S/N", "Month", "Principal", "Interest", "Due", "Outstanding"], rows,
+                            [30, doc.width - 330, 75, 75, 75, 75], table_styles['loans'], row_height)
+    elems.append(PageBreak())
+
+    # Instalments grid over the months with repayments, split into page-width blocks
+    first = int(book.issued.min()) + 1
+    span = range(first, book.last_month() + 1)
+    fixed_widths = [30, 110]
+    grid = book.grid(span)
+    names = [[str(i + 1), borrower(int(book.member[i]))] for i in range(book.count)]
+    blocks = month_blocks(len(span), doc.width - sum(fixed_widths), min_width=GRID_AMOUNT_MIN_WIDTH)
+    for block in blocks:
+        elems.append(Paragraph(f"Loan Instalments ({label(span[block[0]])} – {label(span[block[-1]])})",
+                               st_styles['SecTitle']))
+        col_widths = fixed_widths + [(doc.width - sum(fixed_widths)) / len(block)] * len(block)
+        rows = [name + [f"{amount:,}" if amount else () for amount in grid[i, block.start:block.stop].tolist()]
+                for i, name in enumerate(names)]
+        elems += chunked_tables(["S/N", "Borrower"] + [label(span[j]) for j in block], rows, col_widths,
+                                table_styles['loans'], row_height)
+        elems.append(PageBreak())
+    return elems
+
+def render_report(njangi, schedule, filename=None, start_month=1, start_year=2025):
+    # Body of Njangi.generate_pdf once the payout schedule is built
+    target = io.BytesIO() if filename is None else filename
+    doc = report_document(target)
+    st_styles = report_styles()
+    table_styles = report_table_styles()
+
+    elems = [
+        Paragraph(njangi.name, st_styles['TitleBig']),
+        Paragraph(
+            f"Period: {months[start_month][:3]}-{start_year} to "
+            f"{months[(start_month + njangi.time - 2) % 12 + 1][:3]}-"
+            f"{start_year + ((start_month + njangi.time - 2) // 12)}",
+            st_styles['Sub']
+        ),
+        Paragraph(f"Each member contributes: {njangi.loan:,} FCFA per month", st_styles['SubSmall']),
+        Paragraph(f"Net payout per month per member: {njangi.base:,} FCFA", st_styles['SubSmall'])
+    ]
+
+    # Rows can only take a fixed height when no name or fruit wraps onto a second line
+    row_height = None if any('\n' in str(value) for value in njangi.people + njangi.fruits) else GRID_ROW_HEIGHT
+
+    # Assigned Fruits
+    elems += chunked_tables(["S/N", "Fruit"], [[str(i + 1), njangi.fruits[i]] for i in range(njangi.size)],
+                            [40, doc.width - 40], table_styles['fruits'], row_height)
+    elems.append(PageBreak())
+
+    # Participants & Fruits: one column block of months per page width, each
+    # repeating the member columns. Month cells are empty tuples rather than
+    # blank strings, so ReportLab draws no text for them.
+    base_headers = ["S/N", "Name", "Fruit"]
+    duration_headers = [
+        f"{months[(start_month + i - 1) % 12 + 1][0]}{str(start_year + ((start_month + i - 1) // 12))[-2:]}"
+        for i in range(njangi.time)
+    ]
+    fixed_widths = [35, 120, 60]
+    members = [[str(i + 1), njangi.people[i], njangi.fruits[i]] for i in range(njangi.size)]
+    blocks = month_blocks(njangi.time, doc.width - sum(fixed_widths))
+    for block in blocks:
+        title = "Participants & Fruits"
+        if len(blocks) > 1:
+            title += (f" ({month_label(start_month, start_year, block[0])} – "
+                      f"{month_label(start_month, start_year, block[-1])})")
+        elems.append(Paragraph(title, st_styles['SecTitle']))
+        blank = [()] * len(block)
+        col_widths = fixed_widths + [(doc.width - sum(fixed_widths)) / len(block)] * len(block)
+        elems += chunked_tables(base_headers + duration_headers[block.start:block.stop],
+                                [member + blank for member in members], col_widths,
+                                table_styles['participants'], row_height)
+        elems.append(PageBreak())
+
+    # Payout Schedule
+    elems.append(Paragraph("Payout Schedule", st_styles['SecTitle']))
+    sched_headers = ["S/N", "Mon", "Col", "Avail", "Res", "Payouts", "Names (Fruit)"]
+    t3 = Table([sched_headers] + schedule.rows(njangi.people, njangi.fruits, start_month, start_year),
+               colWidths=[35, 55, 60, 60, 60, 50, doc.width - 320],
+               repeatRows=1)
+    t3.setStyle(table_styles['schedule'])
+    elems += [t3, Spacer(1, 12)]
+
+    # Rules Section (if provided)
+    if njangi.rules.strip():
+        elems.append(PageBreak())
+        elems.append(Paragraph("Njangi Rules", st_styles['SecTitle']))
+        for line in njangi.rules.strip().split('\n'):
+            if line.strip():
+                elems.append(Paragraph(line.strip(), st_styles['RulesText']))
+
+    # Loans (if enabled): the recorded borrowers, or else the group's standard loan terms
+    book = LoanBook(njangi.loans) if njangi.has_loans and njangi.loans else None
+    if book is not None:
+        elems.append(PageBreak())
+        elems += loan_elements(njangi, book, doc, st_styles, table_styles, start_month, start_year, row_height)
+    elif njangi.has_loans and njangi.interest_rate > 0:
+        elems.append(PageBreak())
+        elems.append(Paragraph("Loan & Interest Summary", st_styles['SecTitle']))
+        total_repayment = int(njangi.example_loan().repaid[0])
+        loan_summary = [
+            f"Base Loan Amount       : {njangi.loan:,} FCFA",
+            f"Interest Rate          : {njangi.interest_rate:.2f}% per annum",
+            f"Loan Duration          : {njangi.loan_duration} month(s)",
+            f"Total Repayment        : {total_repayment:,.0f} FCFA",
+            f"Extra Interest Earned  : {total_repayment - njangi.loan:,.0f} FCFA"
+        ]
+        loan_table = Table([[Paragraph(line, st_styles['CellLeft'])] for line in loan_summary],
+                           colWidths=[doc.width])
+        loan_table.setStyle(table_styles['loan'])
+        elems.append(loan_table)
+
+    # Summary
+    if book is None:
+        elems.append(PageBreak())
+    elems.append(Paragraph("Summary", st_styles['SecTitle']))
+    summary_lines = [
+        f"Payout per person     : {njangi.base:,}",
+        f"Loan per person/month : {njangi.loan:,}",
+        f"Participants          : {njangi.size}",
+        f"Months                : {njangi.time}",
+        f"Total Pool Collected  : {njangi.pool():,}",
+        f"Total Payout          : {(njangi.base * njangi.size):,}",
+        f"Residue at End        : 0"
+    ]
+    if book is not None:
+        summary_lines.append(f"Interest on Loans     : {int(book.interest_total.sum()):,} FCFA")
+    elif njangi.has_loans and njangi.interest_rate > 0:
+        total_interest = (total_repayment - njangi.loan) * njangi.size
+        summary_lines.append(f"Potential Interest Earned : {total_interest:,.0f} FCFA")
+    sumt = Table([[Paragraph(line, st_styles['CellLeft'])] for line in summary_lines],
+                 colWidths=[doc.width])
+    sumt.setStyle(table_styles['summary'])
+    elems.append(sumt)
+
+    decorate = page_decorations(njangi.name)
+    doc.build(elems, onFirstPage=decorate, onLaterPages=decorate)
+    return target.getvalue() if filename is None else filename
@@ -0,0 +1,320 @@
+# Report rendering outside the UI: the PDF cache, render job payloads, the
+# worker processes that render them and batch generation for the CLI. The
+# workers import this module by name, so it must not pull in Streamlit.
+import json
+import multiprocessing
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time as timer
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from .core import InfeasibleScheduleError, Njangi, input_key, njangi_from_group
+
+# Worker processes rendering report PDFs in the background
+RENDER_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+class ReportCache:
+    # Content-addressed store for rendered PDFs. Artifacts are named by the
+    # SHA-256 of the report inputs, so identical inputs always map to the same
+    # bytes. Total size is capped and the least recently used entries are
+    # evicted first. If the cache directory cannot be created (read-only
+    # containers) the artifacts are kept in memory under the same cap.
+    def __init__(self, directory=None, max_bytes=256 * 1024 * 1024):
+        self.directory = directory or os.environ.get(
+            "NJANGI_REPORT_CACHE", os.path.join(tempfile.gettempdir(), "njangi_report_cache")
+        )
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._memory = {}
+        self._bytes = 0
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            existing = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and entry.name.endswith(".pdf"):
+                    stat = entry.stat()
+                    existing.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        except OSError:
+            self.directory = None
+            existing = []
+        for _, key, size in sorted(existing):
+            self._entries[key] = size
+            self._bytes += size
+
+    key = staticmethod(input_key)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def _read(self, key):
+        if self.directory is None:
+            return self._memory.get(key)
+        try:
+            with open(self.path(key), "rb") as f:
+                data = f.read()
+            os.utime(self.path(key))
+            return data
+        except OSError:
+            return None
+
+    def _write(self, key, data):
+        if self.directory is None:
+            self._memory[key] = data
+            return
+        path = self.path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            # Fall back to memory if the directory stopped being writable
+            self.directory = None
+            self._memory[key] = data
+
+    def _discard(self, key):
+        self._bytes -= self._entries.pop(key)
+        if self.directory is None:
+            self._memory.pop(key, None)
+            return
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            pass
+
+    def peek(self, key):
+        # The cached bytes or None, without touching the hit/miss counters
+        with self._lock:
+            if key not in self._entries:
+                return None
+            data = self._read(key)
+            if data is None:
+                self._bytes -= self._entries.pop(key)
+                return None
+            self._entries.move_to_end(key)
+            return data
+
+    def record(self, hit):
+        # Counts one lookup for callers that peek() and render elsewhere
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key):
+        data = self.peek(key)
+        if data is not None:
+            self.record(True)
+        return data
+
+    def get_or_render(self, key, render):
+        # render() must return the PDF bytes; they are stored under key and returned
+        data = self.get(key)
+        if data is not None:
+            return data
+        self.record(False)
+        return self.put(key, render())
+
+    def put(self, key, data):
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)
+            self._write(key, data)
+            self._entries[key] = len(data)
+            self._bytes += len(data)
+            self._evict(keep=key)
+        return data
+
+    def _evict(self, keep):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                self._entries.move_to_end(oldest)
+                continue
+            self._discard(oldest)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'entries': len(self._entries), 'bytes': self._bytes}
+
+def resolve_schedule(db, njangi):
+    # Reuses the group's stored payout schedule while its inputs are unchanged;
+    # otherwise computes one and stores it so later renders and exports agree
+    if njangi.assignment_mode == 'manual' or njangi.use_stored_schedule(db.load_schedule(njangi.name)):
+        return njangi.payout_schedule()
+    schedule = njangi.payout_schedule()
+    db.save_schedule(njangi.name, njangi.schedule_key(), njangi.seed, schedule)
+    return schedule
+
+def report_filename(group_name, group_id=None):
+    # Keeps Unicode letters; the group id keeps names that slug alike ("A B", "A_B") apart
+    slug = re.sub(r'[^\w.-]+', '_', unicodedata.normalize('NFKC', group_name)).strip('._')[:100] or 'group'
+    return f"{slug}_{group_id}_report.pdf" if group_id is not None else f"{slug}_report.pdf"
+
+def render_group_report(group_data, out_dir):
+    # Process-pool worker: returns (group name, output path or None, byte size, error,
+    # newly computed schedule as (key, seed, assignments) or None)
+    try:
+        njangi = njangi_from_group(group_data)
+        computed = None
+        if njangi.assignment_mode != 'manual' and njangi.schedule is None:
+            schedule = njangi.payout_schedule()
+            computed = (njangi.schedule_key(), njangi.seed, schedule)
+        pdf_bytes = njangi.generate_pdf(
+            start_month=group_data.get('start_month') or 1,
+            start_year=group_data.get('start_year') or 2025
+        )
+        path = os.path.join(out_dir, report_filename(group_data['name'], group_data.get('id')))
+        with open(path, "wb") as f:
+            f.write(pdf_bytes)
+        return group_data['name'], path, len(pdf_bytes), None, computed
+    except (Exception, SystemExit) as e:
+        return group_data['name'], None, 0, str(e), None
+
+def render_payload(njangi, start_month, start_year):
+    # JSON-safe inputs for run_render_job; the schedule is resolved beforehand so
+    # the worker renders exactly the payout order the UI stored
+    return {
+        'njangi': {
+            'size': njangi.size, 'loan': njangi.loan, 'time': njangi.time, 'base': njangi.base,
+            'participants': njangi.people, 'fruits': njangi.fruits, 'name': njangi.name,
+            'manual_assignments': njangi.manual_assignments, 'assignment_mode': njangi.assignment_mode,
+            'rules': njangi.rules, 'has_loans': njangi.has_loans, 'interest_rate': njangi.interest_rate,
+            'loan_duration': njangi.loan_duration, 'constraints': njangi.constraints,
+            'seed': njangi.seed, 'schedule': njangi.payout_schedule(), 'loans': njangi.loans,
+        },
+        'start_month': start_month, 'start_year': start_year,
+    }
+
+def run_render_job(db_name, job_id):
+    # Process-pool worker. Claims a queued job, renders it and stores the PDF or the
+    # error on the job row. A plain connection is enough here: the schema exists
+    # and the job row is the only thing written.
+    conn = sqlite3.connect(db_name, timeout=30)
+    try:
+        with conn:
+            row = conn.execute('''
+                UPDATE njangi_render_jobs SET status = 'running', started_at = ?
+                WHERE id = ? AND status = 'queued' RETURNING payload
+            ''', (datetime.now(), job_id)).fetchone()
+        if row is None:
+            return
+        try:
+            payload = json.loads(row[0])
+            pdf_bytes = Njangi(**payload['njangi']).generate_pdf(
+                start_month=payload['start_month'], start_year=payload['start_year'])
+            status, error = 'done', None
+        except InfeasibleScheduleError as e:
+            pdf_bytes, status, error = None, 'failed', "; ".join(e.reasons)
+        except (Exception, SystemExit) as e:
+            pdf_bytes, status, error = None, 'failed', str(e)
+        with conn:
+            conn.execute('''
+                UPDATE njangi_render_jobs SET status = ?, pdf = ?, error = ?, payload = NULL, finished_at = ?
+                WHERE id = ?
+            ''', (status, pdf_bytes, error, datetime.now(), job_id))
+    finally:
+        conn.close()
+
+class RenderQueue:
+    # Renders report PDFs in worker processes so no session waits on another's
+    # render. Job status and output live in njangi_render_jobs, so any rerun,
+    # refreshed browser or other session can poll them. Workers are spawned
+    # rather than forked because the Streamlit server is multi-threaded.
+    def __init__(self, db, workers=RENDER_WORKERS):
+        self.db = db
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._pool = None
+        for job_id in db.recover_render_jobs():
+            self._dispatch(job_id)
+
+    def _dispatch(self, job_id):
+        with self._lock:
+            for attempt in range(2):
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+                try:
+                    future = self._pool.submit(run_render_job, self.db.db_name, job_id)
+                    break
+                except BrokenProcessPool:
+                    # A worker died; start a fresh pool and retry once
+                    self._pool = None
+                    if attempt:
+                        raise
+
+        def on_done(finished):
+            # The worker records its own outcome; this only catches a worker that died mid-job
+            if finished.exception() is not None:
+                self.db.fail_render_job(job_id, str(finished.exception()))
+        future.add_done_callback(on_done)
+
+    def submit(self, group_name, report_key, filename, payload):
+        job_id = self.db.create_render_job(group_name, report_key, filename, payload)
+        self._dispatch(job_id)
+        return job_id
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+def generate_reports(db, out_dir, workers=None, progress=None):
+    # Renders every saved group in parallel; at most a few groups per worker are
+    # in flight so memory stays flat however many groups are stored.
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    total = db.count_groups()
+    done, failures, total_bytes = 0, [], 0
+    # Schedules computed by workers are stored once the read snapshot is closed
+    new_schedules = []
+    started = timer.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        groups = db.iter_groups()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < workers * 4:
+                group_data = next(groups, None)
+                if group_data is None:
+                    exhausted = True
+                    break
+                if group_data['has_loans']:
+                    group_data['loans'] = db.load_loans(group_data['name'])
+                pending.add(pool.submit(render_group_report, group_data, out_dir))
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, path, size, error, computed = future.result()
+                done += 1
+                if computed:
+                    new_schedules.append((name,) + computed)
+                total_bytes += size
+                if error:
+                    failures.append((name, error))
+                if progress:
+                    progress(done, total, timer.perf_counter() - started)
+    with db.transaction():
+        for name, key, seed, schedule in new_schedules:
+            db.save_schedule(name, key, seed, schedule)
+    return {
+        'rendered': done - len(failures), 'failed': failures, 'bytes': total_bytes,
+        'seconds': timer.perf_counter() - started, 'workers': workers
+    }
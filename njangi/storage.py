@@ -0,0 +1,1702 @@
+# SQLite persistence: the connection pool, DatabaseManager, version snapshots,
+# bulk export/import files and dirty tracking for autosave.
+import csv
+import hashlib
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time as timer
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import chain, compress
+from operator import ne
+
+from .core import LOAN_METHODS, constraint_rows, constraints_from_rows, schedule_from_rows, schedule_slot_rows
+
+logger = logging.getLogger(__name__)
+
+# Finished render jobs are pruned after this long
+RENDER_JOB_KEEP = timedelta(days=1)
+
+# Change-log rows kept for processes catching up; one that falls further behind drops its whole read cache
+CHANGE_LOG_KEEP = 10000
+
+# Ledger entry kinds; amounts are signed, so a mistake is corrected by appending its reversal
+LEDGER_KINDS = ('contribution', 'payout')
+
+# Version history: a full snapshot every this many versions, or sooner once a delta
+# against the last one grows past this fraction of its size
+SNAPSHOT_CHECKPOINT_EVERY = 50
+
+SNAPSHOT_DELTA_RATIO = 0.5
+
+# Snapshots up to this many bytes of JSON are stored uncompressed
+SNAPSHOT_PLAIN_BYTES = 512
+
+# Absolute month number of a group's first cycle month; must match idx_groups_terms
+START_YM = "start_year * 12 + start_month - 1"
+
+class ConnectionPool:
+    # Long-lived SQLite connections shared by every session of the app. Each
+    # connection keeps its own prepared-statement cache, so the fixed SQL
+    # strings used by DatabaseManager are compiled once per connection.
+    def __init__(self, db_name, max_connections=8, busy_timeout_ms=5000, cached_statements=256):
+        self.db_name = db_name
+        self.max_connections = max_connections
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._local = threading.local()
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.db_name,
+            timeout=self.busy_timeout_ms / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.max_connections:
+                self._created += 1
+                try:
+                    return self._open()
+                except Exception:
+                    self._created -= 1
+                    raise
+        return self._idle.get()
+
+    def _release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        # Re-entrant per thread: nested calls reuse the connection already held
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            yield held
+            return
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        with self.connection() as conn:
+            if conn.in_transaction:
+                # Join the enclosing transaction
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+
+    def close(self):
+        with self._lock:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                conn.close()
+                self._created -= 1
+
+def copy_record(value):
+    # Copies the dicts and lists of a cached read so callers can mutate their result;
+    # much cheaper than deepcopy for records made of plain JSON-like values
+    if isinstance(value, dict):
+        return {key: copy_record(item) for key, item in value.items()}
+    if isinstance(value, list):
+        if value and isinstance(value[0], (dict, list)):
+            return [copy_record(item) for item in value]
+        return list(value)
+    return value
+
+def pack_snapshot(value):
+    # Small payloads, such as most deltas, stay plain JSON: zlib would save a few
+    # bytes but allocates ~300 KB of state per call. Larger ones are deflated with
+    # a 4 KB window, which catches the repetition in member lists just as well.
+    data = json.dumps(value, separators=(',', ':'), default=str).encode("utf-8")
+    if len(data) <= SNAPSHOT_PLAIN_BYTES:
+        return data
+    packer = zlib.compressobj(6, zlib.DEFLATED, 12, 5)
+    return packer.compress(data) + packer.flush()
+
+def unpack_snapshot(blob):
+    # A zlib stream never starts with "{"
+    return json.loads(blob if blob[:1] == b'{' else zlib.decompress(blob))
+
+def snapshot_fields(fields):
+    # The member, assignment and constraint fields among save_group() `fields`,
+    # in the form load_group returns them once written
+    state = {}
+    if 'participants' in fields:
+        participants, fruits = list(fields['participants'] or []), list(fields['fruits'] or [])
+        if None in participants:
+            participants = [name for name in participants if name is not None]
+        while fruits and fruits[-1] is None:
+            fruits.pop()
+        state['participants'] = participants
+        state['fruits'] = fruits
+    if 'manual_assignments' in fields:
+        state['manual_assignments'] = None
+        if fields['manual_assignments']:
+            slots, month_count = {}, 0
+            for key, indices in fields['manual_assignments'].items():
+                month_index = int(key.split('_')[1])
+                month_count = max(month_count, month_index + 1)
+                for position, member_index in enumerate(indices):
+                    slots[int(member_index)] = (month_index, position)
+            months = {f"month_{m}": [] for m in range(month_count)}
+            for member_index, (month_index, _) in sorted(slots.items(), key=lambda item: item[1]):
+                months[f"month_{month_index}"].append(member_index)
+            state['manual_assignments'] = months
+    if 'constraints' in fields:
+        rows = sorted(set(constraint_rows(fields['constraints'])))
+        state['constraints'] = {str(idx): rules for idx, rules in constraints_from_rows(rows).items()}
+    return state
+
+def snapshot_delta(base, state):
+    # Field-level delta taking `base` to `state`: lists keep their new length and the
+    # items that differ by index, dicts the keys that changed or went, anything else
+    # is replaced whole
+    delta = {}
+    for field, value in state.items():
+        old = base.get(field)
+        if value == old:
+            continue
+        if isinstance(value, list) and isinstance(old, list):
+            # compress/map keep the item-by-item comparison in C
+            changed = compress(range(len(value)), map(ne, value, old))
+            delta[field] = {'len': len(value),
+                            'set': {str(i): value[i] for i in chain(changed, range(len(old), len(value)))}}
+        elif isinstance(value, dict) and isinstance(old, dict):
+            delta[field] = {'keys': {key: item for key, item in value.items() if key not in old or old[key] != item},
+                            'drop': [key for key in old if key not in value]}
+        else:
+            delta[field] = {'value': value}
+    return delta
+
+def apply_snapshot_delta(base, delta):
+    state = copy_record(base)
+    for field, change in delta.items():
+        if 'value' in change:
+            state[field] = change['value']
+        elif 'len' in change:
+            items = list(state.get(field) or [])[:change['len']]
+            items.extend([None] * (change['len'] - len(items)))
+            for i, item in change['set'].items():
+                items[int(i)] = item
+            state[field] = items
+        else:
+            items = dict(state.get(field) or {})
+            for key in change['drop']:
+                items.pop(key, None)
+            items.update(change['keys'])
+            state[field] = items
+    return state
+
+def snapshot_changes(old, new):
+    # (field, item, old, new) rows between two snapshots; item is the 0-based list
+    # index or dict key, or None for a field replaced whole
+    rows = []
+    for field in new:
+        before, after = old.get(field), new.get(field)
+        if before == after:
+            continue
+        if isinstance(before, list) and isinstance(after, list):
+            for i in range(max(len(before), len(after))):
+                a = before[i] if i < len(before) else None
+                b = after[i] if i < len(after) else None
+                if a != b:
+                    rows.append((field, i, a, b))
+        elif isinstance(before, dict) and isinstance(after, dict):
+            for key in list(before) + [key for key in after if key not in before]:
+                if before.get(key) != after.get(key):
+                    rows.append((field, key, before.get(key), after.get(key)))
+        else:
+            rows.append((field, None, before, after))
+    return rows
+
+class ReadCache:
+    # Bounded LRU of DatabaseManager read results, shared by every session using
+    # the manager. Every invalidation bumps a generation number; a read that
+    # started before an invalidation is not stored, so stale rows never land.
+    LIST_KINDS = ('page', 'count', 'all')
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.generation = 0
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value, generation):
+        with self._lock:
+            if generation != self.generation or self.max_entries <= 0:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, names=(), lists=True):
+        # Drops the entries of the named groups, and every group listing if lists is set
+        names = set(names)
+        with self._lock:
+            self.generation += 1
+            for key in list(self._entries):
+                if (key[0] in self.LIST_KINDS and lists) or (key[0] not in self.LIST_KINDS and key[1] in names):
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+class DatabaseManager:
+    def __init__(self, db_name="njangi_groups.db", cache_entries=256):
+        self.db_name = db_name
+        self.pool = ConnectionPool(db_name)
+        self.init_database()
+        self.read_cache = ReadCache(cache_entries)
+        # group_id -> latest version and its checkpoint, so saves skip decompressing them
+        self._snapshot_heads = OrderedDict()
+        self._snapshot_lock = threading.Lock()
+        # A connection that never writes: its PRAGMA data_version moves whenever any
+        # other connection, in this process or another, commits to the database
+        self._watch = sqlite3.connect(db_name, check_same_thread=False, isolation_level=None)
+        self._watch_lock = threading.Lock()
+        self._data_version = self._watch.execute('PRAGMA data_version').fetchone()[0]
+        self._change_seq = self._watch.execute('SELECT COALESCE(MAX(seq), 0) FROM njangi_changes').fetchone()[0]
+
+    def transaction(self):
+        return self.pool.transaction()
+
+    def close(self):
+        self.pool.close()
+        with self._watch_lock:
+            self._watch.close()
+
+    def _sync_changes(self):
+        # Cheap when nothing was committed; otherwise reads the change log written by
+        # triggers and drops exactly the groups that changed
+        with self._watch_lock:
+            version = self._watch.execute('PRAGMA data_version').fetchone()[0]
+            if version == self._data_version:
+                return
+            self._data_version = version
+            changes = self._watch.execute(
+                'SELECT seq, name, kind FROM njangi_changes WHERE seq > ? ORDER BY seq', (self._change_seq,)
+            ).fetchall()
+            if not changes:
+                return
+            if changes[0][0] > self._change_seq + 1:
+                # The log was pruned past what we last saw
+                self.read_cache.clear()
+            else:
+                self.read_cache.invalidate({name for _, name, _ in changes if name},
+                                           lists=any(kind == 'group' for _, _, kind in changes))
+            self._change_seq = changes[-1][0]
+
+    def _cached(self, key, load, copy_value=copy_record):
+        self._sync_changes()
+        found, value = self.read_cache.get(key)
+        if found:
+            return copy_value(value)
+        generation = self.read_cache.generation
+        value = load()
+        if self.read_cache.max_entries > 0:
+            self.read_cache.put(key, copy_value(value), generation)
+        return value
+
+    def init_database(self):
+        with self.pool.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS njangi_groups (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT UNIQUE NOT NULL,
+                    size INTEGER NOT NULL,
+                    loan INTEGER NOT NULL,
+                    time INTEGER NOT NULL,
+                    base INTEGER,
+                    start_month INTEGER,
+                    start_year INTEGER,
+                    participants TEXT,
+                    fruits TEXT,
+                    manual_assignments TEXT,
+                    rules TEXT,
+                    has_loans INTEGER DEFAULT 0,
+                    interest_rate REAL DEFAULT 0.0,
+                    loan_duration INTEGER DEFAULT 1,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS njangi_sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    group_id INTEGER,
+                    session_data TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    version INTEGER,
+                    checkpoint_id INTEGER,
+                    snapshot BLOB,
+                    changed TEXT,
+                    FOREIGN KEY (group_id) REFERENCES njangi_groups (id)
+                )
+            ''')
+
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS njangi_members (
+                    group_id INTEGER NOT NULL,
+                    member_index INTEGER NOT NULL,
+                    name TEXT,
+                    fruit TEXT,
+                    PRIMARY KEY (group_id, member_index),
+                    FOREIGN KEY (group_id) REFERENCES njangi_groups (id) ON DELETE CASCADE
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS njangi_assignments (
+                    group_id INTEGER NOT NULL,
+                    member_index INTEGER NOT NULL,
+                    month_index INTEGER NOT NULL,
+                    position INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (group_id, member_index),
+                    FOREIGN KEY (group_id) REFERENCES njangi_groups (id) ON DELETE CASCADE
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS njangi_member_constraints (
+                    group_id INTEGER NOT NULL,
+                    member_index INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    value INTEGER NOT NULL,
+                    PRIMARY KEY (group_id, member_index, kind, value),
+                    FOREIGN KEY (group_id) REFERENCES njangi_groups (id) ON DELETE CASCADE
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS njangi_schedules (
+                    group_id INTEGER PRIMARY KEY,
+                    schedule_key TEXT NOT NULL,
+                    seed INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (group_id) REFERENCES njangi_groups (id) ON DELETE CASCADE
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS njangi_schedule_slots (
+                    group_id INTEGER NOT NULL,
+                    member_index INTEGER NOT NULL,
+                    month_index INTEGER NOT NULL,
+                    position INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (group_id, member_index),
+                    FOREIGN KEY (group_id) REFERENCES njangi_schedules (group_id) ON DELETE CASCADE
+                ) WITHOUT ROWID
+            ''')
+            # Change log for cross-process cache invalidation: one row per changed group
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS njangi_changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    group_id INTEGER,
+                    name TEXT,
+                    kind TEXT NOT NULL
+                )
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_groups_insert AFTER INSERT ON njangi_groups BEGIN
+                    INSERT INTO njangi_changes (group_id, name, kind) VALUES (NEW.id, NEW.name, 'group');
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_groups_update AFTER UPDATE ON njangi_groups BEGIN
+                    INSERT INTO njangi_changes (group_id, name, kind) VALUES (NEW.id, NEW.name, 'group');
+                    INSERT INTO njangi_changes (group_id, name, kind)
+                    SELECT OLD.id, OLD.name, 'group' WHERE OLD.name IS NOT NEW.name;
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS trg_groups_delete AFTER DELETE ON njangi_groups BEGIN
+                    INSERT INTO njangi_changes (group_id, name, kind) VALUES (OLD.id, OLD.name, 'group');
+                END
+            ''')
+            for event, row in (('INSERT', 'NEW'), ('DELETE', 'OLD')):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_schedules_{event.lower()} AFTER {event} ON njangi_schedules BEGIN
+                        INSERT INTO njangi_changes (group_id, name, kind)
+                        VALUES ({row}.group_id, (SELECT name FROM njangi_groups WHERE id = {row}.group_id), 'schedule');
+                    END
+                ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_changes_prune AFTER INSERT ON njangi_changes
+                WHEN NEW.seq % 1000 = 0 BEGIN
+                    DELETE FROM njangi_changes WHERE seq <= NEW.seq - {CHANGE_LOG_KEEP};
+                END
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS njangi_render_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    group_name TEXT NOT NULL,
+                    report_key TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    payload TEXT,
+                    pdf BLOB,
+                    error TEXT,
+                    created_at TIMESTAMP,
+                    started_at TIMESTAMP,
+                    finished_at TIMESTAMP
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_render_jobs_group ON njangi_render_jobs (group_name, id)')
+            self._create_ledger(cursor)
+            methods = ", ".join(f"'{method}'" for method in LOAN_METHODS)
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS njangi_loans (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    group_id INTEGER NOT NULL,
+                    member_index INTEGER NOT NULL,
+                    principal INTEGER NOT NULL CHECK (principal >= 0),
+                    annual_rate REAL NOT NULL DEFAULT 0 CHECK (annual_rate >= 0),
+                    term INTEGER NOT NULL CHECK (term >= 1),
+                    method TEXT NOT NULL CHECK (method IN ({methods})),
+                    month_index INTEGER NOT NULL DEFAULT 0,
+                    FOREIGN KEY (group_id) REFERENCES njangi_groups (id) ON DELETE CASCADE
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_loans_group ON njangi_loans (group_id, member_index)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_groups_updated ON njangi_groups (updated_at DESC, id DESC)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_groups_name_nocase ON njangi_groups (name COLLATE NOCASE)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_members_name ON njangi_members (group_id, name)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_members_fruit ON njangi_members (group_id, fruit)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_assignments_month ON njangi_assignments (group_id, month_index, position)')
+            # Groups keyed by their payout terms, so the portfolio dashboard's GROUP BY is an index-only scan
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_groups_terms ON njangi_groups ({START_YM}, size, loan, time, base)')
+
+            # Add missing columns if they don't exist
+            for col, default in [("rules", "''"), ("has_loans", "0"), ("interest_rate", "0.0"), ("loan_duration", "1"),
+                                 ("assignment_months", "NULL")]:
+                try:
+                    cursor.execute(f"SELECT {col} FROM njangi_groups LIMIT 1")
+                except sqlite3.OperationalError:
+                    col_type = 'REAL' if col == 'interest_rate' else ('INTEGER' if col in ['has_loans', 'loan_duration', 'assignment_months'] else 'TEXT')
+                    cursor.execute(f"ALTER TABLE njangi_groups ADD COLUMN {col} {col_type} DEFAULT {default}")
+
+            # Version history columns on njangi_sessions, which older databases created without them
+            session_columns = {row[1] for row in cursor.execute("PRAGMA table_info(njangi_sessions)")}
+            for col, col_type in [("version", "INTEGER"), ("checkpoint_id", "INTEGER"), ("snapshot", "BLOB"),
+                                  ("changed", "TEXT")]:
+                if col not in session_columns:
+                    cursor.execute(f"ALTER TABLE njangi_sessions ADD COLUMN {col} {col_type}")
+            cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_version ON njangi_sessions (group_id, version)')
+
+            self._migrate_json_columns(conn)
+
+    def _create_ledger(self, cursor):
+        # Append-only contributions/payouts ledger. Triggers keep per-member
+        # balances and per-month totals materialized; a balance row appears with
+        # the member's first ledger entry, so members without one have paid nothing.
+        kinds = ", ".join(f"'{kind}'" for kind in LEDGER_KINDS)
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS njangi_ledger (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                group_id INTEGER NOT NULL,
+                member_index INTEGER NOT NULL,
+                month_index INTEGER NOT NULL,
+                kind TEXT NOT NULL CHECK (kind IN ({kinds})),
+                amount INTEGER NOT NULL,
+                note TEXT,
+                recorded_at TIMESTAMP,
+                FOREIGN KEY (group_id) REFERENCES njangi_groups (id) ON DELETE CASCADE
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS njangi_balances (
+                group_id INTEGER NOT NULL,
+                member_index INTEGER NOT NULL,
+                paid INTEGER NOT NULL DEFAULT 0,
+                received INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (group_id, member_index),
+                FOREIGN KEY (group_id) REFERENCES njangi_groups (id) ON DELETE CASCADE
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS njangi_month_totals (
+                group_id INTEGER NOT NULL,
+                month_index INTEGER NOT NULL,
+                collected INTEGER NOT NULL DEFAULT 0,
+                paid_out INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (group_id, month_index),
+                FOREIGN KEY (group_id) REFERENCES njangi_groups (id) ON DELETE CASCADE
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_ledger_month ON njangi_ledger (group_id, month_index)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_ledger_member ON njangi_ledger (group_id, member_index)')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_ledger_no_update BEFORE UPDATE ON njangi_ledger BEGIN
+                SELECT RAISE(ABORT, 'njangi_ledger is append-only; record a reversing entry instead');
+            END
+        ''')
+        # Rows may only go when their group is deleted (the cascade runs after the group row is gone)
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_ledger_no_delete BEFORE DELETE ON njangi_ledger
+            WHEN EXISTS (SELECT 1 FROM njangi_groups WHERE id = OLD.group_id) BEGIN
+                SELECT RAISE(ABORT, 'njangi_ledger is append-only; record a reversing entry instead');
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_ledger_totals AFTER INSERT ON njangi_ledger BEGIN
+                INSERT INTO njangi_balances (group_id, member_index, paid, received)
+                VALUES (NEW.group_id, NEW.member_index,
+                        CASE NEW.kind WHEN 'payout' THEN 0 ELSE NEW.amount END,
+                        CASE NEW.kind WHEN 'payout' THEN NEW.amount ELSE 0 END)
+                ON CONFLICT (group_id, member_index) DO UPDATE SET
+                    paid = paid + excluded.paid, received = received + excluded.received;
+                INSERT INTO njangi_month_totals (group_id, month_index, collected, paid_out)
+                VALUES (NEW.group_id, NEW.month_index,
+                        CASE NEW.kind WHEN 'payout' THEN 0 ELSE NEW.amount END,
+                        CASE NEW.kind WHEN 'payout' THEN NEW.amount ELSE 0 END)
+                ON CONFLICT (group_id, month_index) DO UPDATE SET
+                    collected = collected + excluded.collected, paid_out = paid_out + excluded.paid_out;
+            END
+        ''')
+        # Databases created before balances went lazy still carry the per-member trigger and index
+        cursor.execute('DROP TRIGGER IF EXISTS trg_members_balance')
+        cursor.execute('DROP INDEX IF EXISTS idx_balances_paid')
+
+    def _migrate_json_columns(self, conn):
+        # Move the legacy participants/fruits/manual_assignments JSON blobs into the child tables
+        legacy = conn.execute('''
+            SELECT id, participants, fruits, manual_assignments FROM njangi_groups
+            WHERE participants IS NOT NULL OR fruits IS NOT NULL OR manual_assignments IS NOT NULL
+        ''').fetchall()
+        for group_id, participants, fruits, manual_assignments in legacy:
+            def decode(text):
+                try:
+                    return json.loads(text) if text else None
+                except (json.JSONDecodeError, TypeError):
+                    return None
+            self._write_members(conn, group_id, decode(participants) or [], decode(fruits) or [])
+            self._write_assignments(conn, group_id, decode(manual_assignments))
+            conn.execute('''
+                UPDATE njangi_groups SET participants = NULL, fruits = NULL, manual_assignments = NULL
+                WHERE id = ?
+            ''', (group_id,))
+
+    def _write_members(self, conn, group_id, participants, fruits):
+        # Diff against the stored rows so that unchanged members cost no writes
+        stored = {
+            idx: (name, fruit) for idx, name, fruit in conn.execute(
+                'SELECT member_index, name, fruit FROM njangi_members WHERE group_id = ?', (group_id,)
+            )
+        }
+        count = max(len(participants), len(fruits))
+        changed = []
+        for idx in range(count):
+            row = (participants[idx] if idx < len(participants) else None,
+                   fruits[idx] if idx < len(fruits) else None)
+            if stored.get(idx) != row:
+                changed.append((group_id, idx) + row)
+        if changed or len(stored) > count:
+            # Ledger entries and loans are keyed by member_index, so a stored member may
+            # not move to another index or disappear once either refers to them
+            arrived = {row[2:] for row in changed}
+            moved = [row[1] for row in changed if stored.get(row[1]) in arrived]
+            if len(stored) > count:
+                moved.extend(idx for idx in stored if idx >= count)
+            if moved:
+                self._check_member_history(conn, group_id, moved)
+        if changed:
+            conn.executemany('''
+                INSERT INTO njangi_members (group_id, member_index, name, fruit) VALUES (?, ?, ?, ?)
+                ON CONFLICT (group_id, member_index) DO UPDATE SET name = excluded.name, fruit = excluded.fruit
+            ''', changed)
+        if len(stored) > count:
+            conn.execute('DELETE FROM njangi_members WHERE group_id = ? AND member_index >= ?', (group_id, count))
+
+    def _check_member_history(self, conn, group_id, member_indices):
+        placeholders = ",".join("?" * len(member_indices))
+        blocked = sorted(idx for (idx,) in conn.execute(f'''
+            SELECT DISTINCT member_index FROM njangi_ledger WHERE group_id = ? AND member_index IN ({placeholders})
+            UNION SELECT member_index FROM njangi_loans WHERE group_id = ? AND member_index IN ({placeholders})
+        ''', [group_id, *member_indices, group_id, *member_indices]))
+        if blocked:
+            raise ValueError(
+                f"Member(s) {', '.join(f'#{idx + 1}' for idx in blocked[:10])}{' ...' if len(blocked) > 10 else ''} "
+                "have ledger entries or loans, so they cannot be removed or moved to another position; "
+                "rename members in place instead")
+
+    def _write_assignments(self, conn, group_id, manual_assignments):
+        month_count = None
+        desired = {}
+        if manual_assignments:
+            month_count = 0
+            for key, indices in manual_assignments.items():
+                month_index = int(key.split('_')[1])
+                month_count = max(month_count, month_index + 1)
+                for position, member_index in enumerate(indices):
+                    desired[int(member_index)] = (month_index, position)
+        stored = {
+            member_index: (month_index, position) for member_index, month_index, position in conn.execute(
+                'SELECT member_index, month_index, position FROM njangi_assignments WHERE group_id = ?', (group_id,)
+            )
+        }
+        changed = [(group_id, idx) + slot for idx, slot in desired.items() if stored.get(idx) != slot]
+        removed = [(group_id, idx) for idx in stored if idx not in desired]
+        if changed:
+            conn.executemany('''
+                INSERT INTO njangi_assignments (group_id, member_index, month_index, position) VALUES (?, ?, ?, ?)
+                ON CONFLICT (group_id, member_index) DO UPDATE SET month_index = excluded.month_index, position = excluded.position
+            ''', changed)
+        if removed:
+            conn.executemany('DELETE FROM njangi_assignments WHERE group_id = ? AND member_index = ?', removed)
+        conn.execute('UPDATE njangi_groups SET assignment_months = ? WHERE id = ? AND assignment_months IS NOT ?',
+                     (month_count, group_id, month_count))
+
+    def _write_constraints(self, conn, group_id, constraints):
+        desired = set(constraint_rows(constraints))
+        stored = set(conn.execute(
+            'SELECT member_index, kind, value FROM njangi_member_constraints WHERE group_id = ?', (group_id,)
+        ).fetchall())
+        if stored - desired:
+            conn.executemany('''
+                DELETE FROM njangi_member_constraints
+                WHERE group_id = ? AND member_index = ? AND kind = ? AND value = ?
+            ''', [(group_id,) + row for row in stored - desired])
+        if desired - stored:
+            conn.executemany('''
+                INSERT INTO njangi_member_constraints (group_id, member_index, kind, value) VALUES (?, ?, ?, ?)
+            ''', [(group_id,) + row for row in desired - stored])
+
+    def save_group(self, name, size, loan, time, base, start_month, start_year, participants, fruits, manual_assignments=None, rules="", has_loans=False, interest_rate=0.0, loan_duration=1, constraints=None):
+        try:
+            with self.pool.transaction() as conn:
+                result = conn.execute(f'''
+                    INSERT INTO njangi_groups 
+                    (name, size, loan, time, base, start_month, start_year, rules, has_loans, interest_rate, loan_duration, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (name) DO UPDATE SET
+                        size = excluded.size, loan = excluded.loan, time = excluded.time, base = excluded.base,
+                        start_month = excluded.start_month, start_year = excluded.start_year, rules = excluded.rules,
+                        has_loans = excluded.has_loans, interest_rate = excluded.interest_rate,
+                        loan_duration = excluded.loan_duration, updated_at = excluded.updated_at
+                    RETURNING {self.GROUP_COLUMNS}
+                ''', (
+                    name, size, loan, time, base, start_month, start_year,
+                    rules, int(has_loans), float(interest_rate), int(loan_duration),
+                    datetime.now()
+                )).fetchone()
+                group_id = result[0]
+                written = {}
+                changes = conn.total_changes
+                self._write_members(conn, group_id, participants or [], fruits or [])
+                if conn.total_changes != changes:
+                    written.update(participants=participants, fruits=fruits)
+                changes = conn.total_changes
+                self._write_assignments(conn, group_id, manual_assignments)
+                if conn.total_changes != changes:
+                    written['manual_assignments'] = manual_assignments
+                if constraints is not None:
+                    changes = conn.total_changes
+                    self._write_constraints(conn, group_id, constraints)
+                    if conn.total_changes != changes:
+                        written['constraints'] = constraints
+                self._record_snapshot(conn, group_id, result, written)
+            self.read_cache.invalidate([name])
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    GROUP_SCALARS = {
+        'size': int, 'loan': int, 'time': int, 'base': int, 'start_month': int, 'start_year': int,
+        'rules': str, 'has_loans': int, 'interest_rate': float, 'loan_duration': int,
+    }
+
+    def update_group_fields(self, name, **fields):
+        # Writes only the given save_group() fields of an existing group, in one short
+        # transaction. Returns False if there is no such group.
+        unknown = set(fields) - set(self.GROUP_SCALARS) - {'participants', 'fruits', 'manual_assignments', 'constraints'}
+        if unknown:
+            raise ValueError(f"Unknown group fields: {', '.join(sorted(unknown))}")
+        if ('participants' in fields) != ('fruits' in fields):
+            raise ValueError("participants and fruits must be updated together")
+        columns = [column for column in self.GROUP_SCALARS if column in fields]
+        values = [None if fields[column] is None else self.GROUP_SCALARS[column](fields[column]) for column in columns]
+        assignments = ''.join(f'{column} = ?, ' for column in columns)
+        with self.pool.transaction() as conn:
+            row = conn.execute(f'''
+                UPDATE njangi_groups SET {assignments}updated_at = ? WHERE name = ? RETURNING {self.GROUP_COLUMNS}
+            ''', values + [datetime.now(), name]).fetchone()
+            if row is None:
+                return False
+            written = {}
+            if 'participants' in fields:
+                changes = conn.total_changes
+                self._write_members(conn, row[0], fields['participants'] or [], fields['fruits'] or [])
+                if conn.total_changes != changes:
+                    written.update(participants=fields['participants'], fruits=fields['fruits'])
+            if 'manual_assignments' in fields:
+                changes = conn.total_changes
+                self._write_assignments(conn, row[0], fields['manual_assignments'])
+                if conn.total_changes != changes:
+                    written['manual_assignments'] = fields['manual_assignments']
+            if 'constraints' in fields:
+                changes = conn.total_changes
+                self._write_constraints(conn, row[0], fields['constraints'])
+                if conn.total_changes != changes:
+                    written['constraints'] = fields['constraints']
+            self._record_snapshot(conn, row[0], row, written)
+        self.read_cache.invalidate([name])
+        return True
+
+    SNAPSHOT_FIELDS = tuple(GROUP_SCALARS) + ('participants', 'fruits', 'manual_assignments', 'constraints')
+
+    SNAPSHOT_HEADS = 64
+
+    def _snapshot_head(self, conn, group_id):
+        # (head id, version, state, checkpoint id, checkpoint version, checkpoint state,
+        # checkpoint bytes) of the group's latest version, or None before the first one
+        head = conn.execute('''
+            SELECT id, version, checkpoint_id, snapshot FROM njangi_sessions
+            WHERE group_id = ? AND version IS NOT NULL ORDER BY version DESC LIMIT 1
+        ''', (group_id,)).fetchone()
+        if head is None:
+            return None
+        with self._snapshot_lock:
+            cached = self._snapshot_heads.get(group_id)
+        if cached is not None and cached[0] == head[0]:
+            return cached
+        head_id, version, checkpoint_id, blob = head
+        if checkpoint_id is None:
+            state = unpack_snapshot(blob)
+            return head_id, version, state, head_id, version, state, len(blob)
+        checkpoint_version, checkpoint_blob = conn.execute(
+            'SELECT version, snapshot FROM njangi_sessions WHERE id = ?', (checkpoint_id,)).fetchone()
+        checkpoint = unpack_snapshot(checkpoint_blob)
+        return (head_id, version, apply_snapshot_delta(checkpoint, unpack_snapshot(blob)),
+                checkpoint_id, checkpoint_version, checkpoint, len(checkpoint_blob))
+
+    def _record_snapshot(self, conn, group_id, result=None, fields=None):
+        # Appends the group's stored state to its version history unless it matches
+        # the latest version. A version is a field delta against the last full
+        # checkpoint, so any version is rebuilt from at most two rows. `result` is
+        # the njangi_groups row as written and `fields` the save_group() fields whose
+        # rows were rewritten; they update the latest version in memory. Child rows
+        # are read back only for a group's first version, or when fields=None.
+        if result is None:
+            result = conn.execute(f'SELECT {self.GROUP_COLUMNS} FROM njangi_groups WHERE id = ?',
+                                  (group_id,)).fetchone()
+        record = self._group_record(result, (), ())
+        head = self._snapshot_head(conn, group_id)
+        if head is not None and fields is not None:
+            state = dict(head[2])
+            state.update((field, record[field]) for field in self.GROUP_SCALARS)
+            state.update(snapshot_fields(fields))
+        else:
+            state = {field: record[field] for field in self.GROUP_SCALARS}
+            state.update(self._stored_fields(conn, result, snapshot_fields(fields or {})))
+        if head is not None and head[2] == state:
+            return None
+        snapshot = None
+        if head is None:
+            version, changed = 1, ''
+        else:
+            _, version, previous, checkpoint_id, checkpoint_version, checkpoint, checkpoint_bytes = head
+            version += 1
+            changed = ','.join(field for field in state if previous.get(field) != state[field])
+            if version - checkpoint_version < SNAPSHOT_CHECKPOINT_EVERY:
+                delta = pack_snapshot(snapshot_delta(checkpoint, state))
+                if len(delta) <= checkpoint_bytes * SNAPSHOT_DELTA_RATIO:
+                    snapshot = delta
+        if snapshot is None:
+            snapshot = pack_snapshot(state)
+            checkpoint_id = None
+        head_id = conn.execute('''
+            INSERT INTO njangi_sessions (group_id, version, checkpoint_id, snapshot, changed, created_at)
+            VALUES (?, ?, ?, ?, ?, ?) RETURNING id
+        ''', (group_id, version, checkpoint_id, snapshot, changed, datetime.now())).fetchone()[0]
+        if checkpoint_id is None:
+            head = (head_id, version, state, head_id, version, state, len(snapshot))
+        else:
+            head = (head_id, version, state, checkpoint_id, checkpoint_version, checkpoint, checkpoint_bytes)
+        with self._snapshot_lock:
+            self._snapshot_heads[group_id] = head
+            self._snapshot_heads.move_to_end(group_id)
+            while len(self._snapshot_heads) > self.SNAPSHOT_HEADS:
+                self._snapshot_heads.popitem(last=False)
+        return version
+
+    def _stored_fields(self, conn, result, known):
+        # The snapshot's member, assignment and constraint fields: `known` ones as
+        # given, the rest read from the group's rows
+        skip = [table for table, field in (('members', 'participants'), ('assignments', 'manual_assignments'),
+                                           ('constraints', 'constraints')) if field in known]
+        record = self._group_record(result, *self._group_rows(conn, result[0], schedule=False, skip=skip))
+        record['constraints'] = {str(idx): rules for idx, rules in record['constraints'].items()}
+        record.update(known)
+        return {field: record[field] for field in self.SNAPSHOT_FIELDS if field not in self.GROUP_SCALARS}
+
+    def group_history(self, name, limit=500):
+        # Newest first: (version, created_at, is a checkpoint, stored bytes, changed fields)
+        with self.pool.connection() as conn:
+            rows = conn.execute('''
+                SELECT s.version, s.created_at, s.checkpoint_id IS NULL, LENGTH(s.snapshot), s.changed
+                FROM njangi_sessions s JOIN njangi_groups g ON g.id = s.group_id
+                WHERE g.name = ? AND s.version IS NOT NULL ORDER BY s.version DESC LIMIT ?
+            ''', (name, limit)).fetchall()
+        return [(version, created_at, bool(is_checkpoint), stored, changed.split(',') if changed else [])
+                for version, created_at, is_checkpoint, stored, changed in rows]
+
+    def load_snapshot(self, name, version):
+        # The group's save_group() fields as of `version`, or None
+        with self.pool.connection() as conn:
+            row = conn.execute('''
+                SELECT s.snapshot, c.snapshot FROM njangi_sessions s
+                JOIN njangi_groups g ON g.id = s.group_id
+                LEFT JOIN njangi_sessions c ON c.id = s.checkpoint_id
+                WHERE g.name = ? AND s.version = ?
+            ''', (name, version)).fetchone()
+        if row is None:
+            return None
+        snapshot, checkpoint = row
+        if checkpoint is None:
+            return unpack_snapshot(snapshot)
+        return apply_snapshot_delta(unpack_snapshot(checkpoint), unpack_snapshot(snapshot))
+
+    def restore_snapshot(self, name, version):
+        # Saves `version` back as the group's current state; the restore is itself a new version
+        state = self.load_snapshot(name, version)
+        if state is None:
+            return False
+        return self.save_group(name, **state)
+
+    SCHEDULE_SELECT = '''
+        SELECT s.schedule_key, s.seed, sl.month_index, sl.member_index FROM njangi_schedules s
+        LEFT JOIN njangi_schedule_slots sl ON sl.group_id = s.group_id
+    '''
+
+    GROUP_COLUMNS = '''
+        id, name, size, loan, time, base, start_month, start_year,
+        assignment_months, rules, has_loans, interest_rate, loan_duration, created_at, updated_at
+    '''
+
+    @staticmethod
+    def _group_record(result, members, assignments, constraints=(), schedule=()):
+        participants = [member_name for member_name, _ in members if member_name is not None]
+        fruits = [fruit for _, fruit in members]
+        while fruits and fruits[-1] is None:
+            fruits.pop()
+        manual_assignments_data = None
+        if result[8] is not None:
+            manual_assignments_data = {f"month_{i}": [] for i in range(result[8])}
+            for month_index, member_index in assignments:
+                manual_assignments_data.setdefault(f"month_{month_index}", []).append(member_index)
+        return {
+            'id': result[0],
+            'name': result[1],
+            'size': result[2],
+            'loan': result[3],
+            'time': result[4],
+            'base': result[5],
+            'start_month': result[6],
+            'start_year': result[7],
+            'participants': participants,
+            'fruits': fruits,
+            'manual_assignments': manual_assignments_data,
+            'constraints': constraints_from_rows(constraints),
+            'schedule': schedule_from_rows(schedule),
+            'rules': result[9] or "",
+            'has_loans': bool(result[10]),
+            'interest_rate': float(result[11]) if result[11] is not None else 0.0,
+            'loan_duration': int(result[12]) if result[12] is not None else 1,
+            'created_at': result[13],
+            'updated_at': result[14]
+        }
+
+    def _group_rows(self, conn, group_id, schedule=True, skip=()):
+        # (members, assignments, constraints[, schedule]) rows for _group_record;
+        # tables named in `skip` are not read and come back empty
+        members = assignments = constraints = ()
+        if 'members' not in skip:
+            members = conn.execute(
+                'SELECT name, fruit FROM njangi_members WHERE group_id = ? ORDER BY member_index', (group_id,)
+            ).fetchall()
+        if 'assignments' not in skip:
+            assignments = conn.execute('''
+                SELECT month_index, member_index FROM njangi_assignments
+                WHERE group_id = ? ORDER BY month_index, position
+            ''', (group_id,)).fetchall()
+        if 'constraints' not in skip:
+            constraints = conn.execute('''
+                SELECT member_index, kind, value FROM njangi_member_constraints
+                WHERE group_id = ? ORDER BY member_index, kind, value
+            ''', (group_id,)).fetchall()
+        if not schedule:
+            return members, assignments, constraints
+        return members, assignments, constraints, conn.execute(f'''
+            {self.SCHEDULE_SELECT} WHERE s.group_id = ? ORDER BY sl.month_index, sl.position
+        ''', (group_id,)).fetchall()
+
+    def load_group(self, name):
+        return self._cached(('group', name), lambda: self._load_group(name))
+
+    def _load_group(self, name):
+        with self.pool.connection() as conn:
+            result = conn.execute(f'''
+                SELECT {self.GROUP_COLUMNS} FROM njangi_groups WHERE name = ?
+            ''', (name,)).fetchone()
+            if not result:
+                return None
+            rows = self._group_rows(conn, result[0])
+        try:
+            return self._group_record(result, *rows)
+        except Exception:
+            logger.exception("Error loading group %r", name)
+            return None
+
+    def iter_groups(self):
+        # Streams every group as a load_group()-style dict from one read snapshot.
+        # Groups and their member, assignment and constraint rows are walked with
+        # cursors sorted by group id, so memory use is bounded by the largest group.
+        with self.pool.connection() as conn:
+            own_snapshot = not conn.in_transaction
+            if own_snapshot:
+                conn.execute("BEGIN")
+            try:
+                groups = conn.execute(f'SELECT {self.GROUP_COLUMNS} FROM njangi_groups ORDER BY id')
+                members = conn.cursor().execute(
+                    'SELECT group_id, name, fruit FROM njangi_members ORDER BY group_id, member_index')
+                assignments = conn.cursor().execute('''
+                    SELECT group_id, month_index, member_index FROM njangi_assignments
+                    ORDER BY group_id, month_index, position
+                ''')
+                constraints = conn.cursor().execute('''
+                    SELECT group_id, member_index, kind, value FROM njangi_member_constraints
+                    ORDER BY group_id, member_index
+                ''')
+                schedules = conn.cursor().execute('''
+                    SELECT s.group_id, s.schedule_key, s.seed, sl.month_index, sl.member_index FROM njangi_schedules s
+                    LEFT JOIN njangi_schedule_slots sl ON sl.group_id = s.group_id
+                    ORDER BY s.group_id, sl.month_index, sl.position
+                ''')
+                next_member = members.fetchone()
+                next_assignment = assignments.fetchone()
+                next_constraint = constraints.fetchone()
+                next_slot = schedules.fetchone()
+                for result in groups:
+                    group_id = result[0]
+                    group_members, group_assignments, group_constraints, group_schedule = [], [], [], []
+                    while next_member is not None and next_member[0] <= group_id:
+                        if next_member[0] == group_id:
+                            group_members.append(next_member[1:])
+                        next_member = members.fetchone()
+                    while next_assignment is not None and next_assignment[0] <= group_id:
+                        if next_assignment[0] == group_id:
+                            group_assignments.append(next_assignment[1:])
+                        next_assignment = assignments.fetchone()
+                    while next_constraint is not None and next_constraint[0] <= group_id:
+                        if next_constraint[0] == group_id:
+                            group_constraints.append(next_constraint[1:])
+                        next_constraint = constraints.fetchone()
+                    while next_slot is not None and next_slot[0] <= group_id:
+                        if next_slot[0] == group_id:
+                            group_schedule.append(next_slot[1:])
+                        next_slot = schedules.fetchone()
+                    yield self._group_record(result, group_members, group_assignments, group_constraints,
+                                             group_schedule)
+            finally:
+                if own_snapshot and conn.in_transaction:
+                    conn.commit()
+
+    def import_groups(self, records, batch_size=500):
+        # Upserts an iterable of group dicts (as produced by iter_groups) in a single
+        # transaction, batching every statement with executemany. Returns the count;
+        # a bad record raises ValueError and rolls the whole import back.
+        total = 0
+        with self.pool.transaction() as conn:
+            batch = []
+            for number, record in enumerate(records, 1):
+                try:
+                    batch.append(check_group_record(record))
+                except ValueError as e:
+                    raise ValueError(f"record {number}: {e}") from None
+                if len(batch) >= batch_size:
+                    self._import_batch(conn, batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                self._import_batch(conn, batch)
+                total += len(batch)
+        self.read_cache.clear()
+        return total
+
+    def _import_batch(self, conn, batch):
+        now = datetime.now()
+        batch = list({record['name']: record for record in batch}.values())
+        conn.executemany('''
+            INSERT INTO njangi_groups
+            (name, size, loan, time, base, start_month, start_year, assignment_months, rules,
+             has_loans, interest_rate, loan_duration, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET
+                size = excluded.size, loan = excluded.loan, time = excluded.time, base = excluded.base,
+                start_month = excluded.start_month, start_year = excluded.start_year,
+                assignment_months = excluded.assignment_months, rules = excluded.rules,
+                has_loans = excluded.has_loans, interest_rate = excluded.interest_rate,
+                loan_duration = excluded.loan_duration, updated_at = excluded.updated_at
+        ''', [(
+            r['name'], int(r['size']), int(r['loan']), int(r['time']),
+            int(r['base']) if r.get('base') is not None else int(r['loan']) * int(r['time']),
+            r.get('start_month'), r.get('start_year'),
+            len(r['manual_assignments']) if r.get('manual_assignments') else None,
+            r.get('rules') or "", int(bool(r.get('has_loans'))),
+            float(r.get('interest_rate') or 0.0), int(r.get('loan_duration') or 1),
+            r.get('created_at') or now, r.get('updated_at') or now
+        ) for r in batch])
+        placeholders = ",".join("?" * len(batch))
+        ids = dict(conn.execute(
+            f'SELECT name, id FROM njangi_groups WHERE name IN ({placeholders})',
+            [r['name'] for r in batch]
+        ).fetchall())
+        id_params = [(ids[r['name']],) for r in batch]
+        # Groups with ledger entries or loans go through _write_members, which
+        # refuses to renumber members that history refers to
+        with_history = {group_id for (group_id,) in conn.execute(f'''
+            SELECT group_id FROM njangi_ledger WHERE group_id IN ({placeholders})
+            UNION SELECT group_id FROM njangi_loans WHERE group_id IN ({placeholders})
+        ''', [group_id for (group_id,) in id_params] * 2)}
+        conn.executemany('DELETE FROM njangi_members WHERE group_id = ?',
+                         [params for params in id_params if params[0] not in with_history])
+        conn.executemany('DELETE FROM njangi_assignments WHERE group_id = ?', id_params)
+        conn.executemany('DELETE FROM njangi_member_constraints WHERE group_id = ?', id_params)
+        conn.executemany('DELETE FROM njangi_schedules WHERE group_id = ?', id_params)
+        member_rows, assignment_rows, rule_rows, schedule_rows, slot_rows = [], [], [], [], []
+        for r in batch:
+            group_id = ids[r['name']]
+            participants, fruits = r.get('participants') or [], r.get('fruits') or []
+            if group_id in with_history:
+                try:
+                    self._write_members(conn, group_id, participants, fruits)
+                except ValueError as e:
+                    raise ValueError(f"{r['name']}: {e}") from None
+            else:
+                member_rows.extend((group_id, idx,
+                                    participants[idx] if idx < len(participants) else None,
+                                    fruits[idx] if idx < len(fruits) else None)
+                                   for idx in range(max(len(participants), len(fruits))))
+            for key, indices in (r.get('manual_assignments') or {}).items():
+                month_index = int(key.split('_')[1])
+                for position, member_index in enumerate(indices):
+                    assignment_rows.append((group_id, int(member_index), month_index, position))
+            rule_rows.extend((group_id,) + row for row in constraint_rows(r.get('constraints')))
+            if r.get('schedule'):
+                schedule_rows.append((group_id, r['schedule']['key'], r['schedule'].get('seed')))
+                slot_rows.extend((group_id,) + row for row in schedule_slot_rows(r['schedule']['assignments']))
+        conn.executemany('INSERT INTO njangi_members (group_id, member_index, name, fruit) VALUES (?, ?, ?, ?)',
+                         member_rows)
+        conn.executemany('''
+            INSERT OR REPLACE INTO njangi_assignments (group_id, member_index, month_index, position)
+            VALUES (?, ?, ?, ?)
+        ''', assignment_rows)
+        conn.executemany('''
+            INSERT OR IGNORE INTO njangi_member_constraints (group_id, member_index, kind, value) VALUES (?, ?, ?, ?)
+        ''', rule_rows)
+        conn.executemany('INSERT INTO njangi_schedules (group_id, schedule_key, seed) VALUES (?, ?, ?)', schedule_rows)
+        conn.executemany('''
+            INSERT OR IGNORE INTO njangi_schedule_slots (group_id, member_index, month_index, position) VALUES (?, ?, ?, ?)
+        ''', slot_rows)
+        # Groups with a version history get a version for the imported state, so
+        # their latest version keeps matching the stored rows
+        for (group_id,) in conn.execute(f'''
+            SELECT DISTINCT group_id FROM njangi_sessions WHERE version IS NOT NULL AND group_id IN ({placeholders})
+        ''', [group_id for (group_id,) in id_params]).fetchall():
+            self._record_snapshot(conn, group_id)
+
+    def export_groups(self, fp, fmt="jsonl"):
+        return write_groups_file(self.iter_groups(), fp, fmt)
+
+    def import_groups_file(self, fp, fmt="jsonl"):
+        return self.import_groups(read_groups_file(fp, fmt))
+
+    def _touch_group(self, conn, name):
+        row = conn.execute('UPDATE njangi_groups SET updated_at = ? WHERE name = ? RETURNING id',
+                           (datetime.now(), name)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return row[0]
+
+    def rename_member(self, name, member_index, new_name):
+        with self.pool.transaction() as conn:
+            group_id = self._touch_group(conn, name)
+            conn.execute('UPDATE njangi_members SET name = ? WHERE group_id = ? AND member_index = ?',
+                         (new_name, group_id, member_index))
+            self._record_snapshot(conn, group_id)
+        self.read_cache.invalidate([name])
+
+    def set_member_fruit(self, name, member_index, fruit):
+        with self.pool.transaction() as conn:
+            group_id = self._touch_group(conn, name)
+            conn.execute('UPDATE njangi_members SET fruit = ? WHERE group_id = ? AND member_index = ?',
+                         (fruit, group_id, member_index))
+            self._record_snapshot(conn, group_id)
+        self.read_cache.invalidate([name])
+
+    def set_member_month(self, name, member_index, month_index):
+        # month_index=None removes the member from its payout month
+        with self.pool.transaction() as conn:
+            group_id = self._touch_group(conn, name)
+            if month_index is None:
+                conn.execute('DELETE FROM njangi_assignments WHERE group_id = ? AND member_index = ?',
+                             (group_id, member_index))
+            else:
+                conn.execute('''
+                    INSERT INTO njangi_assignments (group_id, member_index, month_index, position)
+                    VALUES (?, ?, ?, (SELECT COUNT(*) FROM njangi_assignments WHERE group_id = ? AND month_index = ?))
+                    ON CONFLICT (group_id, member_index) DO UPDATE SET month_index = excluded.month_index, position = excluded.position
+                ''', (group_id, member_index, month_index, group_id, month_index))
+                conn.execute('''
+                    UPDATE njangi_groups SET assignment_months = MAX(COALESCE(assignment_months, 0), ?) WHERE id = ?
+                ''', (month_index + 1, group_id))
+            self._record_snapshot(conn, group_id)
+        self.read_cache.invalidate([name])
+
+    def get_member_months(self, name, member_name):
+        # [(member_index, month_index)] for every member called member_name; month_index is None if unassigned
+        with self.pool.connection() as conn:
+            return conn.execute('''
+                SELECT m.member_index, a.month_index
+                FROM njangi_groups g
+                JOIN njangi_members m ON m.group_id = g.id
+                LEFT JOIN njangi_assignments a ON a.group_id = m.group_id AND a.member_index = m.member_index
+                WHERE g.name = ? AND m.name = ?
+                ORDER BY m.member_index
+            ''', (name, member_name)).fetchall()
+
+    def get_month_members(self, name, month_index):
+        with self.pool.connection() as conn:
+            return [row[0] for row in conn.execute('''
+                SELECT a.member_index FROM njangi_groups g
+                JOIN njangi_assignments a ON a.group_id = g.id
+                WHERE g.name = ? AND a.month_index = ?
+                ORDER BY a.position
+            ''', (name, month_index))]
+
+    def get_all_groups(self):
+        return self._cached(('all',), self._get_all_groups, list)
+
+    def _get_all_groups(self):
+        with self.pool.connection() as conn:
+            return conn.execute('SELECT name, created_at, updated_at FROM njangi_groups ORDER BY updated_at DESC').fetchall()
+
+    def count_groups(self):
+        return self._cached(('count',), self._count_groups, int)
+
+    def _count_groups(self):
+        with self.pool.connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM njangi_groups').fetchone()[0]
+
+    def get_groups_page(self, prefix="", after=None, limit=20):
+        # Keyset pagination over (updated_at DESC, id DESC). `after` is the cursor
+        # returned for the previous page; the second return value is the cursor
+        # for the next page, or None on the last page.
+        return self._cached(('page', prefix, after, limit), lambda: self._get_groups_page(prefix, after, limit),
+                            lambda page: (list(page[0]), page[1]))
+
+    def _get_groups_page(self, prefix, after, limit):
+        clauses, params = [], []
+        if prefix:
+            escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            clauses.append("name LIKE ? ESCAPE '\\'")
+            params.append(escaped + '%')
+        if after is not None:
+            clauses.append("(updated_at, id) < (?, ?)")
+            params.extend(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.pool.connection() as conn:
+            rows = conn.execute(f'''
+                SELECT name, created_at, updated_at, id FROM njangi_groups {where}
+                ORDER BY updated_at DESC, id DESC LIMIT ?
+            ''', params + [limit + 1]).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1][2], rows[-1][3])
+        return [row[:3] for row in rows], next_cursor
+
+    def load_schedule(self, name):
+        # The group's stored payout schedule as {'key', 'seed', 'assignments'}, or None
+        return self._cached(('schedule', name), lambda: self._load_schedule(name))
+
+    def _load_schedule(self, name):
+        with self.pool.connection() as conn:
+            rows = conn.execute(f'''
+                {self.SCHEDULE_SELECT} JOIN njangi_groups g ON g.id = s.group_id
+                WHERE g.name = ? ORDER BY sl.month_index, sl.position
+            ''', (name,)).fetchall()
+        return schedule_from_rows(rows)
+
+    def save_schedule(self, name, schedule_key, seed, assignments):
+        # Replaces the group's stored schedule; returns False if the group is not saved yet
+        with self.pool.transaction() as conn:
+            row = conn.execute('SELECT id FROM njangi_groups WHERE name = ?', (name,)).fetchone()
+            if row is None:
+                return False
+            conn.execute('DELETE FROM njangi_schedules WHERE group_id = ?', (row[0],))
+            conn.execute('INSERT INTO njangi_schedules (group_id, schedule_key, seed, created_at) VALUES (?, ?, ?, ?)',
+                         (row[0], schedule_key, seed, datetime.now()))
+            conn.executemany('''
+                INSERT INTO njangi_schedule_slots (group_id, member_index, month_index, position) VALUES (?, ?, ?, ?)
+            ''', [(row[0],) + slot for slot in schedule_slot_rows(assignments)])
+        self.read_cache.invalidate([name], lists=False)
+        return True
+
+    def clear_schedule(self, name):
+        with self.pool.transaction() as conn:
+            conn.execute('DELETE FROM njangi_schedules WHERE group_id IN (SELECT id FROM njangi_groups WHERE name = ?)',
+                         (name,))
+        self.read_cache.invalidate([name], lists=False)
+
+    def delete_group(self, name):
+        with self.pool.transaction() as conn:
+            conn.execute('DELETE FROM njangi_sessions WHERE group_id IN (SELECT id FROM njangi_groups WHERE name = ?)', (name,))
+            conn.execute('DELETE FROM njangi_groups WHERE name = ?', (name,))
+        self.read_cache.invalidate([name])
+
+    RENDER_JOB_COLUMNS = 'id, group_name, report_key, filename, status, error, created_at, started_at, finished_at'
+
+    @classmethod
+    def _render_job(cls, row):
+        return dict(zip([column.strip() for column in cls.RENDER_JOB_COLUMNS.split(',')], row)) if row else None
+
+    def create_render_job(self, group_name, report_key, filename, payload):
+        # Queues a report render and drops finished jobs older than RENDER_JOB_KEEP; returns the job id
+        now = datetime.now()
+        with self.pool.transaction() as conn:
+            conn.execute("DELETE FROM njangi_render_jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                         (now - RENDER_JOB_KEEP,))
+            return conn.execute('''
+                INSERT INTO njangi_render_jobs (group_name, report_key, filename, status, payload, created_at)
+                VALUES (?, ?, ?, 'queued', ?, ?) RETURNING id
+            ''', (group_name, report_key, filename, json.dumps(payload), now)).fetchone()[0]
+
+    def get_render_job(self, job_id):
+        with self.pool.connection() as conn:
+            return self._render_job(conn.execute(
+                f'SELECT {self.RENDER_JOB_COLUMNS} FROM njangi_render_jobs WHERE id = ?', (job_id,)
+            ).fetchone())
+
+    def latest_render_job(self, group_name):
+        with self.pool.connection() as conn:
+            return self._render_job(conn.execute(
+                f'SELECT {self.RENDER_JOB_COLUMNS} FROM njangi_render_jobs WHERE group_name = ? ORDER BY id DESC LIMIT 1',
+                (group_name,)
+            ).fetchone())
+
+    def render_job_pdf(self, job_id):
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT pdf FROM njangi_render_jobs WHERE id = ? AND status = 'done'", (job_id,)).fetchone()
+        return bytes(row[0]) if row and row[0] is not None else None
+
+    def fail_render_job(self, job_id, error):
+        with self.pool.transaction() as conn:
+            conn.execute('''
+                UPDATE njangi_render_jobs SET status = 'failed', error = ?, payload = NULL, finished_at = ?
+                WHERE id = ? AND status IN ('queued', 'running')
+            ''', (error, datetime.now(), job_id))
+
+    def recover_render_jobs(self):
+        # At startup: jobs left running by a previous server are failed, queued ones are returned to re-dispatch
+        with self.pool.transaction() as conn:
+            conn.execute('''
+                UPDATE njangi_render_jobs SET status = 'failed', error = 'Interrupted by a server restart',
+                payload = NULL, finished_at = ? WHERE status = 'running'
+            ''', (datetime.now(),))
+            return [row[0] for row in conn.execute("SELECT id FROM njangi_render_jobs WHERE status = 'queued' ORDER BY id")]
+
+    def record_ledger_entries(self, name, entries):
+        # Appends (member_index, month_index, kind, amount, note) rows in one transaction
+        now = datetime.now()
+        with self.pool.transaction() as conn:
+            row = conn.execute('SELECT id FROM njangi_groups WHERE name = ?', (name,)).fetchone()
+            if row is None:
+                raise KeyError(name)
+            rows = []
+            for member_index, month_index, kind, amount, note in entries:
+                if kind not in LEDGER_KINDS:
+                    raise ValueError(f"Unknown ledger entry kind: {kind}")
+                rows.append((row[0], int(member_index), int(month_index), kind, int(amount), note or None, now))
+            conn.executemany('''
+                INSERT INTO njangi_ledger (group_id, member_index, month_index, kind, amount, note, recorded_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+        return len(rows)
+
+    def month_ledger(self, name, month_index):
+        # Every entry of one cycle month, oldest first
+        with self.pool.connection() as conn:
+            return conn.execute('''
+                SELECT l.id, l.member_index, l.kind, l.amount, l.note, l.recorded_at
+                FROM njangi_ledger l JOIN njangi_groups g ON g.id = l.group_id
+                WHERE g.name = ? AND l.month_index = ? ORDER BY l.id
+            ''', (name, month_index)).fetchall()
+
+    def member_ledger(self, name, member_index):
+        with self.pool.connection() as conn:
+            return conn.execute('''
+                SELECT l.id, l.month_index, l.kind, l.amount, l.note, l.recorded_at
+                FROM njangi_ledger l JOIN njangi_groups g ON g.id = l.group_id
+                WHERE g.name = ? AND l.member_index = ? ORDER BY l.id
+            ''', (name, member_index)).fetchall()
+
+    def member_balances(self, name):
+        # {member_index: (paid, received)} from the materialized balances
+        with self.pool.connection() as conn:
+            return {member_index: (paid, received) for member_index, paid, received in conn.execute('''
+                SELECT b.member_index, b.paid, b.received
+                FROM njangi_balances b JOIN njangi_groups g ON g.id = b.group_id WHERE g.name = ?
+            ''', (name,))}
+
+    def month_totals(self, name):
+        # {month_index: (collected, paid_out)}
+        with self.pool.connection() as conn:
+            return {month_index: (collected, paid_out) for month_index, collected, paid_out in conn.execute('''
+                SELECT t.month_index, t.collected, t.paid_out
+                FROM njangi_month_totals t JOIN njangi_groups g ON g.id = t.group_id WHERE g.name = ?
+            ''', (name,))}
+
+    def members_behind(self, year, month, limit=500):
+        # Members of every running group whose contributions are short of loan x
+        # months elapsed as of (year, month). Members are walked per group on their
+        # primary key and probe njangi_balances by key (CROSS JOIN pins the join
+        # order, groups outermost); no balance row means nothing paid yet. Nothing
+        # in the ledger is replayed.
+        elapsed = f'MIN(g.time, ({int(year)} - g.start_year) * 12 + ({int(month)} - g.start_month) + 1)'
+        with self.pool.connection() as conn:
+            return conn.execute(f'''
+                SELECT g.name, m.member_index, m.name, {elapsed} - 1 AS month_index,
+                       g.loan * {elapsed} AS expected, COALESCE(b.paid, 0) AS paid,
+                       g.loan * {elapsed} - COALESCE(b.paid, 0) AS arrears
+                FROM njangi_groups g
+                CROSS JOIN njangi_members m ON m.group_id = g.id
+                LEFT JOIN njangi_balances b ON b.group_id = m.group_id AND b.member_index = m.member_index
+                WHERE {elapsed} > 0 AND COALESCE(b.paid, 0) < g.loan * {elapsed}
+                ORDER BY arrears DESC, g.name, m.member_index LIMIT ?
+            ''', (limit,)).fetchall()
+
+    def portfolio_months(self, first=None, last=None):
+        # Per calendar month across every group, from the stored terms alone:
+        # (year, month, active groups, members, inflow, members paid, payouts, outstanding).
+        # Groups with identical terms and start month collapse into one plan (an
+        # index-only scan of idx_groups_terms); each plan is expanded over its
+        # months with the closed form of payout_counts, where members paid by month
+        # k is min((k + 1) * size * loan // base, size) and the last month pays
+        # everyone left. Outstanding is what active groups still owe after the
+        # month's payouts. `first` and `last` are optional (year, month) bounds.
+        bounds, params = [], []
+        if first is not None:
+            bounds.append("p.first_ym + o.k >= ?")
+            params.append(first[0] * 12 + first[1] - 1)
+        if last is not None:
+            bounds.append("p.first_ym + o.k <= ?")
+            params.append(last[0] * 12 + last[1] - 1)
+        where = f"WHERE {' AND '.join(bounds)}" if bounds else ""
+        with self.pool.connection() as conn:
+            return conn.execute(f'''
+                WITH RECURSIVE plans AS (
+                    SELECT {START_YM} AS first_ym, size, loan, time, base, COUNT(*) AS groups
+                    FROM njangi_groups
+                    WHERE size > 0 AND time > 0 AND base > 0
+                    GROUP BY {START_YM}, size, loan, time, base
+                ),
+                offsets(k) AS (
+                    SELECT 0 UNION ALL SELECT k + 1 FROM offsets WHERE k + 1 < (SELECT MAX(time) FROM plans)
+                ),
+                plan_months AS (
+                    SELECT p.first_ym + o.k AS ym, p.groups, p.size, p.loan, p.base,
+                           CASE WHEN o.k = p.time - 1 THEN p.size
+                                ELSE MIN((o.k + 1) * p.size * p.loan / p.base, p.size) END AS paid,
+                           MIN(o.k * p.size * p.loan / p.base, p.size) AS paid_before
+                    FROM plans p JOIN offsets o ON o.k < p.time
+                    {where}
+                ),
+                totals AS (
+                    SELECT ym, SUM(groups) AS active, SUM(groups * size) AS members,
+                           SUM(groups * size * loan) AS inflow,
+                           SUM(groups * (paid - paid_before)) AS paid_members,
+                           SUM(groups * (paid - paid_before) * base) AS payouts,
+                           SUM(groups * (size - paid) * base) AS outstanding
+                    FROM plan_months GROUP BY ym
+                ),
+                calendar(ym) AS (
+                    SELECT MIN(ym) FROM totals
+                    UNION ALL SELECT ym + 1 FROM calendar WHERE ym < (SELECT MAX(ym) FROM totals)
+                )
+                SELECT c.ym / 12, c.ym % 12 + 1, COALESCE(t.active, 0), COALESCE(t.members, 0),
+                       COALESCE(t.inflow, 0), COALESCE(t.paid_members, 0), COALESCE(t.payouts, 0),
+                       COALESCE(t.outstanding, 0)
+                FROM calendar c LEFT JOIN totals t ON t.ym = c.ym
+                WHERE c.ym IS NOT NULL ORDER BY c.ym
+            ''', params).fetchall()
+
+    LOAN_COLUMNS = ('member_index', 'principal', 'annual_rate', 'term', 'method', 'month_index')
+
+    def load_loans(self, name):
+        # The group's loans as LoanBook input dicts, by borrower
+        with self.pool.connection() as conn:
+            return [dict(zip(self.LOAN_COLUMNS, row)) for row in conn.execute(f'''
+                SELECT {", ".join("l." + column for column in self.LOAN_COLUMNS)}
+                FROM njangi_loans l JOIN njangi_groups g ON g.id = l.group_id
+                WHERE g.name = ? ORDER BY l.member_index, l.id
+            ''', (name,))]
+
+    def save_loans(self, name, loans):
+        # Replaces the group's loans in one transaction
+        with self.pool.transaction() as conn:
+            row = conn.execute('SELECT id FROM njangi_groups WHERE name = ?', (name,)).fetchone()
+            if row is None:
+                raise KeyError(name)
+            rows = []
+            for loan in loans:
+                if loan['method'] not in LOAN_METHODS:
+                    raise ValueError(f"Unknown loan method: {loan['method']}")
+                rows.append((row[0], int(loan['member_index']), int(loan['principal']), float(loan['annual_rate']),
+                             int(loan['term']), loan['method'], int(loan.get('month_index', 0))))
+            conn.execute('DELETE FROM njangi_loans WHERE group_id = ?', (row[0],))
+            conn.executemany('''
+                INSERT INTO njangi_loans (group_id, member_index, principal, annual_rate, term, method, month_index)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+        return len(rows)
+
+EXPORT_FIELDS = [
+    'name', 'size', 'loan', 'time', 'base', 'start_month', 'start_year',
+    'participants', 'fruits', 'manual_assignments', 'constraints', 'schedule', 'rules',
+    'has_loans', 'interest_rate', 'loan_duration', 'created_at', 'updated_at'
+]
+
+EXPORT_JSON_FIELDS = ('participants', 'fruits', 'manual_assignments', 'constraints', 'schedule')
+
+def groups_file_format(path):
+    return "csv" if str(path).lower().endswith(".csv") else "jsonl"
+
+def write_groups_file(records, fp, fmt="jsonl"):
+    # Writes group dicts one at a time; list/dict columns are JSON-encoded in CSV
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(fp, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for record in records:
+            row = {field: record.get(field) for field in EXPORT_FIELDS}
+            for field in EXPORT_JSON_FIELDS:
+                row[field] = json.dumps(row[field]) if row[field] is not None else ""
+            row['has_loans'] = int(bool(row['has_loans']))
+            writer.writerow(row)
+            count += 1
+    elif fmt == "jsonl":
+        for record in records:
+            fp.write(json.dumps({field: record.get(field) for field in EXPORT_FIELDS}, ensure_ascii=False))
+            fp.write("\n")
+            count += 1
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return count
+
+def _whole(record, field, required=False):
+    value = record.get(field)
+    if value in (None, ""):
+        if required:
+            raise ValueError(f"missing {field}")
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a whole number, got {value!r}") from None
+
+def _month_slots(field, slots):
+    # {month_k: [member_index, ...]} with non-negative whole months and members
+    if not isinstance(slots, dict):
+        raise ValueError(f"{field} must be an object")
+    checked = {}
+    for key, members in slots.items():
+        prefix, _, month = str(key).partition('_')
+        if prefix != 'month' or not month.isdigit():
+            raise ValueError(f"{field} key {key!r} is not month_<n>")
+        if not isinstance(members, list) or not all(isinstance(m, int) and not isinstance(m, bool) and m >= 0
+                                                    for m in members):
+            raise ValueError(f"{field}[{key!r}] must be a list of member indices")
+        checked[f"month_{int(month)}"] = members
+    return checked
+
+def check_group_record(record):
+    # Normalizes one imported group dict, raising ValueError for anything
+    # _import_batch could not store as-is
+    if not isinstance(record, dict):
+        raise ValueError("expected an object")
+    record = dict(record)
+    if not isinstance(record.get('name'), str) or not record['name'].strip():
+        raise ValueError("missing group name")
+    for field in ('size', 'loan', 'time'):
+        record[field] = _whole(record, field, required=True)
+    for field in ('base', 'start_month', 'start_year', 'loan_duration'):
+        record[field] = _whole(record, field)
+    if record['size'] <= 0 or record['time'] <= 0:
+        raise ValueError("size and time must be positive")
+    if record['start_month'] is not None and not 1 <= record['start_month'] <= 12:
+        raise ValueError(f"start_month must be 1-12, got {record['start_month']}")
+    try:
+        record['interest_rate'] = float(record.get('interest_rate') or 0.0)
+    except (TypeError, ValueError):
+        raise ValueError(f"interest_rate must be a number, got {record['interest_rate']!r}") from None
+    for field in ('participants', 'fruits'):
+        values = record.get(field) or []
+        if not isinstance(values, list) or not all(value is None or isinstance(value, str) for value in values):
+            raise ValueError(f"{field} must be a list of names")
+        record[field] = values
+    if record.get('manual_assignments'):
+        record['manual_assignments'] = _month_slots('manual_assignments', record['manual_assignments'])
+    if record.get('constraints'):
+        try:
+            constraint_rows(record['constraints'])
+        except (AttributeError, TypeError, ValueError):
+            raise ValueError("constraints must map member indices to rules") from None
+    schedule = record.get('schedule')
+    if schedule:
+        if not isinstance(schedule, dict) or 'key' not in schedule:
+            raise ValueError("schedule must be an object with a key")
+        record['schedule'] = dict(schedule, assignments=_month_slots('schedule', schedule.get('assignments') or {}))
+    return record
+
+def read_groups_file(fp, fmt="jsonl"):
+    # Yields checked group dicts; bad records raise ValueError naming their line
+    if fmt == "csv":
+        reader = csv.DictReader(fp)
+        for row in reader:
+            try:
+                record = dict(row)
+                for field in EXPORT_JSON_FIELDS:
+                    record[field] = json.loads(record[field]) if record.get(field) else None
+                record['has_loans'] = _whole(record, 'has_loans')
+                record = check_group_record(record)
+            except ValueError as e:
+                raise ValueError(f"line {reader.line_num}: {e}") from None
+            yield record
+    elif fmt == "jsonl":
+        for number, line in enumerate(fp, 1):
+            if line.strip():
+                try:
+                    record = check_group_record(json.loads(line))
+                except ValueError as e:
+                    raise ValueError(f"line {number}: {e}") from None
+                yield record
+    else:
+        raise ValueError(f"Unknown import format: {fmt}")
+
+# Autosave waits until the group has been left alone this long (seconds)
+AUTOSAVE_DELAY = 3
+
+SAVE_FIELDS = ('size', 'loan', 'time', 'base', 'start_month', 'start_year', 'participants', 'fruits',
+               'manual_assignments', 'rules', 'has_loans', 'interest_rate', 'loan_duration', 'constraints')
+
+def field_hashes(fields):
+    return {
+        field: hashlib.blake2b(json.dumps(value, sort_keys=True, default=str).encode("utf-8"), digest_size=16).hexdigest()
+        for field, value in fields.items()
+    }
+
+class GroupTracker:
+    # Content hashes of each field as last saved for one group. Saves compare
+    # against them to skip unchanged groups and write only the changed fields.
+    def __init__(self):
+        self.reset()
+
+    def reset(self, name=None, fields=None):
+        self.name = name
+        self.saved = field_hashes(fields) if fields else {}
+        self.seen = dict(self.saved)
+        self.changed_at = None
+
+    def observe(self, fields):
+        # Hashes the current fields and notes when they last changed, for debouncing
+        hashes = field_hashes(fields)
+        if hashes != self.seen:
+            self.seen = hashes
+            self.changed_at = timer.monotonic()
+        return hashes
+
+    def dirty_fields(self, name, hashes):
+        # None when this group has no saved baseline yet and needs a full save
+        if name != self.name:
+            return None
+        dirty = {field for field, digest in hashes.items() if self.saved.get(field) != digest}
+        if dirty & {'participants', 'fruits'}:
+            dirty |= {'participants', 'fruits'}
+        return dirty
+
+    def mark_saved(self, name, hashes):
+        self.name = name
+        self.saved = dict(hashes)
+
+    def settled(self):
+        return self.changed_at is None or timer.monotonic() - self.changed_at >= AUTOSAVE_DELAY
+
+def group_fields(group_data):
+    return {field: group_data.get(field) for field in SAVE_FIELDS}
+
+def persist_group(db, tracker, name, fields, hashes=None):
+    # Skips the write when nothing changed since the last save of this group and
+    # sends only the changed fields when something did; falls back to a full
+    # save_group() for groups this session has not saved or loaded yet.
+    hashes = hashes or field_hashes(fields)
+    dirty = tracker.dirty_fields(name, hashes)
+    if dirty is not None:
+        if not dirty or db.update_group_fields(name, **{field: fields[field] for field in dirty}):
+            tracker.mark_saved(name, hashes)
+            return True
+    success = db.save_group(name, **fields)
+    if success:
+        tracker.mark_saved(name, hashes)
+    return success
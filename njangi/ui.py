@@ -0,0 +1,1202 @@
+# Streamlit interface: session state, callbacks and the page itself (main).
+import io
+import sqlite3
+import time as timer
+from datetime import datetime
+
+import numpy as np
+import streamlit as st
+
+from .core import (
+    FRUIT_CATALOG, LOAN_METHOD_LABELS, LOAN_METHODS, AssignmentState, FruitAllocator, InfeasibleScheduleError,
+    LoanBook, Njangi, _cached_schedule, cycle_month, fill_fruits, ledger_schedule, month_label, months,
+    normalize_constraints, parse_roster, plan_configurations, sample_fruits, schedule_inputs, solve_assignments,
+)
+from .reports import RenderQueue, ReportCache, render_payload, report_filename, resolve_schedule
+from .storage import DatabaseManager, GroupTracker, group_fields, groups_file_format, persist_group, snapshot_changes
+
+LARGE_GROUP_MAX = 10000
+
+GROUPS_PAGE_SIZE = 20
+PLAN_MAX_CONFIGURATIONS = 100_000
+# The autosave fragment checks for settled edits (see AUTOSAVE_DELAY) this often, and
+# the render job status is polled this often (seconds)
+AUTOSAVE_POLL = 2
+RENDER_POLL = 1
+
+@st.cache_resource
+def get_report_cache():
+    return ReportCache()
+
+@st.cache_resource
+def get_render_queue():
+    return RenderQueue(get_db_manager())
+
+@st.cache_resource
+def get_db_manager(db_name="njangi_groups.db"):
+    # One manager (and connection pool) per process, shared by all sessions
+    return DatabaseManager(db_name)
+
+def session_group_fields(size, loan, time, base, start_month, start_year, **overrides):
+    fields = {
+        'size': size, 'loan': loan, 'time': time, 'base': base, 'start_month': start_month, 'start_year': start_year,
+        'participants': st.session_state.participants,
+        'fruits': st.session_state.fruits,
+        'manual_assignments': st.session_state.manual_assignments if st.session_state.assignment_mode in ['manual', 'semi-automatic'] else None,
+        'rules': st.session_state.rules,
+        'has_loans': st.session_state.has_loans,
+        'interest_rate': st.session_state.interest_rate,
+        'loan_duration': st.session_state.loan_duration,
+        'constraints': st.session_state.member_constraints,
+    }
+    fields.update(overrides)
+    return fields
+
+def save_current_group(name, size, loan, time, base, start_month, start_year, **overrides):
+    fields = session_group_fields(size, loan, time, base, start_month, start_year, **overrides)
+    try:
+        return persist_group(st.session_state.db_manager, st.session_state.group_tracker, name, fields)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return False
+
+@st.fragment(run_every=AUTOSAVE_POLL)
+def autosave_group(name, size, loan, time, base, start_month, start_year):
+    # Runs on every rerun and every AUTOSAVE_POLL seconds; writes once edits have
+    # settled for AUTOSAVE_DELAY seconds. Only groups already saved or loaded in
+    # this session are autosaved, so typing a new name never creates a group.
+    tracker = st.session_state.group_tracker
+    if not name or tracker.name != name or size <= 0:
+        st.caption("💾 Autosave starts once the group has been saved")
+        return
+    fields = session_group_fields(size, loan, time, base, start_month, start_year)
+    hashes = tracker.observe(fields)
+    if not tracker.dirty_fields(name, hashes):
+        st.caption("💾 All changes saved")
+    elif tracker.settled():
+        try:
+            persist_group(st.session_state.db_manager, tracker, name, fields, hashes)
+        except ValueError as e:
+            st.caption(f"⚠️ Autosave paused: {e}")
+            return
+        st.caption(f"💾 Autosaved at {datetime.now().strftime('%H:%M:%S')}")
+    else:
+        st.caption("✏️ Unsaved changes, autosaving shortly...")
+
+@st.fragment(run_every=RENDER_POLL)
+def render_job_progress(job_id):
+    # Polls only while the job is pending; a full rerun then shows the result
+    job = st.session_state.db_manager.get_render_job(job_id)
+    if job is None or job['status'] not in ('queued', 'running'):
+        st.rerun()
+    waited = (datetime.now() - datetime.fromisoformat(str(job['created_at']))).total_seconds()
+    label = "Rendering" if job['status'] == 'running' else "Queued"
+    st.info(f"⏳ {label} {job['filename']}... ({waited:.0f}s)")
+
+def show_render_job(group_name):
+    # The session's last request for this group, or after a browser refresh the group's latest job
+    db = st.session_state.db_manager
+    job_ref = st.session_state.render_jobs.get(group_name)
+    if isinstance(job_ref, tuple):
+        _, key, filename = job_ref
+        pdf_bytes = get_report_cache().peek(key)
+        if pdf_bytes is None:
+            return
+    else:
+        job = db.get_render_job(job_ref) if job_ref else db.latest_render_job(group_name)
+        if job is None:
+            return
+        if job['status'] in ('queued', 'running'):
+            render_job_progress(job['id'])
+            return
+        if job['status'] == 'failed':
+            st.error(f"❌ Error generating PDF: {job['error']}")
+            return
+        key, filename = job['report_key'], job['filename']
+        pdf_bytes = get_report_cache().peek(key)
+        if pdf_bytes is None:
+            pdf_bytes = db.render_job_pdf(job['id'])
+            if pdf_bytes is None:
+                return
+            get_report_cache().put(key, pdf_bytes)
+    st.success(f"✅ PDF generated successfully: {filename}")
+    st.download_button(
+        label="📥 Download PDF",
+        data=pdf_bytes,
+        file_name=filename,
+        mime="application/pdf",
+        use_container_width=True
+    )
+
+def initialize_session_state():
+    if 'db_manager' not in st.session_state:
+        st.session_state.db_manager = get_db_manager()
+    if 'current_group_data' not in st.session_state:
+        st.session_state.current_group_data = None
+    if 'participants' not in st.session_state:
+        st.session_state.participants = []
+    if 'fruits' not in st.session_state:
+        st.session_state.fruits = []
+    if 'fruit_keys' not in st.session_state:
+        st.session_state.fruit_keys = {}
+    if 'assignment_mode' not in st.session_state:
+        st.session_state.assignment_mode = 'automatic'
+    if 'manual_assignments' not in st.session_state:
+        st.session_state.manual_assignments = {}
+    if 'member_constraints' not in st.session_state:
+        st.session_state.member_constraints = {}
+    if 'rules' not in st.session_state:
+        st.session_state.rules = ""
+    if 'has_loans' not in st.session_state:
+        st.session_state.has_loans = False
+    if 'interest_rate' not in st.session_state:
+        st.session_state.interest_rate = 5.0
+    if 'loan_duration' not in st.session_state:
+        st.session_state.loan_duration = 3
+    if 'large_group_mode' not in st.session_state:
+        st.session_state.large_group_mode = False
+    if 'group_tracker' not in st.session_state:
+        st.session_state.group_tracker = GroupTracker()
+    if 'render_jobs' not in st.session_state:
+        st.session_state.render_jobs = {}
+    if 'setup_generation' not in st.session_state:
+        st.session_state.setup_generation = 0
+
+def reset_form():
+    st.session_state.current_group_data = None
+    st.session_state.participants = []
+    st.session_state.fruits = []
+    st.session_state.fruit_keys = {}
+    st.session_state.assignment_mode = 'automatic'
+    st.session_state.manual_assignments = {}
+    st.session_state.member_constraints = {}
+    st.session_state.rules = ""
+    st.session_state.has_loans = False
+    st.session_state.interest_rate = 5.0
+    st.session_state.loan_duration = 3
+    st.session_state.large_group_mode = False
+    st.session_state.group_tracker.reset()
+    st.session_state.setup_generation += 1
+    st.session_state.pop("roster_editor", None)
+    st.rerun()
+
+def load_group_data(group_data):
+    st.session_state.current_group_data = group_data
+    st.session_state.participants = group_data['participants']
+    st.session_state.fruits = group_data['fruits']
+    st.session_state.fruit_keys = {f"fruit_{i}": fruit for i, fruit in enumerate(group_data['fruits'])}
+    st.session_state.rules = group_data.get('rules', "")
+    st.session_state.has_loans = group_data.get('has_loans', False)
+    st.session_state.interest_rate = group_data.get('interest_rate', 5.0)
+    st.session_state.loan_duration = group_data.get('loan_duration', 3)
+    st.session_state.large_group_mode = group_data['size'] > len(FRUIT_CATALOG)
+    st.session_state.pop("roster_editor", None)
+    st.session_state.member_constraints = group_data.get('constraints') or {}
+    if group_data.get('manual_assignments'):
+        st.session_state.manual_assignments = group_data['manual_assignments']
+        st.session_state.assignment_mode = 'manual'
+    elif st.session_state.member_constraints:
+        st.session_state.assignment_mode = 'semi-automatic'
+    st.session_state.group_tracker.reset(group_data['name'], group_fields(group_data))
+    # New keys for the Group Setup inputs, so they show the loaded values rather than earlier edits
+    st.session_state.setup_generation += 1
+
+def restore_group_version(name, version):
+    # Button callback: runs before the widgets are drawn, so load_group_data may set their state
+    db = st.session_state.db_manager
+    try:
+        restored = db.restore_snapshot(name, version)
+    except ValueError as e:
+        st.toast(f"❌ {e}")
+        return
+    if restored:
+        load_group_data(db.load_group(name))
+        st.toast(f"✅ Restored v{version}")
+
+def remove_loans(name, loans):
+    removed = set(st.session_state.loans_removed)
+    st.session_state.db_manager.save_loans(name, [loan for i, loan in enumerate(loans) if i not in removed])
+    st.session_state.loans_removed = []
+
+def get_payout_schedule(size, loan, time, base, assignments=None):
+    # The module is re-executed on every rerun, so the last schedule is kept in
+    # session state and rebuilt only when its inputs change
+    key = schedule_inputs(size, loan, time, base, assignments)
+    cached = st.session_state.get('payout_schedule')
+    if cached is None or cached[0] != key:
+        cached = (key, _cached_schedule(*key))
+        st.session_state.payout_schedule = cached
+    return cached[1]
+
+def get_fruit_allocator(size):
+    # The allocator owns st.session_state.fruits; if anything replaced that list
+    # (load, reset, random fruits, grid edits) it is rebuilt from the new list.
+    allocator = st.session_state.get('fruit_allocator')
+    if allocator is None or allocator.fruits is not st.session_state.fruits:
+        allocator = FruitAllocator(st.session_state.fruits)
+        st.session_state.fruit_allocator = allocator
+    if len(allocator.fruits) != size:
+        allocator.resize(size)
+    st.session_state.fruits = allocator.fruits
+    return allocator
+
+def on_fruit_change(index):
+    selected_fruit = st.session_state.get(f"fruit_{index}")
+    if selected_fruit:
+        st.session_state.fruit_allocator.assign(index, selected_fruit)
+
+def get_assignment_state(payouts):
+    # Rebuilt whenever manual_assignments is replaced (load, reset) or the group
+    # shape changes; otherwise edits go through the state so it stays current.
+    state = st.session_state.get('assignment_state')
+    if (state is None or state.assignments is not st.session_state.manual_assignments
+            or state.payouts != list(payouts) or state.size != len(st.session_state.participants)):
+        state = AssignmentState(st.session_state.manual_assignments, payouts, st.session_state.participants)
+        st.session_state.assignment_state = state
+    else:
+        state.set_names(st.session_state.participants)
+    return state
+
+def main():
+    st.set_page_config(
+        page_title="Njangi Group Manager",
+        page_icon="👥",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    # Custom CSS to fix X button alignment - push to right edge
+    st.markdown("""
+    <style>
+        /* Only target the specific button in the assignment tab */
+        div[data-testid="stHorizontalBlock"]:has(button[key^="remove_"]) > div:last-child {
+            width: 100% !important;
+            flex: 1 1 auto !important;
+            display: flex !important;
+            justify-content: flex-end !important;
+        }
+    </style>
+    """, unsafe_allow_html=True)
+    initialize_session_state()
+    
+    st.title("👥 Njangi Group Report Generator")
+    st.markdown("---")
+    
+    with st.sidebar:
+        st.header("📁 Saved Groups")
+        search = st.text_input("🔍 Search", key="group_search", placeholder="Group name starts with...")
+        if st.session_state.get('group_search_applied') != search:
+            st.session_state.group_search_applied = search
+            st.session_state.group_page_cursors = [None]
+        page_cursors = st.session_state.setdefault('group_page_cursors', [None])
+        saved_groups, next_cursor = st.session_state.db_manager.get_groups_page(
+            search.strip(), page_cursors[-1], GROUPS_PAGE_SIZE
+        )
+        if saved_groups:
+            group_names = [group[0] for group in saved_groups]
+            selected_group = st.selectbox("Load Existing Group:", [""] + group_names)
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("📥 Load", disabled=not selected_group, use_container_width=True):
+                    group_data = st.session_state.db_manager.load_group(selected_group)
+                    if group_data:
+                        load_group_data(group_data)
+                        st.success(f"Loaded: {selected_group}")
+                        st.rerun()
+            with col2:
+                if st.button("🗑️ Delete", disabled=not selected_group, use_container_width=True):
+                    st.session_state.db_manager.delete_group(selected_group)
+                    st.success(f"Deleted: {selected_group}")
+                    st.rerun()
+        elif search.strip():
+            st.info("No groups match your search.")
+        else:
+            st.info("No saved groups found.")
+        if len(page_cursors) > 1 or next_cursor is not None:
+            col1, col2, col3 = st.columns([1, 1, 1])
+            with col1:
+                if st.button("◀", key="groups_prev", disabled=len(page_cursors) == 1, use_container_width=True):
+                    page_cursors.pop()
+                    st.rerun()
+            with col2:
+                st.caption(f"Page {len(page_cursors)}")
+            with col3:
+                if st.button("▶", key="groups_next", disabled=next_cursor is None, use_container_width=True):
+                    page_cursors.append(next_cursor)
+                    st.rerun()
+        read_stats = st.session_state.db_manager.read_cache.stats()
+        st.caption(f"⚡ Read cache: {read_stats['hits']} hit(s) · {read_stats['misses']} miss(es) · "
+                   f"{read_stats['entries']} entr{'y' if read_stats['entries'] == 1 else 'ies'}")
+        with st.expander("📦 Import / Export"):
+            transfer_format = st.radio("Format", ["jsonl", "csv"], horizontal=True, key="transfer_format")
+            if st.button("📤 Prepare Export", use_container_width=True):
+                buffer = io.StringIO()
+                count = st.session_state.db_manager.export_groups(buffer, transfer_format)
+                st.session_state.export_payload = (transfer_format, buffer.getvalue().encode("utf-8"), count)
+            if st.session_state.get('export_payload'):
+                payload_format, payload, count = st.session_state.export_payload
+                st.download_button(
+                    label=f"📥 Download {count} group(s)",
+                    data=payload,
+                    file_name=f"njangi_groups.{payload_format}",
+                    mime="text/csv" if payload_format == "csv" else "application/jsonl",
+                    use_container_width=True
+                )
+            uploaded = st.file_uploader("Import groups", type=["jsonl", "csv"])
+            if uploaded is not None and st.button("📥 Import", use_container_width=True):
+                try:
+                    with io.TextIOWrapper(uploaded, encoding="utf-8", newline="") as f:
+                        count = st.session_state.db_manager.import_groups_file(f, groups_file_format(uploaded.name))
+                    st.success(f"Imported {count} group(s)")
+                except (ValueError, KeyError, sqlite3.Error) as e:
+                    st.error(f"❌ Import failed: {str(e)}")
+        st.divider()
+        if st.button("🆕 New Group", use_container_width=True):
+            reset_form()
+        if st.button("💾 Save Progress", use_container_width=True):
+            nname = st.session_state.current_group_data['name'] if st.session_state.current_group_data else ""
+            if not nname:
+                st.warning("⚠️ Please enter a group name first!")
+            else:
+                size = len(st.session_state.participants)
+                if size == 0:
+                    st.warning("⚠️ Please complete group setup first!")
+                else:
+                    loan = st.session_state.current_group_data['loan'] if st.session_state.current_group_data else 5000
+                    time = st.session_state.current_group_data['time'] if st.session_state.current_group_data else 12
+                    start_month = st.session_state.current_group_data['start_month'] if st.session_state.current_group_data else 7
+                    start_year = st.session_state.current_group_data['start_year'] if st.session_state.current_group_data else 2025
+                    base = loan * time
+                    success = save_current_group(nname, size, loan, time, base, start_month, start_year)
+                    if success:
+                        st.success("✅ Progress saved!")
+                    else:
+                        st.error("❌ Could not save the group!")
+
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
+        "📝 Group Setup", "👥 Participants", "📋 Assignment", "📜 Rules", "💰 Loans & Interest", "📄 Generate",
+        "🧾 Ledger", "📊 Portfolio"
+    ])
+
+    with tab1:
+        st.subheader("Basic Group Information")
+        col1, col2 = st.columns(2)
+        setup = f"setup_{st.session_state.setup_generation}"
+        with col1:
+            current_name = st.session_state.current_group_data['name'] if st.session_state.current_group_data else ""
+            nname = st.text_input("Njangi Group Name", value=current_name, help="Enter a unique name for your Njangi group",
+                                  key=f"{setup}_name")
+            large_group_mode = st.checkbox(
+                "Large-group mode", key="large_group_mode",
+                help="Lift the fruit-list cap and edit the roster in a single grid"
+            )
+            max_size = LARGE_GROUP_MAX if large_group_mode else len(FRUIT_CATALOG)
+            current_size = st.session_state.current_group_data['size'] if st.session_state.current_group_data else 13
+            size = st.number_input("Number of Participants", min_value=1, max_value=max_size, value=min(current_size, max_size), step=1,
+                                   key=f"{setup}_size_{max_size}")
+            current_loan = st.session_state.current_group_data['loan'] if st.session_state.current_group_data else 5000
+            loan = st.number_input("Monthly Contribution (FCFA)", min_value=1000, value=current_loan, step=1000,
+                                   key=f"{setup}_loan")
+        with col2:
+            current_time = st.session_state.current_group_data['time'] if st.session_state.current_group_data else 12
+            time = st.number_input("Duration (Months)", min_value=1, max_value=60, value=current_time, step=1,
+                                   key=f"{setup}_time")
+            current_start_month = st.session_state.current_group_data['start_month'] if st.session_state.current_group_data else 7
+            start_month = st.selectbox("Start Month", options=list(months.keys()), 
+                                       format_func=lambda x: months[x], index=current_start_month-1,
+                                       key=f"{setup}_start_month")
+            current_start_year = st.session_state.current_group_data['start_year'] if st.session_state.current_group_data else 2025
+            start_year = st.number_input("Start Year", min_value=2025, max_value=2030, value=current_start_year, step=1,
+                                         key=f"{setup}_start_year")
+        
+        if size < time:
+            st.error("⚠️ Number of participants must be greater than or equal to duration in months!")
+        
+        base = loan * time
+        total_pool = size * loan * time
+        st.info(f"💡 **Calculated Values:**\n"
+               f"- Monthly Collection: {size * loan:,} FCFA\n"
+               f"- Payout per Person: {base:,} FCFA\n"
+               f"- Total Pool: {total_pool:,} FCFA")
+
+        with st.expander("🧮 Find Feasible Configurations"):
+            st.caption("Every combination in the ranges below is evaluated at once and ranked by idle residue, "
+                       "then by how evenly payouts are spread across months.")
+            col1, col2 = st.columns(2)
+            with col1:
+                plan_sizes = st.slider("Participants", 1, 500, (min(max(1, size - 10), 490), min(size + 10, 500)))
+                plan_contributions = st.slider("Monthly Contribution (FCFA)", 1000, 100000,
+                                               (min(max(1000, loan - 4000), 92000), min(loan + 4000, 100000)), step=1000)
+            with col2:
+                plan_durations = st.slider("Duration (Months)", 1, 60, (max(1, time - 6), min(60, time + 6)))
+                plan_payout_mode = st.radio("Payout per Person", ["Contribution × Duration", "Fixed amount"], horizontal=True)
+                plan_payout = None
+                if plan_payout_mode == "Fixed amount":
+                    plan_payout = st.number_input("Payout (FCFA)", min_value=1000, value=base, step=1000)
+            plan_grid = (range(plan_sizes[0], plan_sizes[1] + 1),
+                         range(plan_contributions[0], plan_contributions[1] + 1, 1000),
+                         range(plan_durations[0], plan_durations[1] + 1))
+            grid_size = len(plan_grid[0]) * len(plan_grid[1]) * len(plan_grid[2])
+            if grid_size > PLAN_MAX_CONFIGURATIONS:
+                st.warning(f"⚠️ {grid_size:,} combinations selected; narrow the ranges to at most "
+                           f"{PLAN_MAX_CONFIGURATIONS:,} for live results.")
+            else:
+                plan = plan_configurations(*plan_grid, None if plan_payout is None else [plan_payout])
+                st.write(f"**{plan['feasible']:,}** feasible of {plan['evaluated']:,} configurations")
+                if plan['configurations']:
+                    st.dataframe(plan['configurations'], hide_index=True, use_container_width=True)
+
+        if nname and size > 0:
+            if st.button("📄 Generate Fruit Assignment Sheet", type="primary", use_container_width=True):
+                with st.spinner("Generating Fruit Sheet..."):
+                    try:
+                        if len(st.session_state.fruits) == size:
+                            fruits = st.session_state.fruits
+                        else:
+                            fruits = sample_fruits(size)
+                        success = save_current_group(nname, size, loan, time, base, start_month, start_year,
+                                                     participants=[], fruits=fruits, manual_assignments=None)
+                        if success:
+                            st.success("✅ Progress saved!")
+                        filename = f"{nname.replace(' ', '_')}_fruit_sheet.pdf"
+                        key = ReportCache.key('fruit_sheet', group_name=nname, fruits=fruits,
+                                              start_month=start_month, start_year=start_year, time=time)
+                        from .pdf import generate_fruit_sheet_pdf
+                        pdf_bytes = get_report_cache().get_or_render(
+                            key, lambda: generate_fruit_sheet_pdf(nname, fruits, None, start_month, start_year, time)
+                        )
+                        st.download_button(
+                            label="📥 Download Fruit Sheet",
+                            data=pdf_bytes,
+                            file_name=filename,
+                            mime="application/pdf",
+                            use_container_width=True
+                        )
+                    except Exception as e:
+                        st.error(f"❌ Error: {str(e)}")
+        else:
+            st.info("ℹ️ Enter group name and size to generate Fruit Assignment Sheet.")
+
+        if nname:
+            with st.expander("🕘 Version History"):
+                db = st.session_state.db_manager
+                history = db.group_history(nname)
+                if not history:
+                    st.info("ℹ️ Every save of this group records a version; none yet.")
+                else:
+                    versions = {row[0]: row for row in history}
+                    latest = history[0][0]
+                    st.caption(f"{latest} version(s), newest {len(history)} listed · "
+                               f"{sum(1 for row in history if row[2])} checkpoint(s) · "
+                               f"{sum(row[3] for row in history) / 1024:,.1f} KB stored")
+                    picked = st.selectbox(
+                        "Version", list(versions), key="history_version",
+                        format_func=lambda v: f"v{v} · {str(versions[v][1])[:16]} · "
+                                              f"{', '.join(versions[v][4]) or ('created' if v == 1 else 'no changes')}"
+                    )
+                    changes = snapshot_changes(db.load_snapshot(nname, picked), db.load_snapshot(nname, latest))
+                    if picked == latest:
+                        st.caption("This is the current version.")
+                    elif not changes:
+                        st.caption(f"v{picked} matches the current version.")
+                    else:
+                        st.write(f"**{len(changes):,}** difference(s) between v{picked} and the current version (v{latest})")
+                        st.dataframe([
+                            [field, "" if item is None else (f"#{item + 1}" if isinstance(item, int) else str(item)),
+                             "" if old is None else str(old), "" if new is None else str(new)]
+                            for field, item, old, new in changes[:500]
+                        ], column_config={"0": "Field", "1": "Item", "2": f"v{picked}", "3": "Current"},
+                            hide_index=True, use_container_width=True)
+                    st.button(f"⏪ Restore v{picked}", disabled=picked == latest or not changes, use_container_width=True,
+                              on_click=restore_group_version, args=(nname, picked))
+
+    # The tabs below reuse these names for their own purposes; autosave gets the Setup values
+    group_inputs = (nname, size, loan, time, base, start_month, start_year)
+
+    with tab2:
+        st.subheader("Participants and Fruit Assignment")
+        if size > 0:
+            if size > len(FRUIT_CATALOG) and not large_group_mode:
+                st.error(f"❌ Cannot have more than {len(FRUIT_CATALOG)} participants as fruits must be unique. "
+                         "Enable Large-group mode in Group Setup for bigger groups.")
+                return
+            if len(st.session_state.participants) != size:
+                current_participants = st.session_state.participants[:size]
+                while len(current_participants) < size:
+                    current_participants.append(f"Person {len(current_participants) + 1}")
+                st.session_state.participants = current_participants
+            if len(st.session_state.fruits) != size:
+                st.session_state.fruits = fill_fruits(st.session_state.fruits, size)
+
+            if large_group_mode:
+                with st.expander("📥 Import Roster"):
+                    roster_file = st.file_uploader("Roster file (.csv or .txt)", type=["csv", "txt"], key="roster_file")
+                    roster_text = st.text_area("...or paste names, one per line (optionally `name,fruit`)",
+                                               key="roster_paste", height=150)
+                    if st.button("Apply Roster", use_container_width=True):
+                        text = roster_file.getvalue().decode("utf-8-sig") if roster_file else roster_text
+                        names, roster_fruits = parse_roster(text)
+                        for i, (member_name, fruit) in enumerate(zip(names[:size], roster_fruits[:size])):
+                            st.session_state.participants[i] = member_name
+                            if fruit:
+                                st.session_state.fruits[i] = fruit
+                        st.session_state.pop("roster_editor", None)
+                        if len(names) != size:
+                            st.session_state.roster_notice = (
+                                f"Roster has {len(names)} name(s) for {size} participant(s); "
+                                f"{'extra names were ignored' if len(names) > size else 'remaining rows were kept'}."
+                            )
+                        st.rerun()
+                if st.session_state.get('roster_notice'):
+                    st.warning(f"⚠️ {st.session_state.pop('roster_notice')}")
+                roster = st.data_editor(
+                    {"#": list(range(1, size + 1)),
+                     "Name": st.session_state.participants,
+                     "Fruit": st.session_state.fruits},
+                    key="roster_editor",
+                    num_rows="fixed",
+                    hide_index=True,
+                    disabled=["#"],
+                    height=420,
+                    use_container_width=True
+                )
+                st.session_state.participants = [str(n) if n is not None else "" for n in roster["Name"]]
+                st.session_state.fruits = [str(f) if f is not None else None for f in roster["Fruit"]]
+                fruit_counts = {}
+                for fruit in st.session_state.fruits:
+                    fruit_counts[fruit] = fruit_counts.get(fruit, 0) + 1
+                duplicates = [fruit for fruit, count in fruit_counts.items() if count > 1]
+                if duplicates:
+                    st.warning(f"⚠️ {len(duplicates)} fruit(s) used more than once: "
+                               f"{', '.join(str(f) for f in duplicates[:5])}{' ...' if len(duplicates) > 5 else ''}")
+            else:
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown("**👥 Participants**")
+                    for i in range(size):
+                        st.session_state.participants[i] = st.text_input(
+                            f"Participant {i+1}", 
+                            value=st.session_state.participants[i],
+                            key=f"participant_{i}"
+                        )
+                with col2:
+                    st.markdown("**🍎 Fruit Assignment**")
+                    allocator = get_fruit_allocator(size)
+                    for i in range(size):
+                        # Keep the widget in step with fruits changed elsewhere (swaps, random fruits, loads)
+                        if st.session_state.get(f"fruit_{i}") != allocator.fruits[i]:
+                            st.session_state[f"fruit_{i}"] = allocator.fruits[i]
+                        st.selectbox(
+                            f"🍎 for {st.session_state.participants[i][:15]}...",
+                            options=allocator.options(i),
+                            key=f"fruit_{i}",
+                            on_change=on_fruit_change,
+                            args=(i,)
+                        )
+            
+            st.markdown("---")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                if st.button("🎲 Random Fruits", use_container_width=True):
+                    st.session_state.fruits = sample_fruits(size)
+                    st.session_state.pop("roster_editor", None)
+                    st.rerun()
+            with col2:
+                if st.button("🏷️ Auto-name Participants", use_container_width=True):
+                    st.session_state.participants = [f"Member {i+1}" for i in range(size)]
+                    st.session_state.pop("roster_editor", None)
+                    st.rerun()
+            with col3:
+                if st.button("💾 Save Progress", use_container_width=True):
+                    if nname and len(nname.strip()) > 0:
+                        success = save_current_group(nname, size, loan, time, base, start_month, start_year)
+                        if success:
+                            st.success("✅ Progress saved!")
+                        else:
+                            st.error("❌ Could not save the group!")
+                    else:
+                        st.error("❌ Please enter a group name first!")
+
+    with tab3:
+        st.subheader("Payout Assignment")
+        if size > 0 and time > 0 and len(st.session_state.participants) == size:
+            st.markdown("### Choose Assignment Method")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                if st.button("🎲 Automatic", 
+                            type="primary" if st.session_state.assignment_mode == 'automatic' else "secondary",
+                            use_container_width=True):
+                    st.session_state.assignment_mode = 'automatic'
+                    st.session_state.manual_assignments = {}
+                    st.rerun()
+                st.caption("Fully automatic")
+            with col2:
+                if st.button("✏️ Manual", 
+                            type="primary" if st.session_state.assignment_mode == 'manual' else "secondary",
+                            use_container_width=True):
+                    st.session_state.assignment_mode = 'manual'
+                    st.rerun()
+                st.caption("Full manual control")
+            with col3:
+                if st.button("🔄 Semi-Auto", 
+                            type="primary" if st.session_state.assignment_mode == 'semi-automatic' else "secondary",
+                            use_container_width=True):
+                    st.session_state.assignment_mode = 'semi-automatic'
+                    st.rerun()
+                st.caption("Lock some, auto-fill at PDF time")
+            
+            st.markdown("---")
+            payout_plan = get_payout_schedule(size, loan, time, base)
+            monthly_payouts = payout_plan.planned.tolist()
+            
+            stored_schedule = st.session_state.db_manager.load_schedule(nname) if nname and st.session_state.assignment_mode != 'manual' else None
+            if stored_schedule:
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    st.caption(f"🔁 A payout order (seed {stored_schedule['seed']}) is saved for this group and reused by every report until the setup, locks or constraints change.")
+                with col2:
+                    if st.button("🎲 Reshuffle Payout Order", use_container_width=True):
+                        st.session_state.db_manager.clear_schedule(nname)
+                        st.rerun()
+            
+            if st.session_state.assignment_mode == 'automatic':
+                st.info("🎲 **Automatic Mode**: The system will randomly assign participants to months when generating the PDF.")
+                preview_data = [
+                    [str(i+1), month_label(start_month, start_year, i, short=False), str(payout_plan.counts[i]),
+                     f"{payout_plan.available[i]:,}", f"{payout_plan.residue[i]:,}"]
+                    for i in range(time)
+                ]
+                st.dataframe(
+                    preview_data,
+                    column_config={
+                        "0": "Month #",
+                        "1": "Period",
+                        "2": "People Getting Paid",
+                        "3": "Available",
+                        "4": "Residue"
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
+            else:
+                st.success(f"{'✏️' if st.session_state.assignment_mode == 'manual' else '🔄'} **{st.session_state.assignment_mode.title()} Mode**: Assign participants below.")
+                state = get_assignment_state(monthly_payouts)
+                display_names = state.display_names
+                unassigned_display = [display_names[i] for i in state.unassigned()]
+                
+                st.metric("Remaining Unassigned", len(unassigned_display), delta=f"{state.assigned_count} assigned")
+                if unassigned_display:
+                    with st.expander("🔍 Unassigned Participants", expanded=True):
+                        st.write(", ".join(unassigned_display))
+                
+                if st.session_state.assignment_mode == 'semi-automatic':
+                    constraints = st.session_state.member_constraints
+                    month_labels = [f"{i+1}. {month_label(start_month, start_year, i, short=False)}" for i in range(time)]
+                    with st.expander(f"🧩 Member Constraints ({len(constraints)})"):
+                        st.caption("Unlocked participants are placed by the solver at PDF time, within these limits. Preferred months are honored where possible.")
+                        member = st.selectbox("Participant", range(size), format_func=lambda i: display_names[i], key="constraint_member")
+                        current = constraints.get(member, {})
+                        month_choices = [None] + list(range(time))
+                        def month_choice_label(m):
+                            return "Any month" if m is None else month_labels[m]
+                        col_a, col_b = st.columns(2)
+                        with col_a:
+                            not_before = st.selectbox("Not before", month_choices, format_func=month_choice_label,
+                                index=month_choices.index(current.get('not_before')) if current.get('not_before') in month_choices else 0,
+                                key=f"constraint_not_before_{member}")
+                        with col_b:
+                            not_after = st.selectbox("Not after", month_choices, format_func=month_choice_label,
+                                index=month_choices.index(current.get('not_after')) if current.get('not_after') in month_choices else 0,
+                                key=f"constraint_not_after_{member}")
+                        prefer = st.multiselect("Preferred months", range(time), format_func=lambda m: month_labels[m],
+                            default=[m for m in current.get('prefer', []) if m < time], key=f"constraint_prefer_{member}")
+                        apart = st.multiselect("Paid in a different month from", [i for i in range(size) if i != member],
+                            format_func=lambda i: display_names[i],
+                            default=[i for i in current.get('apart', []) if i < size and i != member], key=f"constraint_apart_{member}")
+                        col_a, col_b = st.columns(2)
+                        with col_a:
+                            if st.button("💾 Save Constraint", use_container_width=True):
+                                constraints[member] = {'not_before': not_before, 'not_after': not_after, 'prefer': prefer, 'apart': apart}
+                                st.session_state.member_constraints = normalize_constraints(constraints)
+                                st.rerun()
+                        with col_b:
+                            if st.button("🗑️ Remove Constraint", use_container_width=True, disabled=member not in constraints):
+                                constraints.pop(member, None)
+                                st.rerun()
+                        if constraints:
+                            st.dataframe([
+                                [display_names[idx],
+                                 f"{month_labels[rules['not_before']] if 'not_before' in rules else 'start'} → {month_labels[rules['not_after']] if 'not_after' in rules else 'end'}",
+                                 ", ".join(month_labels[m] for m in rules.get('prefer', []) if m < time),
+                                 ", ".join(display_names[i] for i in rules.get('apart', []) if i < size)]
+                                for idx, rules in sorted(constraints.items()) if idx < size
+                            ], column_config={"0": "Participant", "1": "Allowed Months", "2": "Preferred", "3": "Apart From"},
+                                hide_index=True, use_container_width=True)
+                        if st.button("🧪 Check Feasibility", use_container_width=True):
+                            try:
+                                started = timer.perf_counter()
+                                solve_assignments(size, monthly_payouts, st.session_state.manual_assignments, constraints,
+                                                  names=st.session_state.participants)
+                                st.success(f"✅ A schedule satisfying all constraints exists (solved in {(timer.perf_counter() - started) * 1000:.0f} ms)")
+                            except InfeasibleScheduleError as e:
+                                for reason in e.reasons:
+                                    st.error(f"❌ {reason}")
+                
+                st.markdown("---")
+                for i in range(time):
+                    month_str = month_label(start_month, start_year, i, short=False)
+                    required_count = monthly_payouts[i]
+                    month_key = f"month_{i}"
+                    current_assigned_indices = state.members(i)
+                    assigned_count = state.counts[i]
+                    
+                    with st.expander(f"📅 Month {i+1}: {month_str} - Needs {required_count} | Assigned: {assigned_count}", 
+                                    expanded=assigned_count < required_count):
+                        if current_assigned_indices:
+                            st.markdown("**Locked Participants:**")
+                            for idx_pos, real_index in enumerate(current_assigned_indices):
+                                cols = st.columns([11, 1])
+                                with cols[0]:
+                                    st.markdown(f"• {display_names[real_index]}")
+                                with cols[1]:
+                                    st.markdown("<div style='text-align: right;'>", unsafe_allow_html=True)
+                                    if st.button("❌", key=f"remove_{month_key}_{idx_pos}"):
+                                        state.remove(i, idx_pos)
+                                        st.rerun()
+                                    st.markdown("</div>", unsafe_allow_html=True)
+                        
+                        available_display = state.available_display()
+                        
+                        if assigned_count < required_count and available_display:
+                            action = "Lock" if st.session_state.assignment_mode == 'semi-automatic' else "Add"
+                            st.markdown(f"**{action} Participant:**")
+                            selected_display = st.multiselect(
+                                "Select participants",
+                                options=available_display,
+                                key=f"select_{month_key}",
+                                help=f"Select up to {state.remaining(i)} participants"
+                            )
+                            if st.button(f"🔒 {action} to {month_str}", key=f"lock_{month_key}"):
+                                if state.lock(i, selected_display):
+                                    st.rerun()
+                                else:
+                                    st.error(f"Too many! Month needs only {required_count} people.")
+                        
+                        if assigned_count == required_count:
+                            st.success(f"✅ Month {i+1} is full!")
+                        elif assigned_count < required_count:
+                            mode_msg = "will be auto-filled at PDF time" if st.session_state.assignment_mode == 'semi-automatic' else "more participants"
+                            st.info(f"ℹ️ Needs {required_count - assigned_count} more ({mode_msg})")
+                        else:
+                            st.error(f"❌ Overfilled! Remove {assigned_count - required_count}")
+                
+                st.markdown("---")
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    if st.session_state.assignment_mode == 'manual':
+                        if st.button("🔄 Auto-fill Remaining", use_container_width=True):
+                            state.fill_remaining()
+                            st.rerun()
+                with col2:
+                    if st.button("🧹 Clear All", use_container_width=True):
+                        state.clear()
+                        st.rerun()
+                with col3:
+                    if st.session_state.assignment_mode == 'manual':
+                        if state.is_valid(complete=True):
+                            st.success("✅ All assignments valid!")
+                        else:
+                            st.error("❌ Invalid assignments")
+                    else:
+                        if state.is_valid():
+                            st.success("✅ Locked assignments valid!")
+                        else:
+                            st.error("❌ Overfilled month!")
+        else:
+            st.warning("⚠️ Please complete the Group Setup and Participants tabs first.")
+
+    with tab4:
+        st.subheader("📜 Njangi Rules")
+        rules = st.text_area(
+            "Enter your group rules (one per line or paragraph):",
+            value=st.session_state.rules,
+            height=300,
+            help="E.g., Late payment penalty, attendance rules, dispute resolution, etc."
+        )
+        st.session_state.rules = rules
+        if st.button("💾 Save Rules", use_container_width=True):
+            if nname:
+                size = len(st.session_state.participants) or 1
+                loan = st.session_state.current_group_data['loan'] if st.session_state.current_group_data else 5000
+                time = st.session_state.current_group_data['time'] if st.session_state.current_group_data else 12
+                start_month = st.session_state.current_group_data['start_month'] if st.session_state.current_group_data else 7
+                start_year = st.session_state.current_group_data['start_year'] if st.session_state.current_group_data else 2025
+                base = loan * time
+                success = save_current_group(nname, size, loan, time, base, start_month, start_year)
+                if success:
+                    st.success("✅ Rules saved!")
+                else:
+                    st.error("❌ Could not save the group!")
+            else:
+                st.error("❌ Please enter a group name first!")
+
+    with tab5:
+        st.subheader("💰 Loans & Interest Settings")
+        st.markdown("Enable interest-based lending within your Njangi group.")
+        has_loans = st.checkbox("Enable Loans with Interest", value=st.session_state.has_loans)
+        st.session_state.has_loans = has_loans
+        if has_loans:
+            col1, col2 = st.columns(2)
+            with col1:
+                interest_rate = st.number_input(
+                    "Annual Interest Rate (%)",
+                    min_value=0.0, max_value=100.0, value=float(st.session_state.interest_rate), step=0.5,
+                    help="e.g., 5% per year"
+                )
+                st.session_state.interest_rate = interest_rate
+            with col2:
+                loan_duration = st.number_input(
+                    "Loan Duration (Months)",
+                    min_value=1, max_value=24, value=int(st.session_state.loan_duration), step=1,
+                    help="How long borrowers have to repay"
+                )
+                st.session_state.loan_duration = loan_duration
+
+            example = LoanBook([{'member_index': 0, 'principal': loan, 'annual_rate': interest_rate,
+                                 'term': loan_duration, 'method': method} for method in LOAN_METHODS])
+            st.info(f"💡 **Example**: A loan of {loan:,} FCFA will be repaid as **{example.repaid[0]:,} FCFA** after "
+                    f"{loan_duration} month(s) with simple interest, or in monthly instalments of "
+                    f"{example.payment[1, 0]:,} FCFA (flat, {example.repaid[1]:,} in total) or "
+                    f"{example.payment[2, 0]:,} FCFA (reducing balance, {example.repaid[2]:,} in total).")
+
+            st.markdown("#### 🧾 Borrowers")
+            db = st.session_state.db_manager
+            loan_group = db.load_group(nname) if nname else None
+            if loan_group is None:
+                st.info("ℹ️ Save the group first; loans are recorded against the saved group.")
+            else:
+                g_start_month, g_start_year = loan_group['start_month'], loan_group['start_year']
+                names = loan_group['participants'] + [f"Member {i+1}" for i in range(len(loan_group['participants']), loan_group['size'])]
+                borrower_name = lambda idx: names[idx] if idx < len(names) else f"Member {idx+1}"
+                loans = db.load_loans(nname)
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    borrower = st.selectbox("Borrower", range(loan_group['size']), key="loan_borrower",
+                                            format_func=lambda i: f"{i+1}. {names[i]}")
+                    principal = st.number_input("Principal (FCFA)", min_value=0, value=loan_group['base'], step=1000,
+                                                key="loan_principal")
+                with col2:
+                    loan_method = st.selectbox("Repayment Method", LOAN_METHODS, index=LOAN_METHODS.index('reducing'),
+                                               key="loan_method", format_func=lambda m: LOAN_METHOD_LABELS[m])
+                    issued = st.selectbox("Issued in", range(loan_group['time']), key="loan_issued",
+                                          format_func=lambda i: f"{i+1}. {month_label(g_start_month, g_start_year, i, short=False)}")
+                with col3:
+                    loan_rate = st.number_input("Rate (% per year)", min_value=0.0, max_value=100.0,
+                                                value=float(interest_rate), step=0.5, key="loan_rate")
+                    loan_term = st.number_input("Term (Months)", min_value=1, max_value=24, value=int(loan_duration),
+                                                step=1, key="loan_term")
+                if st.button("➕ Add Loan", disabled=principal <= 0, use_container_width=True):
+                    try:
+                        db.save_loans(nname, loans + [{
+                            'member_index': borrower, 'principal': principal, 'annual_rate': loan_rate,
+                            'term': loan_term, 'method': loan_method, 'month_index': issued
+                        }])
+                        st.success(f"✅ Loan of {principal:,} FCFA to {names[borrower]} added")
+                        loans = db.load_loans(nname)
+                    except (ValueError, KeyError, sqlite3.Error) as e:
+                        st.error(f"❌ Could not add the loan: {e}")
+
+                if loans:
+                    book = LoanBook(loans)
+                    totals = book.by_month()
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("🧾 Borrowers", book.count, delta=f"{int(book.principal.sum()):,} FCFA lent", delta_color="off")
+                    with col2:
+                        st.metric("💰 Interest", f"{int(book.interest_total.sum()):,} FCFA")
+                    with col3:
+                        st.metric("📅 Final Repayment", month_label(g_start_month, g_start_year, book.last_month(), short=False))
+                    last_due = book.due_month[np.arange(book.count), book.term - 1]
+                    st.dataframe([
+                        [str(i + 1), borrower_name(loans[i]['member_index']),
+                         LOAN_METHOD_LABELS[loans[i]['method']], loans[i]['principal'], f"{loans[i]['annual_rate']:g}%",
+                         loans[i]['term'], month_label(g_start_month, g_start_year, loans[i]['month_index']),
+                         int(book.payment[i, 0]), int(book.interest_total[i]), int(book.repaid[i]),
+                         month_label(g_start_month, g_start_year, int(last_due[i]))]
+                        for i in range(book.count)
+                    ], column_config={
+                        "0": "Loan", "1": "Borrower", "2": "Method", "3": "Principal", "4": "Rate", "5": "Term",
+                        "6": "Issued", "7": "First Instalment", "8": "Interest", "9": "Repaid", "10": "Final"
+                    }, hide_index=True, use_container_width=True)
+                    with st.expander("📆 Repayments Due per Month"):
+                        st.dataframe([
+                            [str(m + 1), month_label(g_start_month, g_start_year, m, short=False),
+                             int(totals['principal'][m]), int(totals['interest'][m]), int(totals['payment'][m]),
+                             int(totals['outstanding'][m])]
+                            for m in range(len(totals['payment'])) if totals['payment'][m] or totals['outstanding'][m]
+                        ], column_config={"0": "Month #", "1": "Period", "2": "Principal", "3": "Interest", "4": "Due",
+                                          "5": "Outstanding"}, hide_index=True, use_container_width=True)
+                    removed = st.multiselect("Remove loans", range(book.count), key="loans_removed",
+                                             format_func=lambda i: f"#{i+1}: {loans[i]['principal']:,} FCFA to "
+                                                                   f"{borrower_name(loans[i]['member_index'])}")
+                    st.button("🗑️ Remove Selected Loans", disabled=not removed, use_container_width=True,
+                              on_click=remove_loans, args=(nname, loans))
+                else:
+                    st.caption("No loans recorded yet; the report shows the example terms above until one is added.")
+
+        if st.button("💾 Save Loan Settings", use_container_width=True):
+            if nname:
+                size = len(st.session_state.participants) or 1
+                loan = st.session_state.current_group_data['loan'] if st.session_state.current_group_data else 5000
+                time = st.session_state.current_group_data['time'] if st.session_state.current_group_data else 12
+                start_month = st.session_state.current_group_data['start_month'] if st.session_state.current_group_data else 7
+                start_year = st.session_state.current_group_data['start_year'] if st.session_state.current_group_data else 2025
+                base = loan * time
+                success = save_current_group(nname, size, loan, time, base, start_month, start_year)
+                if success:
+                    st.success("✅ Loan settings saved!")
+                else:
+                    st.error("❌ Could not save the group!")
+            else:
+                st.error("❌ Please enter a group name first!")
+
+    with tab6:
+        st.subheader("Generate Njangi Report")
+        if nname and size > 0 and time > 0 and len(st.session_state.participants) == size:
+            unique_fruit_set = set(st.session_state.fruits)
+            duplicate_fruits = len(st.session_state.fruits) != len(unique_fruit_set)
+            manual_valid = True
+            if st.session_state.assignment_mode in ['manual', 'semi-automatic']:
+                state = get_assignment_state(get_payout_schedule(size, loan, time, base).planned.tolist())
+                manual_valid = state.is_valid(complete=st.session_state.assignment_mode == 'manual')
+            if duplicate_fruits:
+                st.error("❌ Duplicate fruits found! Please ensure all fruits are unique.")
+            elif st.session_state.assignment_mode in ['manual', 'semi-automatic'] and not manual_valid:
+                st.error("❌ Assignments invalid! Please fix in Assignment tab.")
+            else:
+                st.success("✅ All validations passed!")
+                with st.expander("📊 Group Summary", expanded=True):
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("👥 Participants", size)
+                        st.metric("💰 Monthly Contribution", f"{loan:,} FCFA")
+                    with col2:
+                        st.metric("📆 Duration", f"{time} months")
+                        st.metric("📄 Payout per Person", f"{base:,} FCFA")
+                    with col3:
+                        st.metric("💼 Total Pool", f"{size * loan * time:,} FCFA")
+                        st.metric("📥 Monthly Collection", f"{size * loan:,} FCFA")
+                    mode_display = {
+                        'automatic': '🎲 Automatic',
+                        'manual': '✏️ Manual',
+                        'semi-automatic': '🔄 Semi-Automatic'
+                    }
+                    st.info(f"Using **{mode_display[st.session_state.assignment_mode]}** assignment mode")
+                    if st.session_state.has_loans:
+                        st.info(f"💰 **Loans enabled**: {st.session_state.interest_rate:.2f}% annual interest over {st.session_state.loan_duration} month(s)")
+                    col1, col2 = st.columns([2, 1])
+                    with col1:
+                        if st.button("📄 Generate PDF Report", type="primary", use_container_width=True):
+                            if not save_current_group(nname, size, loan, time, base, start_month, start_year):
+                                st.error("❌ Could not save the group!")
+                            else:
+                                try:
+                                    njangi = Njangi(
+                                        size=size, loan=loan, time=time, base=base,
+                                        participants=st.session_state.participants,
+                                        fruits=st.session_state.fruits,
+                                        name=nname,
+                                        manual_assignments=st.session_state.manual_assignments if st.session_state.assignment_mode in ['manual', 'semi-automatic'] else None,
+                                        assignment_mode=st.session_state.assignment_mode,
+                                        rules=st.session_state.rules,
+                                        has_loans=st.session_state.has_loans,
+                                        interest_rate=st.session_state.interest_rate,
+                                        loan_duration=st.session_state.loan_duration,
+                                        constraints=st.session_state.member_constraints if st.session_state.assignment_mode == 'semi-automatic' else None,
+                                        loans=st.session_state.db_manager.load_loans(nname) if st.session_state.has_loans else None
+                                    )
+                                    resolve_schedule(st.session_state.db_manager, njangi)
+                                    filename = report_filename(nname, st.session_state.db_manager.load_group(nname)['id'])
+                                    key = njangi.report_key(start_month, start_year)
+                                    cached = get_report_cache().peek(key) is not None
+                                    get_report_cache().record(cached)
+                                    if cached:
+                                        # Already rendered with these exact inputs: no job needed
+                                        st.session_state.render_jobs[nname] = ('cached', key, filename)
+                                    else:
+                                        st.session_state.render_jobs[nname] = get_render_queue().submit(
+                                            nname, key, filename, render_payload(njangi, start_month, start_year))
+                                except InfeasibleScheduleError as e:
+                                    st.error("❌ No schedule satisfies the locked months and member constraints:\n\n"
+                                             + "\n".join(f"- {reason}" for reason in e.reasons))
+                                except Exception as e:
+                                    st.error(f"❌ Error generating PDF: {str(e)}")
+                        show_render_job(nname)
+                        cache_stats = get_report_cache().stats()
+                        st.caption(f"🗄️ Report cache: {cache_stats['hits']} hit(s) · {cache_stats['misses']} miss(es) · "
+                                   f"{cache_stats['entries']} file(s), {cache_stats['bytes'] / 1024:,.0f} KB")
+                    with col2:
+                        if st.button("💾 Save & Exit", use_container_width=True):
+                            success = save_current_group(nname, size, loan, time, base, start_month, start_year)
+                            if success:
+                                st.success("✅ Group saved successfully!")
+                            else:
+                                st.error("❌ Could not save the group!")
+        else:
+            st.warning("⚠️ Please complete all required fields in the previous tabs.")
+            missing_items = []
+            if not nname:
+                missing_items.append("Group name")
+            if size <= 0:
+                missing_items.append("Valid number of participants")
+            if time <= 0:
+                missing_items.append("Valid duration")
+            if len(st.session_state.participants) != size:
+                missing_items.append("All participant names")
+            st.info(f"Missing: {', '.join(missing_items)}")
+
+    with tab7:
+        st.subheader("🧾 Contribution Ledger")
+        db = st.session_state.db_manager
+        today = datetime.now()
+        ledger_group = db.load_group(nname) if nname else None
+        if ledger_group is None:
+            st.info("ℹ️ Save the group first; payments are recorded against the saved group.")
+        else:
+            ledger_plan = ledger_schedule(ledger_group)
+            if ledger_plan is None:
+                st.info("ℹ️ Generate the report once to fix the payout order; expected payouts follow that schedule.")
+            else:
+                g_start_month, g_start_year = ledger_group['start_month'], ledger_group['start_year']
+                g_time, g_loan, g_base = ledger_plan.time, ledger_plan.loan, ledger_plan.base
+                current_month = min(max(cycle_month(g_start_month, g_start_year, today.year, today.month), 0), g_time - 1)
+                ledger_month = st.selectbox(
+                    "Month", range(g_time), index=current_month, key="ledger_month",
+                    format_func=lambda i: f"{i+1}. {month_label(g_start_month, g_start_year, i, short=False)}"
+                )
+                names = ledger_group['participants'] + [f"Member {i+1}" for i in range(len(ledger_group['participants']), ledger_plan.size)]
+                balances = db.member_balances(nname)
+                entries = db.month_ledger(nname, ledger_month)
+                paid_this_month = {}
+                for _, member_index, kind, amount, _, _ in entries:
+                    if kind == 'contribution':
+                        paid_this_month[member_index] = paid_this_month.get(member_index, 0) + amount
+                payout_month = ledger_plan.month_of()
+                expected_to_date = g_loan * (ledger_month + 1)
+                collected, paid_out = db.month_totals(nname).get(ledger_month, (0, 0))
+                behind = [i for i in range(ledger_plan.size) if balances.get(i, (0, 0))[0] < expected_to_date]
+
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("📥 Collected", f"{collected:,} FCFA", delta=f"{collected - int(ledger_plan.collected[ledger_month]):,} vs plan")
+                with col2:
+                    st.metric("📤 Paid Out", f"{paid_out:,} FCFA",
+                              delta=f"{paid_out - int(ledger_plan.counts[ledger_month]) * g_base:,} vs plan")
+                with col3:
+                    st.metric("⚠️ Behind", len(behind), delta=f"of {ledger_plan.size}", delta_color="off")
+
+                st.dataframe([
+                    [str(i + 1), names[i], paid_this_month.get(i, 0), balances.get(i, (0, 0))[0],
+                     max(expected_to_date - balances.get(i, (0, 0))[0], 0),
+                     month_label(g_start_month, g_start_year, int(payout_month[i])) if payout_month[i] >= 0 else "-",
+                     balances.get(i, (0, 0))[1]]
+                    for i in range(ledger_plan.size)
+                ], column_config={
+                    "0": "S/N", "1": "Name", "2": "Paid This Month", "3": "Paid to Date",
+                    "4": "Arrears", "5": "Payout Month", "6": "Received"
+                }, hide_index=True, use_container_width=True)
+
+                col1, col2 = st.columns(2)
+                with col1:
+                    unpaid = [i for i in range(ledger_plan.size) if i not in paid_this_month]
+                    contributors = st.multiselect("Record contributions from", range(ledger_plan.size), default=[],
+                                                  format_func=lambda i: f"{i+1}. {names[i]}", key="ledger_contributors",
+                                                  placeholder=f"{len(unpaid)} member(s) have not paid this month")
+                    contribution = st.number_input("Amount each (FCFA)", value=g_loan, step=1000, key="ledger_contribution")
+                    if st.button("📥 Record Contributions", disabled=not contributors, use_container_width=True):
+                        count = db.record_ledger_entries(
+                            nname, [(i, ledger_month, 'contribution', contribution, None) for i in contributors])
+                        st.session_state.pop("ledger_contributors", None)
+                        st.success(f"✅ Recorded {count} contribution(s)")
+                        st.rerun()
+                with col2:
+                    due = ledger_plan.members(ledger_month).tolist()
+                    recipients = st.multiselect("Record payouts to", due, default=[],
+                                                format_func=lambda i: f"{i+1}. {names[i]}", key="ledger_recipients",
+                                                placeholder=f"{len(due)} member(s) due this month")
+                    payout = st.number_input("Amount each (FCFA)", value=g_base, step=1000, key="ledger_payout")
+                    if st.button("📤 Record Payouts", disabled=not recipients, use_container_width=True):
+                        count = db.record_ledger_entries(
+                            nname, [(i, ledger_month, 'payout', payout, None) for i in recipients])
+                        st.session_state.pop("ledger_recipients", None)
+                        st.success(f"✅ Recorded {count} payout(s)")
+                        st.rerun()
+
+                with st.expander(f"📜 Entries this month ({len(entries)})"):
+                    st.caption("The ledger is append-only: a mistaken entry is corrected by recording its reversal.")
+                    if entries:
+                        st.dataframe([
+                            [entry_id, names[member_index] if member_index < len(names) else f"#{member_index + 1}",
+                             kind, amount, note or "", str(recorded_at)[:19]]
+                            for entry_id, member_index, kind, amount, note, recorded_at in entries
+                        ], column_config={"0": "Entry", "1": "Member", "2": "Kind", "3": "Amount", "4": "Note", "5": "Recorded"},
+                            hide_index=True, use_container_width=True)
+                        entry_by_id = {entry[0]: entry for entry in entries}
+                        reverse_id = st.selectbox("Entry to reverse", list(entry_by_id), key="ledger_reverse",
+                                                  format_func=lambda e: f"#{e}: {entry_by_id[e][2]} {entry_by_id[e][3]:,} ({names[entry_by_id[e][1]] if entry_by_id[e][1] < len(names) else entry_by_id[e][1]})")
+                        if st.button("↩️ Record Reversal", use_container_width=True):
+                            _, member_index, kind, amount, _, _ = entry_by_id[reverse_id]
+                            db.record_ledger_entries(nname, [(member_index, ledger_month, kind, -amount, f"Reverses entry #{reverse_id}")])
+                            st.rerun()
+
+        with st.expander("🚨 Behind on Contributions (all groups)"):
+            behind_rows = db.members_behind(today.year, today.month)
+            if behind_rows:
+                st.dataframe([
+                    [group_name, member_name or f"Member {member_index + 1}", month_index + 1, expected, paid, arrears]
+                    for group_name, member_index, member_name, month_index, expected, paid, arrears in behind_rows
+                ], column_config={"0": "Group", "1": "Member", "2": "Month #", "3": "Expected", "4": "Paid", "5": "Arrears"},
+                    hide_index=True, use_container_width=True)
+            else:
+                st.success("✅ Nobody is behind this month.")
+
+    with tab8:
+        st.subheader("📊 Portfolio (all groups)")
+        today = datetime.now()
+        started = timer.perf_counter()
+        portfolio = st.session_state.db_manager.portfolio_months()
+        elapsed_ms = (timer.perf_counter() - started) * 1000
+        if not portfolio:
+            st.info("ℹ️ No saved groups yet.")
+        else:
+            by_month = {(year, month): row for year, month, *row in portfolio}
+            active, members, inflow, paid_members, payouts, outstanding = by_month.get(
+                (today.year, today.month), (0, 0, 0, 0, 0, 0))
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("🏘️ Active Groups", f"{active:,}", delta=f"{members:,} members", delta_color="off")
+            with col2:
+                st.metric("📥 Monthly Inflow", f"{inflow:,} FCFA")
+            with col3:
+                st.metric("📤 Payouts This Month", f"{payouts:,} FCFA", delta=f"{paid_members:,} members", delta_color="off")
+            with col4:
+                st.metric("⏳ Outstanding Payouts", f"{outstanding:,} FCFA")
+            st.caption(f"{months[today.month]} {today.year} · {len(portfolio)} month(s) from "
+                       f"{months[portfolio[0][1]][:3]}-{portfolio[0][0]} to {months[portfolio[-1][1]][:3]}-{portfolio[-1][0]} "
+                       f"· aggregated in SQL in {elapsed_ms:.1f} ms")
+            st.line_chart({
+                "Month": [f"{year}-{month:02d}" for year, month, *_ in portfolio],
+                "Inflow": [row[4] for row in portfolio],
+                "Payouts": [row[6] for row in portfolio],
+                "Outstanding": [row[7] for row in portfolio],
+            }, x="Month")
+            st.dataframe([
+                [f"{months[month][:3]}-{year}", active, members, inflow, paid_members, payouts, outstanding]
+                for year, month, active, members, inflow, paid_members, payouts, outstanding in portfolio
+            ], column_config={
+                "0": "Month", "1": "Active Groups", "2": "Members", "3": "Inflow",
+                "4": "Members Paid", "5": "Payouts", "6": "Outstanding"
+            }, hide_index=True, use_container_width=True)
+            st.caption("Planned figures from each group's size, contribution, duration and payout amount; "
+                       "see the Ledger tab for recorded payments.")
+
+    autosave_group(*group_inputs)
@@ -0,0 +1,118 @@
+"""Contribution ledger: materialized balances, members behind, append-only rows and
+the guard against renumbering members the ledger or loans refer to.
+
+    python -m pytest tests
+"""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.storage import DatabaseManager  # noqa: E402
+
+NAMES = ["Ann", "Ben", "Cho", "Dee"]
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "njangi.db"), cache_entries=0)
+    # Four members, 5000 a month for 4 months from January 2025
+    manager.save_group("Savings", 4, 5000, 4, 5000, 1, 2025, NAMES, ["x", "y", "z", "w"])
+    yield manager
+    manager.close()
+
+
+def test_balances_and_month_totals(db):
+    db.record_ledger_entries("Savings", [
+        (0, 0, 'contribution', 5000, None), (1, 0, 'contribution', 5000, None),
+        (0, 1, 'contribution', 5000, None), (0, 0, 'payout', 5000, "January pot"),
+        (1, 0, 'contribution', -5000, "reversal"),
+    ])
+    assert db.member_balances("Savings") == {0: (10000, 5000), 1: (0, 0)}
+    assert db.month_totals("Savings") == {0: (5000, 5000), 1: (5000, 0)}
+    assert [row[2] for row in db.member_ledger("Savings", 1)] == ['contribution', 'contribution']
+    assert len(db.month_ledger("Savings", 0)) == 4
+
+
+def test_balance_rows_appear_with_the_first_entry(db):
+    with db.pool.connection() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM njangi_balances').fetchone() == (0,)
+    db.record_ledger_entries("Savings", [(2, 0, 'contribution', 5000, None)])
+    assert db.member_balances("Savings") == {2: (5000, 0)}
+
+
+def test_members_behind_counts_members_without_entries(db):
+    db.record_ledger_entries("Savings", [
+        (0, 0, 'contribution', 5000, None), (0, 1, 'contribution', 5000, None),
+        (1, 0, 'contribution', 5000, None), (2, 0, 'contribution', 2000, None),
+    ])
+    # February 2025: everyone owes 10000 so far
+    behind = db.members_behind(2025, 2)
+    assert [(group, idx, name, month, expected, paid, arrears) for group, idx, name, month, expected, paid, arrears
+            in behind] == [
+        ("Savings", 3, "Dee", 1, 10000, 0, 10000),
+        ("Savings", 2, "Cho", 1, 10000, 2000, 8000),
+        ("Savings", 1, "Ben", 1, 10000, 5000, 5000),
+    ]
+    assert db.members_behind(2024, 12) == []
+    # After the last month the expectation stops growing
+    assert db.members_behind(2026, 6, limit=1)[0][4] == 20000
+
+
+def test_members_behind_matches_a_ledger_replay(db):
+    for g in range(20):
+        db.save_group(f"group {g}", 4, 1000, 6, 1000, 1 + g % 12, 2025, NAMES, [])
+        db.record_ledger_entries(f"group {g}", [
+            (i, m, 'contribution', 1000, None) for i in range(4) for m in range((g + i) % 7)])
+    replay = {}
+    with db.pool.connection() as conn:
+        for name, start_month, start_year, loan, time in conn.execute(
+                'SELECT name, start_month, start_year, loan, time FROM njangi_groups'):
+            elapsed = min(time, (2025 - start_year) * 12 + (9 - start_month) + 1)
+            if elapsed <= 0:
+                continue
+            for idx in range(4):
+                paid = conn.execute('''
+                    SELECT COALESCE(SUM(l.amount), 0) FROM njangi_ledger l JOIN njangi_groups g ON g.id = l.group_id
+                    WHERE g.name = ? AND l.member_index = ? AND l.kind = 'contribution'
+                ''', (name, idx)).fetchone()[0]
+                if paid < loan * elapsed:
+                    replay[(name, idx)] = loan * elapsed - paid
+    behind = db.members_behind(2025, 9, limit=10 ** 6)
+    assert {(row[0], row[1]): row[6] for row in behind} == replay
+
+
+def test_ledger_is_append_only(db):
+    db.record_ledger_entries("Savings", [(0, 0, 'contribution', 5000, None)])
+    with db.pool.connection() as conn:
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute('UPDATE njangi_ledger SET amount = 1')
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute('DELETE FROM njangi_ledger')
+    with pytest.raises(ValueError):
+        db.record_ledger_entries("Savings", [(0, 0, 'refund', 5000, None)])
+    db.delete_group("Savings")
+    with db.pool.connection() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM njangi_ledger').fetchone() == (0,)
+
+
+@pytest.mark.parametrize("history", ['ledger', 'loan'])
+def test_members_with_history_cannot_be_removed_or_moved(db, history):
+    if history == 'ledger':
+        db.record_ledger_entries("Savings", [(3, 0, 'contribution', 5000, None)])
+    else:
+        db.save_loans("Savings", [{'member_index': 3, 'principal': 10000, 'annual_rate': 5.0, 'term': 2,
+                                   'method': 'flat'}])
+    with pytest.raises(ValueError, match="#4"):
+        db.save_group("Savings", 3, 5000, 4, 5000, 1, 2025, NAMES[:3], ["x", "y", "z"])
+    with pytest.raises(ValueError, match="#4"):
+        db.save_group("Savings", 4, 5000, 4, 5000, 1, 2025, ["Dee", "Ann", "Ben", "Cho"], ["w", "x", "y", "z"])
+    with pytest.raises(ValueError):
+        db.update_group_fields("Savings", participants=NAMES[:3], fruits=["x", "y", "z"])
+    assert db.load_group("Savings")['participants'] == NAMES
+    # Renaming in place, and reordering members without history, are fine
+    assert db.save_group("Savings", 4, 5000, 4, 5000, 1, 2025, ["Ben", "Ann", "Cho", "Dora"], ["y", "x", "z", "v"])
+    assert db.load_group("Savings")['participants'] == ["Ben", "Ann", "Cho", "Dora"]
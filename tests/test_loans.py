@@ -0,0 +1,78 @@
+"""LoanBook amortization: whole-FCFA instalments, rounding and group totals.
+
+    python -m pytest tests
+"""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.core import LOAN_METHODS, LoanBook  # noqa: E402
+
+
+def loan(principal, annual_rate, term, method, member_index=0, month_index=0):
+    return {'member_index': member_index, 'principal': principal, 'annual_rate': annual_rate,
+            'term': term, 'method': method, 'month_index': month_index}
+
+
+@pytest.mark.parametrize("method", LOAN_METHODS)
+def test_principals_sum_to_the_loan(method):
+    rng = random.Random(method)
+    loans = [loan(rng.randint(0, 250000), rng.choice([0, 0.5, 7.5, 12, 24, 37.5]), rng.randint(1, 36), method)
+             for _ in range(500)]
+    book = LoanBook(loans)
+    assert (book.principal_due.sum(axis=1) == book.principal).all()
+    assert (book.payment.sum(axis=1) == book.principal + book.interest_total).all()
+    assert (book.payment == book.principal_due + book.interest_due).all()
+    assert (book.balance[:, -1] == 0).all()
+
+
+def test_half_amounts_round_up():
+    # 1 FCFA at 600% a year for one month: 0.5 interest rounds up, not to even
+    book = LoanBook([loan(1, 600, 1, 'simple')])
+    assert book.interest_due.tolist() == [[1]]
+    assert book.principal_due.tolist() == [[1]]
+    assert book.repaid.tolist() == [2]
+
+
+def test_uneven_instalments_follow_the_running_total():
+    book = LoanBook([loan(1000, 0, 3, 'flat')])
+    assert book.principal_due.tolist() == [[333, 334, 333]]
+    assert book.balance.tolist() == [[667, 333, 0]]
+
+
+def test_flat_and_simple_schedules():
+    book = LoanBook([loan(1200, 12, 12, 'flat'), loan(1200, 12, 12, 'simple', member_index=1)])
+    assert book.principal_due[0].tolist() == [100] * 12
+    assert book.interest_due[0].tolist() == [12] * 12
+    assert book.payment[1].tolist() == [0] * 11 + [1200 + 144]
+    assert book.balance[1].tolist() == [1200] * 11 + [0]
+
+
+def test_reducing_balance_pays_equal_instalments():
+    book = LoanBook([loan(100000, 24, 12, 'reducing')])
+    payments = book.payment[0]
+    assert payments.max() - payments.min() <= 1
+    assert (book.interest_due[0][:-1] >= book.interest_due[0][1:]).all()
+    assert book.balance[0, -1] == 0
+
+
+def test_by_month_follows_issue_month():
+    book = LoanBook([loan(600, 0, 3, 'flat', month_index=2), loan(300, 0, 1, 'flat', member_index=1)])
+    totals = book.by_month()
+    assert book.last_month() == 5
+    assert totals['principal'].tolist() == [0, 300, 0, 200, 200, 200]
+    assert totals['outstanding'].tolist() == [300, 0, 600, 400, 200, 0]
+
+
+def test_rejects_a_zero_term():
+    with pytest.raises(ValueError):
+        LoanBook([loan(1000, 12, 0, 'flat')])
+
+
+def test_empty_book():
+    book = LoanBook([])
+    assert book.count == 0 and book.last_month() == -1
@@ -0,0 +1,86 @@
+"""DatabaseManager's read cache: hits on repeat reads, invalidation on writes from
+this manager, another manager or another process (seen through PRAGMA data_version).
+
+    python -m pytest tests
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.storage import DatabaseManager  # noqa: E402
+
+
+def save(db, name, loan=5000):
+    assert db.save_group(name, 3, loan, 3, 5000, 1, 2025, ["A", "B", "C"], ["x", "y", "z"])
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "njangi.db")
+
+
+@pytest.fixture
+def db(path):
+    manager = DatabaseManager(path)
+    yield manager
+    manager.close()
+
+
+def test_repeat_reads_hit_and_copies_are_private(db):
+    save(db, "Savings")
+    db.load_group("Savings")['participants'].append("mutated")
+    assert db.load_group("Savings")['participants'] == ["A", "B", "C"]
+    stats = db.read_cache.stats()
+    assert stats['hits'] >= 1 and stats['misses'] >= 1
+
+
+def test_own_writes_invalidate(db):
+    save(db, "Savings")
+    assert db.load_group("Savings")['loan'] == 5000
+    db.rename_member("Savings", 0, "Ann")
+    assert db.load_group("Savings")['participants'][0] == "Ann"
+    save(db, "Other")
+    assert db.get_all_groups() and db.count_groups() == 2
+
+
+def test_another_manager_invalidates_only_the_changed_group(db, path):
+    save(db, "Savings")
+    save(db, "Other")
+    db.load_group("Savings"), db.load_group("Other")
+    other = DatabaseManager(path)
+    other.set_member_fruit("Savings", 1, "mango")
+    other.close()
+    assert db.load_group("Savings")['fruits'][1] == "mango"
+    hits = db.read_cache.stats()['hits']
+    db.load_group("Other")
+    assert db.read_cache.stats()['hits'] == hits + 1
+
+
+def test_another_process_invalidates(db, path):
+    save(db, "Savings")
+    assert db.count_groups() == 1 and db.load_group("Savings")['loan'] == 5000
+    script = (
+        "import sqlite3, sys\n"
+        "conn = sqlite3.connect(sys.argv[1])\n"
+        "conn.execute(\"UPDATE njangi_groups SET loan = 7000 WHERE name = 'Savings'\")\n"
+        "conn.execute(\"INSERT INTO njangi_groups (name, size, loan, time, base, start_month, start_year) "
+        "VALUES ('Elsewhere', 3, 5000, 3, 5000, 1, 2025)\")\n"
+        "conn.commit()\n"
+    )
+    subprocess.run([sys.executable, "-c", script, path], check=True)
+    assert db.load_group("Savings")['loan'] == 7000
+    assert db.count_groups() == 2
+
+
+def test_deleted_group_is_not_served_from_cache(db, path):
+    save(db, "Savings")
+    assert db.load_group("Savings") is not None
+    other = DatabaseManager(path)
+    other.delete_group("Savings")
+    other.close()
+    assert db.load_group("Savings") is None
+    assert db.count_groups() == 0
@@ -0,0 +1,129 @@
+"""Versioned group snapshots: deltas against checkpoints, packing, history and restore.
+
+    python -m pytest tests
+"""
+import json
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.storage import (  # noqa: E402
+    SNAPSHOT_CHECKPOINT_EVERY, DatabaseManager, apply_snapshot_delta, pack_snapshot, snapshot_delta, unpack_snapshot,
+)
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "njangi.db"))
+    yield manager
+    manager.close()
+
+
+def fields(size=20, loan=5000, **overrides):
+    record = {
+        'size': size, 'loan': loan, 'time': 4, 'base': 25000, 'start_month': 1, 'start_year': 2025,
+        'participants': [f"Member {i + 1}" for i in range(size)],
+        'fruits': [f"fruit {i + 1}" for i in range(size)],
+        'manual_assignments': None, 'constraints': {}, 'rules': "",
+        'has_loans': False, 'interest_rate': 0.0, 'loan_duration': 1,
+    }
+    record.update(overrides)
+    return record
+
+
+def random_state(rng):
+    return {
+        'loan': rng.choice([1000, 5000]),
+        'participants': [rng.choice("ABCD") for _ in range(rng.randint(0, 6))],
+        'manual_assignments': rng.choice([None, {f"month_{m}": [rng.randrange(6)] for m in range(rng.randint(0, 3))}]),
+        'constraints': {str(i): {'not_before': rng.randrange(3)} for i in rng.sample(range(6), rng.randint(0, 3))},
+    }
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_delta_round_trip(seed):
+    rng = random.Random(seed)
+    base, state = random_state(rng), random_state(rng)
+    delta = snapshot_delta(base, state)
+    assert apply_snapshot_delta(base, delta) == state
+    assert apply_snapshot_delta(base, unpack_snapshot(pack_snapshot(delta))) == state
+    assert snapshot_delta(state, state) == {}
+
+
+def test_small_snapshots_stay_plain_json():
+    small, large = {'loan': 5000}, {'participants': [f"Member {i}" for i in range(500)]}
+    assert pack_snapshot(small)[:1] == b'{'
+    assert pack_snapshot(large)[:1] != b'{'
+    assert len(pack_snapshot(large)) < len(json.dumps(large)) / 2
+    assert unpack_snapshot(pack_snapshot(small)) == small
+    assert unpack_snapshot(pack_snapshot(large)) == large
+
+
+def test_versions_load_as_saved(db):
+    saved = {}
+    for loan in [5000, 6000, 6000, 7000]:
+        record = fields(loan=loan, participants=[f"Member {i + 1}" for i in range(19)] + [f"v{loan}"])
+        db.save_group("Savings", **record)
+        saved[loan] = record
+    history = db.group_history("Savings")
+    # The repeated save of loan 6000 added no version
+    assert [row[0] for row in history] == [3, 2, 1]
+    assert history[0][4] == ['loan', 'participants']
+    assert [row[2] for row in history] == [False, False, True]
+    for version, loan in zip([1, 2, 3], [5000, 6000, 7000]):
+        state = db.load_snapshot("Savings", version)
+        assert {field: state[field] for field in saved[loan]} == saved[loan]
+    assert db.load_snapshot("Savings", 4) is None
+
+
+def test_member_edits_are_versioned(db):
+    db.save_group("Savings", **fields())
+    db.rename_member("Savings", 3, "Renamed")
+    db.update_group_fields("Savings", manual_assignments={'month_0': [1, 2]})
+    state = db.load_snapshot("Savings", db.group_history("Savings")[0][0])
+    current = db.load_group("Savings")
+    assert state['participants'] == current['participants']
+    assert state['manual_assignments'] == current['manual_assignments']
+
+
+def test_checkpoints(db):
+    db.save_group("Savings", **fields())
+    for loan in range(1, SNAPSHOT_CHECKPOINT_EVERY + 1):
+        db.save_group("Savings", **fields(loan=1000 + loan))
+    checkpoints = [version for version, _, is_checkpoint, _, _ in db.group_history("Savings") if is_checkpoint]
+    assert checkpoints == [SNAPSHOT_CHECKPOINT_EVERY + 1, 1]
+    # A change to most of the roster is bigger than a delta is worth
+    db.save_group("Savings", **fields(participants=[f"Other {i}" for i in range(20)]))
+    assert db.group_history("Savings", limit=1)[0][2]
+
+
+def test_history_survives_a_new_manager(db):
+    for loan in (5000, 6000, 7000):
+        db.save_group("Savings", **fields(loan=loan))
+    other = DatabaseManager(db.db_name)
+    try:
+        assert other.load_snapshot("Savings", 2)['loan'] == 6000
+        # The other manager starts with no in-memory head and must continue the history correctly
+        other.save_group("Savings", **fields(loan=8000, size=21, participants=[f"Member {i + 1}" for i in range(21)],
+                                             fruits=[f"fruit {i + 1}" for i in range(21)]))
+        assert other.load_snapshot("Savings", 4)['participants'][-1] == "Member 21"
+        assert other.load_snapshot("Savings", 4)['loan'] == 8000
+    finally:
+        other.close()
+    db.save_group("Savings", **fields(loan=9000))
+    state = db.load_snapshot("Savings", 5)
+    assert state['loan'] == 9000 and len(state['participants']) == 20
+
+
+def test_restore_adds_a_version(db):
+    db.save_group("Savings", **fields(loan=5000))
+    db.save_group("Savings", **fields(loan=6000, participants=["Changed"] + fields()['participants'][1:]))
+    assert db.restore_snapshot("Savings", 1)
+    assert [row[0] for row in db.group_history("Savings")] == [3, 2, 1]
+    current = db.load_group("Savings")
+    assert current['loan'] == 5000 and current['participants'][0] == "Member 1"
+    assert not db.restore_snapshot("Savings", 99)
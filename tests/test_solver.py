@@ -0,0 +1,88 @@
+"""solve_assignments against brute force on tiny groups.
+
+Every way of placing up to 7 members in up to 3 months is enumerated, so the
+solver must find a schedule exactly when one exists, and it must be valid.
+
+    python -m pytest tests
+"""
+import itertools
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.core import InfeasibleScheduleError, solve_assignments  # noqa: E402
+
+
+def random_case(rng):
+    size = rng.randint(2, 7)
+    months = rng.randint(1, 3)
+    cuts = sorted(rng.choices(range(size + 1), k=months - 1))
+    payouts = [b - a for a, b in zip([0] + cuts, cuts + [size])]
+    locked = {}
+    for idx in rng.sample(range(size), rng.randint(0, 2)):
+        locked.setdefault(f"month_{rng.randrange(months)}", []).append(idx)
+    constraints = {}
+    for idx in range(size):
+        rules = {}
+        if rng.random() < 0.2:
+            rules['not_before'] = rng.randrange(months)
+        if rng.random() < 0.2:
+            rules['not_after'] = rng.randrange(months)
+        if rng.random() < 0.2:
+            rules['prefer'] = [rng.randrange(months)]
+        if rng.random() < 0.5:
+            rules['apart'] = rng.sample([other for other in range(size) if other != idx], min(rng.randint(1, 2), size - 1))
+        if rules:
+            constraints[idx] = rules
+    return size, payouts, locked, constraints
+
+
+def violations(size, payouts, locked, constraints, month_of):
+    if sorted(month_of) != list(range(size)):
+        return "not every member is paid exactly once"
+    for m, count in enumerate(payouts):
+        if sum(1 for month in month_of.values() if month == m) != count:
+            return f"month {m} does not pay out to {count}"
+    for key, members in locked.items():
+        if any(month_of[idx] != int(key.split('_')[1]) for idx in members):
+            return "a locked member moved"
+    for idx, rules in constraints.items():
+        if month_of[idx] < rules.get('not_before', 0) or month_of[idx] > rules.get('not_after', len(payouts) - 1):
+            return f"member {idx} is outside their window"
+        if any(month_of[other] == month_of[idx] for other in rules.get('apart', [])):
+            return f"member {idx} shares a month with a partner"
+    return None
+
+
+def brute_force(size, payouts, locked, constraints):
+    for months in itertools.product(range(len(payouts)), repeat=size):
+        if violations(size, payouts, locked, constraints, dict(enumerate(months))) is None:
+            return True
+    return False
+
+
+@pytest.mark.parametrize("seed", range(400))
+def test_verdict_matches_brute_force(seed):
+    size, payouts, locked, constraints = random_case(random.Random(seed))
+    expected = brute_force(size, payouts, locked, constraints)
+    try:
+        assignments = solve_assignments(size, payouts, locked, constraints, rng=random.Random(seed))
+    except InfeasibleScheduleError:
+        assert not expected, "solver gave up on a feasible schedule"
+        return
+    month_of = {idx: int(key.split('_')[1]) for key, members in assignments.items() for idx in members}
+    assert violations(size, payouts, locked, constraints, month_of) is None
+    assert expected
+
+
+def test_apart_chain_needs_more_than_one_swap():
+    constraints = {3: {'apart': [4, 1]}, 4: {'not_before': 1}, 5: {'apart': [2, 3]}, 2: {'apart': [4, 3]},
+                   0: {'apart': [5]}}
+    for seed in range(200):
+        assignments = solve_assignments(6, [2, 2, 2], {}, constraints, rng=random.Random(seed))
+        month_of = {idx: int(key.split('_')[1]) for key, members in assignments.items() for idx in members}
+        assert violations(6, [2, 2, 2], {}, constraints, month_of) is None
@@ -0,0 +1,125 @@
+"""DatabaseManager round trips through the normalized tables and the connection pool.
+
+    python -m pytest tests
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from njangi.storage import DatabaseManager  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "njangi.db"), cache_entries=0)
+    yield manager
+    manager.close()
+
+
+def group(size=6, **fields):
+    record = {
+        'size': size, 'loan': 5000, 'time': 3, 'base': 10000, 'start_month': 2, 'start_year': 2025,
+        'participants': [f"Member {i + 1}" for i in range(size)],
+        'fruits': [f"fruit {i + 1}" for i in range(size)],
+        'manual_assignments': {'month_0': [4, 1], 'month_1': [], 'month_2': [0]},
+        'constraints': {2: {'not_before': 1, 'apart': [3]}, 5: {'prefer': [0, 2]}},
+    }
+    record.update(fields)
+    return record
+
+
+def test_round_trip(db):
+    fields = group()
+    assert db.save_group("Savings", **fields)
+    loaded = db.load_group("Savings")
+    for field in ('size', 'loan', 'time', 'base', 'start_month', 'start_year', 'participants', 'fruits',
+                  'manual_assignments'):
+        assert loaded[field] == fields[field], field
+    assert loaded['constraints'] == {2: {'not_before': 1, 'apart': [3]}, 5: {'prefer': [0, 2]}}
+    with db.pool.connection() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM njangi_members').fetchone() == (6,)
+        assert conn.execute('SELECT COUNT(*) FROM njangi_assignments').fetchone() == (3,)
+        assert conn.execute('SELECT participants, fruits, manual_assignments FROM njangi_groups').fetchone() == (
+            None, None, None)
+
+
+def test_shrinking_the_roster_deletes_member_rows(db):
+    db.save_group("Savings", **group())
+    db.save_group("Savings", **group(4, manual_assignments=None, constraints={}))
+    loaded = db.load_group("Savings")
+    assert loaded['participants'] == [f"Member {i + 1}" for i in range(4)]
+    assert loaded['manual_assignments'] is None and loaded['constraints'] == {}
+    with db.pool.connection() as conn:
+        assert conn.execute('SELECT MAX(member_index) FROM njangi_members').fetchone() == (3,)
+
+
+def test_saves_write_only_changed_member_rows(db):
+    db.save_group("Savings", **group())
+    with db.pool.connection() as conn:
+        # save_group runs on the connection this thread already holds, so temp triggers see its writes
+        conn.execute('CREATE TEMP TABLE member_writes (kind TEXT)')
+        for kind in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f'''
+                CREATE TEMP TRIGGER member_{kind.lower()} AFTER {kind} ON main.njangi_members BEGIN
+                    INSERT INTO member_writes VALUES ('{kind}');
+                END
+            ''')
+        db.save_group("Savings", **group())
+        db.save_group("Savings", **group(participants=["Ann"] + group()['participants'][1:]))
+        assert conn.execute('SELECT kind FROM member_writes').fetchall() == [('UPDATE',)]
+
+
+def test_concurrent_sessions_share_the_pool(db):
+    errors = []
+
+    def session(n):
+        try:
+            for round_ in range(20):
+                fields = group(5 + n % 3, loan=1000 * (round_ + 1))
+                assert db.save_group(f"group {n}", **fields)
+                assert db.load_group(f"group {n}")['loan'] == fields['loan']
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert db.count_groups() == 12
+    assert db.pool._created <= db.pool.max_connections
+
+
+def test_nested_transactions_join_the_outer_one(db):
+    db.save_group("Savings", **group())
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.rename_member("Savings", 0, "Renamed")
+            raise RuntimeError
+    assert db.load_group("Savings")['participants'][0] == "Member 1"
+
+
+def test_legacy_json_columns_are_migrated(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    DatabaseManager(path).close()
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        INSERT INTO njangi_groups (name, size, loan, time, base, start_month, start_year, participants, fruits,
+                                   manual_assignments)
+        VALUES ('Old', 3, 5000, 3, 5000, 1, 2025, ?, ?, ?)
+    ''', (json.dumps(["A", "B", "C"]), json.dumps(["x", "y", "z"]), json.dumps({'month_0': [2]})))
+    conn.commit()
+    conn.close()
+    db = DatabaseManager(path)
+    loaded = db.load_group("Old")
+    db.close()
+    assert loaded['participants'] == ["A", "B", "C"]
+    assert loaded['fruits'] == ["x", "y", "z"]
+    assert loaded['manual_assignments']['month_0'] == [2]